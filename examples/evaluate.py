@@ -50,7 +50,7 @@ def evaluate(args):
     env.set_agents(agents)
 
     # Evaluate
-    rewards = tournament(env, args.num_games)
+    rewards = tournament(env, args.num_games, args.num_workers)
     for position, reward in enumerate(rewards):
         print(position, args.models[position], reward)
 
@@ -95,6 +95,11 @@ if __name__ == '__main__':
         type=int,
         default=10000,
     )
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        default=1,
+    )
 
     args = parser.parse_args()
 
@@ -6,6 +6,10 @@ import argparse
 import rlcard
 from rlcard.agents import (
     CFRAgent,
+    CFRPlusAgent,
+    LinearCFRAgent,
+    DCFRAgent,
+    MCCFRAgent,
     RandomAgent,
 )
 from rlcard.utils import (
@@ -35,7 +39,15 @@ def train(args):
     set_seed(args.seed)
 
     # Initilize CFR Agent
-    agent = CFRAgent(
+    agent_class = {
+        'cfr': CFRAgent,
+        'cfr+': CFRPlusAgent,
+        'linear-cfr': LinearCFRAgent,
+        'dcfr': DCFRAgent,
+        'es-mccfr': lambda env, model_path: MCCFRAgent(env, model_path, sampling='external'),
+        'os-mccfr': lambda env, model_path: MCCFRAgent(env, model_path, sampling='outcome'),
+    }[args.algorithm]
+    agent = agent_class(
         env,
         os.path.join(
             args.log_dir,
@@ -89,6 +101,19 @@ if __name__ == '__main__':
             'maria'
         ],
     )
+    parser.add_argument(
+        '--algorithm',
+        type=str,
+        default='cfr',
+        choices=[
+            'cfr',
+            'cfr+',
+            'linear-cfr',
+            'dcfr',
+            'es-mccfr',
+            'os-mccfr',
+        ],
+    )
     parser.add_argument(
         '--seed',
         type=int,
@@ -23,6 +23,7 @@ def train(args):
         save_interval=args.save_interval,
         num_actor_devices=args.num_actor_devices,
         num_actors=args.num_actors,
+        num_envs_per_actor=args.num_envs_per_actor,
         training_device=args.training_device,
     )
 
@@ -85,6 +86,12 @@ if __name__ == '__main__':
         type=int,
         help='The number of actors for each simulation device',
     )
+    parser.add_argument(
+        '--num_envs_per_actor',
+        default=1,
+        type=int,
+        help='The number of games driven by each actor',
+    )
     parser.add_argument(
         '--training_device',
         default="0",
@@ -9,7 +9,9 @@ if 'torch' in installed_packages:
     from rlcard.agents.dqn_agent import DQNAgent as DQNAgent
     from rlcard.agents.nfsp_agent import NFSPAgent as NFSPAgent
 
-from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.cfr_agent import CFRAgent, CFRPlusAgent, LinearCFRAgent, DCFRAgent
+from rlcard.agents.mccfr_agent import MCCFRAgent
+from rlcard.agents.pimc_agent import PIMCAgent
 from rlcard.agents.human_agents.limit_holdem_human_agent import HumanAgent as LimitholdemHumanAgent
 from rlcard.agents.human_agents.nolimit_holdem_human_agent import HumanAgent as NolimitholdemHumanAgent
 from rlcard.agents.human_agents.leduc_holdem_human_agent import HumanAgent as LeducholdemHumanAgent
@@ -1,31 +1,170 @@
 import numpy as np
-import collections
 
 import os
 import pickle
 
 from rlcard.utils.utils import *
 
+class InfosetIndex(object):
+    ''' Map the keys of information sets to the rows of contiguous 2-D arrays.
+        Each array holds one table (regrets, policy or average policy), so
+        that all the information sets can be updated with single vectorized
+        NumPy operations.
+    '''
+
+    tables = ('regrets', 'policy', 'average_policy')
+
+    def __init__(self, num_actions, capacity=1024):
+        ''' Initialize the index
+
+        Args:
+            num_actions (int): The number of actions, i.e., the width of the tables
+            capacity (int): The number of rows allocated in advance
+        '''
+        self.num_actions = num_actions
+        self.rows = {}
+        self.regrets = np.zeros((capacity, num_actions))
+        self.policy = np.full((capacity, num_actions), 1.0 / num_actions)
+        self.average_policy = np.zeros((capacity, num_actions))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def get(self, key):
+        ''' Get the row of an information set, adding it if it is new
+
+        Args:
+            key (bytes): The key of the information set
+
+        Returns:
+            (int): The row of the information set in the tables
+        '''
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.rows)
+            if row == self.regrets.shape[0]:
+                self._grow()
+            self.rows[key] = row
+        return row
+
+    def _grow(self):
+        ''' Double the number of allocated rows
+        '''
+        capacity = self.regrets.shape[0]
+        for name in self.tables:
+            table = getattr(self, name)
+            new_table = np.empty((2 * capacity, self.num_actions))
+            new_table[:capacity] = table
+            new_table[capacity:] = 1.0 / self.num_actions if name == 'policy' else 0.0
+            setattr(self, name, new_table)
+
+    def __getstate__(self):
+        # Only save the used rows
+        state = self.__dict__.copy()
+        for name in self.tables:
+            state[name] = getattr(self, name)[:len(self.rows)].copy()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Keep at least one free row so that the tables are never empty
+        num_rows = len(self.rows)
+        for name in self.tables:
+            table = np.full((max(num_rows, 1), self.num_actions), 1.0 / self.num_actions if name == 'policy' else 0.0)
+            table[:num_rows] = getattr(self, name)[:num_rows]
+            setattr(self, name, table)
+
+    @classmethod
+    def from_dicts(cls, num_actions, regrets, policy, average_policy):
+        ''' Build the index from the dictionaries of the older model format
+
+        Args:
+            num_actions (int): The number of actions
+            regrets (dict): state_str -> action regrets
+            policy (dict): state_str -> action probabilities
+            average_policy (dict): state_str -> accumulated action probabilities
+
+        Returns:
+            (InfosetIndex): The index holding the same tables
+        '''
+        index = cls(num_actions, capacity=max(len(policy), len(regrets), len(average_policy), 1))
+        for name, table in zip(cls.tables, (regrets, policy, average_policy)):
+            for key, value in table.items():
+                getattr(index, name)[index.get(key)] = value
+        return index
+
+class InfosetTable(object):
+    ''' A dictionary-like view of one table of an InfosetIndex
+    '''
+
+    def __init__(self, index, name):
+        ''' Initialize the view
+
+        Args:
+            index (InfosetIndex): The index that holds the table
+            name (str): The name of the table
+        '''
+        self.index = index
+        self.name = name
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __iter__(self):
+        return iter(self.index.rows)
+
+    def keys(self):
+        return self.index.rows.keys()
+
+    def __getitem__(self, key):
+        return getattr(self.index, self.name)[self.index.rows[key]]
+
+    def __setitem__(self, key, value):
+        row = self.index.get(key)
+        getattr(self.index, self.name)[row] = value
+
 class CFRAgent():
     ''' Implement CFR (chance sampling) algorithm
     '''
 
-    def __init__(self, env, model_path='./cfr_model'):
+    def __init__(self, env, model_path='./cfr_model', alternating_updates=False,
+                 pruning_threshold=None, pruning_start=0, pruning_prob=0.95):
         ''' Initilize Agent
 
         Args:
             env (Env): Env class
+            model_path (str): The path to save and load the model
+            alternating_updates (boolean): If True, the policy is updated after
+                the traversal of each player, so that the later players
+                traverse against the updated policy
+            pruning_threshold (float): If set, enables regret-based pruning.
+                The actions of the traverser whose regret is below the threshold
+                and which have zero probability are not explored
+            pruning_start (int): The iteration after which pruning is enabled
+            pruning_prob (float): The probability that a traversal is pruned.
+                The other traversals explore every action, so that the regrets
+                of the pruned actions can recover
         '''
         self.use_raw = False
         self.env = env
         self.model_path = model_path
-
-        # A policy is a dict state_str -> action probabilities
-        self.policy = collections.defaultdict(list)
-        self.average_policy = collections.defaultdict(np.array)
-
-        # Regret is a dict state_str -> action regrets
-        self.regrets = collections.defaultdict(np.array)
+        self.alternating_updates = alternating_updates
+        self.pruning_threshold = pruning_threshold
+        self.pruning_start = pruning_start
+        self.pruning_prob = pruning_prob
+        self.pruning = False
+
+        # The regrets, policy and average policy of every information set
+        # are stored in the rows of contiguous arrays. The dictionary-like
+        # views map state_str -> action regrets / probabilities
+        self.infosets = InfosetIndex(self.env.num_actions)
+        self._set_tables()
 
         self.iteration = 0
 
@@ -38,10 +177,20 @@ class CFRAgent():
         for player_id in range(self.env.num_players):
             self.env.reset()
             probs = np.ones(self.env.num_players)
+            self.pruning = (self.pruning_threshold is not None
+                            and self.iteration > self.pruning_start
+                            and np.random.rand() < self.pruning_prob)
             self.traverse_tree(probs, player_id)
+            if self.alternating_updates:
+                self.update_policy()
+        self.pruning = False
+
+        # Discount the accumulated regrets and average policy
+        self.discount()
 
         # Update policy
-        self.update_policy()
+        if not self.alternating_updates:
+            self.update_policy()
 
     def traverse_tree(self, probs, player_id):
         ''' Traverse the game tree, update the regrets
@@ -63,6 +212,12 @@ class CFRAgent():
         obs, legal_actions = self.get_state(current_player)
         action_probs = self.action_probs(obs, legal_actions, self.policy)
 
+        if self.pruning and current_player == player_id:
+            # Skip the actions that are not played and have very negative regrets
+            regrets = self.infosets.regrets[self.infosets.get(obs)]
+            legal_actions = [action for action in legal_actions
+                             if action_probs[action] > 0 or regrets[action] >= self.pruning_threshold]
+
         for action in legal_actions:
             action_prob = action_probs[action]
             new_probs = probs.copy()
@@ -85,23 +240,34 @@ class CFRAgent():
                                 np.prod(probs[current_player + 1:]))
         player_state_utility = state_utility[current_player]
 
-        if obs not in self.regrets:
-            self.regrets[obs] = np.zeros(self.env.num_actions)
-        if obs not in self.average_policy:
-            self.average_policy[obs] = np.zeros(self.env.num_actions)
-        for action in legal_actions:
-            action_prob = action_probs[action]
-            regret = counterfactual_prob * (action_utilities[action][current_player]
-                    - player_state_utility)
-            self.regrets[obs][action] += regret
-            self.average_policy[obs][action] += self.iteration * player_prob * action_prob
+        # The tables may have been reallocated while traversing the children,
+        # so look up the row only now
+        row = self.infosets.get(obs)
+        legal_actions = np.array(legal_actions)
+        utilities = np.array([action_utilities[action][current_player] for action in legal_actions])
+        self.infosets.regrets[row, legal_actions] += counterfactual_prob * (utilities - player_state_utility)
+        self.infosets.average_policy[row, legal_actions] += self.average_weight() * player_prob * action_probs[legal_actions]
         return state_utility
 
+    def average_weight(self):
+        ''' The weight of the current policy in the average policy
+
+        Returns:
+            (float): The weight. Vanilla CFR weights the policy of iteration t by t
+        '''
+        return self.iteration
+
+    def discount(self):
+        ''' Discount the tables at the end of an iteration. Vanilla CFR
+            keeps the sums as they are
+        '''
+        pass
+
     def update_policy(self):
         ''' Update policy based on the current regrets
         '''
-        for obs in self.regrets:
-            self.policy[obs] = self.regret_matching(obs)
+        num_rows = len(self.infosets)
+        self.infosets.policy[:num_rows] = self._regret_matching(self.infosets.regrets[:num_rows])
 
     def regret_matching(self, obs):
         ''' Apply regret matching
@@ -109,17 +275,22 @@ class CFRAgent():
         Args:
             obs (string): The state_str
         '''
-        regret = self.regrets[obs]
-        positive_regret_sum = sum([r for r in regret if r > 0])
+        return self._regret_matching(self.regrets[obs][np.newaxis])[0]
 
-        action_probs = np.zeros(self.env.num_actions)
-        if positive_regret_sum > 0:
-            for action in range(self.env.num_actions):
-                action_probs[action] = max(0.0, regret[action] / positive_regret_sum)
-        else:
-            for action in range(self.env.num_actions):
-                action_probs[action] = 1.0 / self.env.num_actions
-        return action_probs
+    def _regret_matching(self, regrets):
+        ''' Apply regret matching to a batch of information sets
+
+        Args:
+            regrets (numpy.array): The regrets with shape (num_infosets, num_actions)
+
+        Returns:
+            (numpy.array): The action probabilities with the same shape
+        '''
+        positive_regrets = np.maximum(regrets, 0.0)
+        positive_regret_sums = positive_regrets.sum(axis=1, keepdims=True)
+        return np.where(positive_regret_sums > 0,
+                        positive_regrets / np.where(positive_regret_sums > 0, positive_regret_sums, 1.0),
+                        1.0 / self.env.num_actions)
 
     def action_probs(self, obs, legal_actions, policy):
         ''' Obtain the action probabilities of the current state
@@ -135,9 +306,9 @@ class CFRAgent():
                 action_probs(numpy.array): The action probabilities
                 legal_actions (list): Indices of legal actions
         '''
-        if obs not in policy.keys():
-            action_probs = np.array([1.0/self.env.num_actions for _ in range(self.env.num_actions)])
-            self.policy[obs] = action_probs
+        if obs not in policy:
+            # New information sets start with the uniform policy
+            action_probs = self.policy[obs] = np.full(self.env.num_actions, 1.0 / self.env.num_actions)
         else:
             action_probs = policy[obs]
         action_probs = remove_illegal(action_probs, legal_actions)
@@ -153,7 +324,7 @@ class CFRAgent():
             action (int): Predicted action
             info (dict): A dictionary containing information
         '''
-        probs = self.action_probs(state['obs'].tostring(), list(state['legal_actions'].keys()), self.average_policy)
+        probs = self.action_probs(state['obs'].tobytes(), list(state['legal_actions'].keys()), self.average_policy)
         action = np.random.choice(len(probs), p=probs)
 
         info = {}
@@ -173,7 +344,14 @@ class CFRAgent():
                 legal_actions (list): Indices of legal actions
         '''
         state = self.env.get_state(player_id)
-        return state['obs'].tostring(), list(state['legal_actions'].keys())
+        return state['obs'].tobytes(), list(state['legal_actions'].keys())
+
+    def _set_tables(self):
+        ''' Set the dictionary-like views of the tables
+        '''
+        self.regrets = InfosetTable(self.infosets, 'regrets')
+        self.policy = InfosetTable(self.infosets, 'policy')
+        self.average_policy = InfosetTable(self.infosets, 'average_policy')
 
     def save(self):
         ''' Save model
@@ -181,17 +359,9 @@ class CFRAgent():
         if not os.path.exists(self.model_path):
             os.makedirs(self.model_path)
 
-        policy_file = open(os.path.join(self.model_path, 'policy.pkl'),'wb')
-        pickle.dump(self.policy, policy_file)
-        policy_file.close()
-
-        average_policy_file = open(os.path.join(self.model_path, 'average_policy.pkl'),'wb')
-        pickle.dump(self.average_policy, average_policy_file)
-        average_policy_file.close()
-
-        regrets_file = open(os.path.join(self.model_path, 'regrets.pkl'),'wb')
-        pickle.dump(self.regrets, regrets_file)
-        regrets_file.close()
+        infosets_file = open(os.path.join(self.model_path, 'infosets.pkl'),'wb')
+        pickle.dump(self.infosets, infosets_file)
+        infosets_file.close()
 
         iteration_file = open(os.path.join(self.model_path, 'iteration.pkl'),'wb')
         pickle.dump(self.iteration, iteration_file)
@@ -199,23 +369,111 @@ class CFRAgent():
 
     def load(self):
         ''' Load model
+
+        Note: Models saved as separate policy, average policy and regrets
+              dictionaries are converted to the array-backed tables.
         '''
         if not os.path.exists(self.model_path):
             return
 
-        policy_file = open(os.path.join(self.model_path, 'policy.pkl'),'rb')
-        self.policy = pickle.load(policy_file)
-        policy_file.close()
-
-        average_policy_file = open(os.path.join(self.model_path, 'average_policy.pkl'),'rb')
-        self.average_policy = pickle.load(average_policy_file)
-        average_policy_file.close()
-
-        regrets_file = open(os.path.join(self.model_path, 'regrets.pkl'),'rb')
-        self.regrets = pickle.load(regrets_file)
-        regrets_file.close()
+        infosets_path = os.path.join(self.model_path, 'infosets.pkl')
+        if os.path.exists(infosets_path):
+            infosets_file = open(infosets_path,'rb')
+            self.infosets = pickle.load(infosets_file)
+            infosets_file.close()
+        else:
+            tables = []
+            for name in InfosetIndex.tables:
+                table_file = open(os.path.join(self.model_path, name + '.pkl'),'rb')
+                tables.append(pickle.load(table_file))
+                table_file.close()
+            self.infosets = InfosetIndex.from_dicts(self.env.num_actions, *tables)
+        self._set_tables()
 
         iteration_file = open(os.path.join(self.model_path, 'iteration.pkl'),'rb')
         self.iteration = pickle.load(iteration_file)
         iteration_file.close()
 
+class CFRPlusAgent(CFRAgent):
+    ''' Implement CFR+ (Tammelin, 2014). The regrets are floored at zero
+        after every iteration, the updates alternate between the players and
+        the average policy weights iteration t by max(t - delay, 0).
+    '''
+
+    def __init__(self, env, model_path='./cfr_plus_model', delay=0, **kwargs):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class
+            model_path (str): The path to save and load the model
+            delay (int): The number of iterations skipped by the average policy
+            kwargs: The other arguments of CFRAgent
+        '''
+        kwargs.setdefault('alternating_updates', True)
+        super().__init__(env, model_path, **kwargs)
+        self.delay = delay
+
+    def average_weight(self):
+        ''' Linear averaging, delayed by self.delay iterations
+        '''
+        return max(self.iteration - self.delay, 0)
+
+    def discount(self):
+        ''' Floor the regrets at zero (regret matching+)
+        '''
+        num_rows = len(self.infosets)
+        np.maximum(self.infosets.regrets[:num_rows], 0.0, out=self.infosets.regrets[:num_rows])
+
+class DCFRAgent(CFRAgent):
+    ''' Implement Discounted CFR (Brown and Sandholm, 2019). At the end of
+        iteration t, the positive regrets are multiplied by t^alpha / (t^alpha + 1),
+        the negative regrets by t^beta / (t^beta + 1) and the average policy
+        by (t / (t + 1))^gamma.
+    '''
+
+    def __init__(self, env, model_path='./dcfr_model', alpha=1.5, beta=0.0, gamma=2.0, **kwargs):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class
+            model_path (str): The path to save and load the model
+            alpha (float): The discount exponent of the positive regrets
+            beta (float): The discount exponent of the negative regrets
+            gamma (float): The discount exponent of the average policy
+            kwargs: The other arguments of CFRAgent
+        '''
+        super().__init__(env, model_path, **kwargs)
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+
+    def average_weight(self):
+        ''' The earlier policies are discounted in self.discount
+        '''
+        return 1.0
+
+    def discount(self):
+        ''' Discount the regrets and the average policy
+        '''
+        t = float(self.iteration)
+        positive_discount = t ** self.alpha / (t ** self.alpha + 1)
+        negative_discount = t ** self.beta / (t ** self.beta + 1)
+        num_rows = len(self.infosets)
+        regrets = self.infosets.regrets[:num_rows]
+        regrets *= np.where(regrets > 0, positive_discount, negative_discount)
+        self.infosets.average_policy[:num_rows] *= (t / (t + 1)) ** self.gamma
+
+class LinearCFRAgent(DCFRAgent):
+    ''' Implement Linear CFR, which weights the regrets and the policy of
+        iteration t by t. It is equivalent to DCFR with alpha = beta = gamma = 1.
+    '''
+
+    def __init__(self, env, model_path='./linear_cfr_model', **kwargs):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class
+            model_path (str): The path to save and load the model
+            kwargs: The other arguments of CFRAgent
+        '''
+        super().__init__(env, model_path, alpha=1.0, beta=1.0, gamma=1.0, **kwargs)
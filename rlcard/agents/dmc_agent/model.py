@@ -59,7 +59,21 @@ class DMCAgent:
 
     def step(self, state):
         action_keys, values = self.predict(state)
+        return self._explore(action_keys, values)
 
+    def step_batch(self, states):
+        ''' Choose the actions of several states, e.g., of the games driven
+            by one actor, with a single forward pass
+
+        Args:
+            states (list): The states
+
+        Returns:
+            (list): One action per state
+        '''
+        return [self._explore(action_keys, values) for action_keys, values in self.predict_batch(states)]
+
+    def _explore(self, action_keys, values):
         if self.exp_epsilon > 0 and np.random.rand() < self.exp_epsilon:
             action = np.random.choice(action_keys)
         else:
@@ -89,6 +103,35 @@ class DMCAgent:
         return self.net.parameters()
 
     def predict(self, state):
+        return self.predict_batch([state])[0]
+
+    def predict_batch(self, states):
+        ''' Predict the values of the legal actions of several states. The
+            (state, action) pairs of all the states are evaluated together.
+
+        Args:
+            states (list): The states
+
+        Returns:
+            (list): A (action_keys, values) tuple per state
+        '''
+        all_action_keys, all_obs, all_action_values = [], [], []
+        for state in states:
+            action_keys, obs, action_values = self._prepare(state)
+            all_action_keys.append(action_keys)
+            all_obs.append(obs)
+            all_action_values.append(action_values)
+
+        # Predict Q values
+        with torch.no_grad():
+            values = self.net.forward(torch.from_numpy(np.concatenate(all_obs)).to(self.device),
+                                      torch.from_numpy(np.concatenate(all_action_values)).to(self.device))
+        values = values.cpu().numpy()
+
+        splits = np.cumsum([len(action_keys) for action_keys in all_action_keys])[:-1]
+        return list(zip(all_action_keys, np.split(values, splits)))
+
+    def _prepare(self, state):
         # Prepare obs and actions
         obs = state['obs'].astype(np.float32)
         legal_actions = state['legal_actions']
@@ -103,11 +146,7 @@ class DMCAgent:
 
         obs = np.repeat(obs[np.newaxis, :], len(action_keys), axis=0)
 
-        # Predict Q values
-        values = self.net.forward(torch.from_numpy(obs).to(self.device),
-                                  torch.from_numpy(action_values).to(self.device))
-
-        return action_keys, values.cpu().detach().numpy()
+        return action_keys, obs, action_values
 
     def forward(self, obs, actions):
         return self.net.forward(obs, actions)
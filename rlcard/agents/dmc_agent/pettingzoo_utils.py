@@ -1,9 +1,10 @@
 import traceback
+from copy import deepcopy
 
 import numpy as np
 import torch
 
-from .utils import log
+from .utils import log, pull_weights
 from rlcard.utils import run_game_pettingzoo
 
 def create_buffers_pettingzoo(
@@ -48,10 +49,17 @@ def act_pettingzoo(
     full_queue,
     model,
     buffers,
-    env
+    env,
+    shared_model=None,
+    versions=None
 ):
     log.info('Device %s Actor %i started.', str(device), i)
     try:
+        # Act with a private copy of the agents that pulls the weights
+        # published to the shared model before every game
+        if shared_model is not None:
+            model = deepcopy(model)
+            local_versions = [-1 for _ in range(env.num_agents)]
         done_buf = [[] for _ in range(env.num_agents)]
         episode_return_buf = [[] for _ in range(env.num_agents)]
         target_buf = [[] for _ in range(env.num_agents)]
@@ -60,6 +68,9 @@ def act_pettingzoo(
         size = [0 for _ in range(env.num_agents)]
 
         while True:
+            if shared_model is not None:
+                for p, agent in enumerate(model.get_agents()):
+                    local_versions[p] = pull_weights(agent, shared_model.get_agent(p), versions[p], local_versions[p])
             trajectories = run_game_pettingzoo(env, model.agents, is_training=True)
             for agent_id, agent_name in enumerate(env.possible_agents):
                 traj_size = len(trajectories[agent_name]) // 2
@@ -28,7 +28,8 @@ from .file_writer import FileWriter
 from .model import DMCModel
 from .pettingzoo_model import DMCModelPettingZoo
 from .utils import (
-    get_batch,
+    BatchPrefetcher,
+    publish_weights,
     create_buffers,
     create_optimizers,
     act,
@@ -45,14 +46,16 @@ def compute_loss(logits, targets):
 
 def learn(
     position,
-    actor_models,
+    shared_model,
     agent,
     batch,
     optimizer,
     training_device,
     max_grad_norm,
     mean_episode_return_buf,
-    lock
+    lock,
+    publish_lock,
+    versions
 ):
     """Performs a learning (optimization) step."""
     device = "cuda:"+str(training_device) if training_device != "cpu" else "cpu"
@@ -75,9 +78,13 @@ def learn(
         nn.utils.clip_grad_norm_(agent.parameters(), max_grad_norm)
         optimizer.step()
 
-        for actor_model in actor_models.values():
-            actor_model.get_agent(position).load_state_dict(agent.state_dict())
-        return stats
+        # Snapshot the weights on the training device, so that the other
+        # learner threads can go on while they are published
+        state_dict = {name: tensor.detach().clone() for name, tensor in agent.state_dict().items()}
+
+    with publish_lock:
+        publish_weights(state_dict, shared_model, position, versions)
+    return stats
 
 
 class DMCTrainer:    
@@ -91,6 +98,10 @@ class DMCTrainer:
         save_interval (int): Time interval (in minutes) at which to save the model
         num_actor_devices (int): The number devices used for simulation
         num_actors (int): Number of actors for each simulation device
+        num_envs_per_actor (int): Number of games driven by each actor. The
+            actions of the games are chosen with batched forward passes. Each
+            game holds one buffer per player while it writes, so num_buffers
+            must exceed num_actors * num_envs_per_actor + batch_size
         training_device (str): The index of the GPU used for training models, or `cpu`.
         savedir (string): Root dir where experiment data will be saved
         total_frames (int): Total environment frames to train for
@@ -115,6 +126,7 @@ class DMCTrainer:
         save_interval=30,
         num_actor_devices=1,
         num_actors=5,
+        num_envs_per_actor=1,
         training_device="0",
         savedir='experiments/dmc_result',
         total_frames=100000000000,
@@ -129,6 +141,13 @@ class DMCTrainer:
         momentum=0,
         epsilon=0.00001
     ):
+        # Every game holds a buffer of each player while it writes and the
+        # learner takes batch_size full buffers at a time. With fewer buffers
+        # the actors and the learner wait for each other forever
+        if num_buffers <= num_actors * num_envs_per_actor + batch_size:
+            raise ValueError(
+                'num_buffers ({}) must exceed num_actors * num_envs_per_actor + batch_size ({})'.format(
+                    num_buffers, num_actors * num_envs_per_actor + batch_size))
         self.env = env
 
         self.plogger = FileWriter(
@@ -148,6 +167,7 @@ class DMCTrainer:
         self.save_interval = save_interval
         self.num_actor_devices = num_actor_devices
         self.num_actors = num_actors
+        self.num_envs_per_actor = num_envs_per_actor
         self.training_device = training_device
         self.total_frames = total_frames
         self.exp_epsilon = exp_epsilon
@@ -218,6 +238,13 @@ class DMCTrainer:
                 self.device_iterator,
             )
 
+        # The learner publishes its weights to one shared CPU model, which
+        # the actors of all the devices pull from when its version changes
+        shared_model = self.model_func('cpu')
+        shared_model.share_memory()
+        shared_model.eval()
+        versions = torch.zeros(self.num_players, dtype=torch.int64).share_memory_()
+
         # Initialize queues
         actor_processes = []
         ctx = mp.get_context('spawn')
@@ -258,44 +285,44 @@ class DMCTrainer:
             for p in range(self.num_players):
                 learner_model.get_agent(p).load_state_dict(checkpoint_states["model_state_dict"][p])
                 optimizers[p].load_state_dict(checkpoint_states["optimizer_state_dict"][p])
-                for device in self.device_iterator:
-                    models[device].get_agent(p).load_state_dict(learner_model.get_agent(p).state_dict())
             stats = checkpoint_states["stats"]
             frames = checkpoint_states["frames"]
             log.info(f"Resuming preempted job, current stats:\n{stats}")
 
+        for p in range(self.num_players):
+            publish_weights(learner_model.get_agent(p).state_dict(), shared_model, p, versions)
 
         # Starting actor processes
         for device in self.device_iterator:
             num_actors = self.num_actors
             for i in range(self.num_actors):
+                args = (i, device, self.T, free_queue[device], full_queue[device], models[device], buffers[device], self.env)
+                if not self.is_pettingzoo_env:
+                    args += (self.num_envs_per_actor,)
+                args += (shared_model, versions)
                 actor = ctx.Process(
                     target=act_pettingzoo if self.is_pettingzoo_env else act,
-                    args=(i, device, self.T, free_queue[device], full_queue[device], models[device], buffers[device], self.env))
+                    args=args)
                 actor.start()
                 actor_processes.append(actor)
 
-        def batch_and_learn(i, device, position, local_lock, position_lock, lock=threading.Lock()):
+        def batch_and_learn(i, device, position, prefetcher, position_lock, publish_lock, lock=threading.Lock()):
             """Thread target for the learning process."""
             nonlocal frames, stats
             while frames < self.total_frames:
-                batch = get_batch(
-                    free_queue[device][position],
-                    full_queue[device][position],
-                    buffers[device][position],
-                    self.B,
-                    local_lock
-                )
+                batch = prefetcher.get()
                 _stats = learn(
                     position,
-                    models,
+                    shared_model,
                     learner_model.get_agent(position),
                     batch,
                     optimizers[position],
                     self.training_device,
                     self.max_grad_norm,
                     self.mean_episode_return_buf,
-                    position_lock
+                    position_lock,
+                    publish_lock,
+                    versions
                 )
 
                 with lock:
@@ -312,8 +339,21 @@ class DMCTrainer:
                     free_queue[device][p].put(m)
 
         threads = []
-        locks = {device: [threading.Lock() for _ in range(self.num_players)] for device in self.device_iterator}
+        training_device = "cuda:"+str(self.training_device) if self.training_device != "cpu" else "cpu"
+        prefetchers = {
+            device: [
+                BatchPrefetcher(
+                    free_queue[device][p],
+                    full_queue[device][p],
+                    buffers[device][p],
+                    self.B,
+                    training_device)
+                for p in range(self.num_players)
+            ]
+            for device in self.device_iterator
+        }
         position_locks = [threading.Lock() for _ in range(self.num_players)]
+        publish_locks = [threading.Lock() for _ in range(self.num_players)]
 
         for device in self.device_iterator:
             for i in range(self.num_threads):
@@ -325,8 +365,9 @@ class DMCTrainer:
                             i,
                             device,
                             position,
-                            locks[device][position],
-                            position_locks[position])
+                            prefetchers[device][position],
+                            position_locks[position],
+                            publish_locks[position])
                         )
                     thread.start()
                     threads.append(thread)
@@ -14,7 +14,10 @@
 # limitations under the License.
 
 import logging
+import queue
+import threading
 import traceback
+from copy import deepcopy
 
 import numpy as np
 import torch
@@ -34,10 +37,13 @@ def get_batch(
     full_queue,
     buffers,
     batch_size,
-    lock
+    lock=None
 ):
-    with lock:
+    if lock is None:
         indices = [full_queue.get() for _ in range(batch_size)]
+    else:
+        with lock:
+            indices = [full_queue.get() for _ in range(batch_size)]
     batch = {
         key: torch.stack([buffers[key][m] for m in indices], dim=1)
         for key in buffers
@@ -46,6 +52,88 @@ def get_batch(
         free_queue.put(m)
     return batch
 
+class BatchPrefetcher:
+    """
+    Assembles the batches of one position in a background thread, so that
+    the next batch is stacked (and moved to the training device) while the
+    learner trains on the current one. The thread is the only consumer of
+    the full queue, so the learner threads do not lock around it.
+
+    Args:
+        free_queue (SimpleQueue): The indices of the free buffers
+        full_queue (SimpleQueue): The indices of the buffers ready for learning
+        buffers (dict): The shared buffers of the position
+        batch_size (int): The number of buffers in a batch
+        device (str): The training device
+        num_prefetch (int): The number of batches staged ahead
+    """
+    def __init__(self, free_queue, full_queue, buffers, batch_size, device, num_prefetch=2):
+        self.free_queue = free_queue
+        self.full_queue = full_queue
+        self.buffers = buffers
+        self.batch_size = batch_size
+        self.device = device
+        self.batches = queue.Queue(maxsize=num_prefetch)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            batch = get_batch(self.free_queue, self.full_queue, self.buffers, self.batch_size)
+            if self.device != 'cpu':
+                batch = {key: batch[key].pin_memory().to(self.device, non_blocking=True) for key in batch}
+            self.batches.put(batch)
+
+    def get(self):
+        """Get the next batch, waiting for it if it is not ready"""
+        return self.batches.get()
+
+def publish_weights(state_dict, shared_model, position, versions):
+    """
+    Copy the weights of a learner agent into the shared model that the
+    actors pull from.
+
+    The copy is guarded by a version counter per position, used as a
+    sequence lock: it is odd while the weights are written and is bumped to
+    the next even number when they are complete. Actors keep private copies
+    of the weights and pull them with pull_weights when the version changes,
+    without any lock. There must be one writer at a time for each position.
+
+    Args:
+        state_dict (dict): The weights of the learner agent
+        shared_model (DMCModel): The shared model, in shared memory
+        position (int): The position of the agent
+        versions (Tensor): The shared int64 versions of the positions
+    """
+    with torch.no_grad():
+        versions[position] += 1
+        for name, tensor in shared_model.get_agent(position).state_dict().items():
+            tensor.copy_(state_dict[name])
+        versions[position] += 1
+
+def pull_weights(local_agent, shared_agent, version, local_version):
+    """
+    Copy the weights published for a position into a private agent if they
+    are newer. The pull is given up if the weights are being written, or are
+    rewritten during the copy, and tried again at the next call.
+
+    Args:
+        local_agent (DMCAgent): The private agent of the actor
+        shared_agent (DMCAgent): The shared agent the learner publishes to
+        version (Tensor): The version of the shared agent
+        local_version (int): The version of the private agent
+
+    Returns:
+        (int): The version of the private agent after the pull
+    """
+    start_version = int(version)
+    if start_version == local_version or start_version % 2 == 1:
+        return local_version
+    local_agent.load_state_dict(shared_agent.state_dict())
+    if int(version) != start_version:
+        return -1
+    return start_version
+
 def create_buffers(
     T,
     num_buffers,
@@ -94,6 +182,82 @@ def create_optimizers(
         optimizers.append(optimizer)
     return optimizers
 
+class BufferWriter:
+    """
+    Writes the transitions of one player straight into the shared buffers.
+
+    The writer holds a free buffer and a cursor into its time dimension.
+    The state and action of every step are copied into the slot under the
+    cursor, and the cursor moves on to a new free buffer when the current
+    one is full. The targets are only known when the episode ends, so the
+    full buffers are passed to the learner once the episodes that they
+    contain are finished.
+
+    Args:
+        T (int): The unroll length
+        free_queue (SimpleQueue): The indices of the free buffers
+        full_queue (SimpleQueue): The indices of the buffers ready for learning
+        buffers (dict): The shared buffers of the player
+    """
+    def __init__(self, T, free_queue, full_queue, buffers):
+        self.T = T
+        self.free_queue = free_queue
+        self.full_queue = full_queue
+        self.buffers = buffers
+
+        # The current buffer and the cursor in it
+        self.index = None
+        self.t = 0
+
+        # The (index, start, end) slots of the ongoing episode and the full
+        # buffers that wait for the episode to end
+        self.episode_slots = []
+        self.waiting = []
+
+    def write(self, state, action):
+        """Write the state and the action feature of one step"""
+        if self.index is None:
+            self.index = self.free_queue.get()
+            self.t = 0
+        _copy_to_slot(self.buffers['state'][self.index][self.t], state)
+        _copy_to_slot(self.buffers['action'][self.index][self.t], action)
+
+        if self.episode_slots and self.episode_slots[-1][0] == self.index:
+            self.episode_slots[-1][2] = self.t + 1
+        else:
+            self.episode_slots.append([self.index, self.t, self.t + 1])
+
+        self.t += 1
+        if self.t == self.T:
+            self.waiting.append(self.index)
+            self.index = None
+
+    def finish_episode(self, payoff):
+        """Write the targets of the finished episode and pass the
+        buffers that are full to the learner"""
+        if not self.episode_slots:
+            return
+        for index, start, end in self.episode_slots:
+            self.buffers['target'][index][start:end] = payoff
+            self.buffers['done'][index][start:end] = False
+            self.buffers['episode_return'][index][start:end] = 0.0
+        index, _, end = self.episode_slots[-1]
+        self.buffers['done'][index][end-1] = True
+        self.buffers['episode_return'][index][end-1] = payoff
+        self.episode_slots = []
+
+        for index in self.waiting:
+            self.full_queue.put(index)
+        self.waiting = []
+
+def _copy_to_slot(slot, array):
+    """Copy an array into a buffer slot. CPU slots are written through a
+    NumPy view, which also takes read-only rows of action feature matrices."""
+    if slot.device.type == 'cpu':
+        slot.numpy()[...] = array
+    else:
+        slot.copy_(torch.as_tensor(np.array(array)))
+
 def act(
     i,
     device,
@@ -102,57 +266,56 @@ def act(
     full_queue,
     model,
     buffers,
-    env
+    env,
+    num_envs=1,
+    shared_model=None,
+    versions=None
 ):
     try:
         log.info('Device %s Actor %i started.', str(device), i)
 
-        # Configure environment
-        env.seed(i)
-        env.set_agents(model.get_agents())
+        # If the learner publishes versioned weights to a shared model, act
+        # with private copies of the agents that pull them when the version
+        # changes. Otherwise act with the agents of model
+        if shared_model is None:
+            agents = model.get_agents()
+        else:
+            agents = deepcopy(model).get_agents()
+            shared_agents = shared_model.get_agents()
+            local_versions = [-1 for _ in range(env.num_players)]
 
-        done_buf = [[] for _ in range(env.num_players)]
-        episode_return_buf = [[] for _ in range(env.num_players)]
-        target_buf = [[] for _ in range(env.num_players)]
-        state_buf = [[] for _ in range(env.num_players)]
-        action_buf = [[] for _ in range(env.num_players)]
-        size = [0 for _ in range(env.num_players)]
+        # Configure environments. The actor drives num_envs games and
+        # chooses the actions of all the games waiting for the same player
+        # with one forward pass
+        envs = [env] + [deepcopy(env) for _ in range(num_envs-1)]
+        writers = []
+        states, player_ids = [], []
+        for k, _env in enumerate(envs):
+            _env.seed(i * num_envs + k)
+            _env.set_agents(agents)
+            writers.append([BufferWriter(T, free_queue[p], full_queue[p], buffers[p]) for p in range(env.num_players)])
+            state, player_id = _env.reset()
+            states.append(state)
+            player_ids.append(player_id)
 
         while True:
-            trajectories, payoffs = env.run(is_training=True)
-            for p in range(env.num_players):
-                size[p] += len(trajectories[p][:-1]) // 2
-                diff = size[p] - len(target_buf[p])
-                if diff > 0:
-                    done_buf[p].extend([False for _ in range(diff-1)])
-                    done_buf[p].append(True)
-                    episode_return_buf[p].extend([0.0 for _ in range(diff-1)])
-                    episode_return_buf[p].append(float(payoffs[p]))
-                    target_buf[p].extend([float(payoffs[p]) for _ in range(diff)])
-                    # State and action
-                    for i in range(0, len(trajectories[p])-2, 2):
-                        state = trajectories[p][i]['obs']
-                        action = env.get_action_feature(trajectories[p][i+1])
-                        state_buf[p].append(torch.from_numpy(state))
-                        action_buf[p].append(torch.from_numpy(action))
-                
-                while size[p] > T:
-                    index = free_queue[p].get()
-                    if index is None:
-                        break
-                    for t in range(T):
-                        buffers[p]['done'][index][t, ...] = done_buf[p][t]
-                        buffers[p]['episode_return'][index][t, ...] = episode_return_buf[p][t]
-                        buffers[p]['target'][index][t, ...] = target_buf[p][t]
-                        buffers[p]['state'][index][t, ...] = state_buf[p][t]
-                        buffers[p]['action'][index][t, ...] = action_buf[p][t]
-                    full_queue[p].put(index)
-                    done_buf[p] = done_buf[p][T:]
-                    episode_return_buf[p] = episode_return_buf[p][T:]
-                    target_buf[p] = target_buf[p][T:]
-                    state_buf[p] = state_buf[p][T:]
-                    action_buf[p] = action_buf[p][T:]
-                    size[p] -= T
+            waiting = {}
+            for k, player_id in enumerate(player_ids):
+                waiting.setdefault(player_id, []).append(k)
+            for p, ks in waiting.items():
+                if shared_model is not None:
+                    local_versions[p] = pull_weights(agents[p], shared_agents[p], versions[p], local_versions[p])
+                actions = agents[p].step_batch([states[k] for k in ks])
+                for k, action in zip(ks, actions):
+                    _env = envs[k]
+                    writers[k][p].write(states[k]['obs'], _env.get_action_feature(action))
+                    states[k], player_ids[k] = _env.step(action)
+
+                    if _env.is_over():
+                        payoffs = _env.get_payoffs()
+                        for _p in range(_env.num_players):
+                            writers[k][_p].finish_episode(float(payoffs[_p]))
+                        states[k], player_ids[k] = _env.reset()
 
     except KeyboardInterrupt:
         pass
@@ -25,17 +25,12 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
-import random
 import numpy as np
 import torch
 import torch.nn as nn
-from collections import namedtuple
-from copy import deepcopy
 
 from rlcard.utils.utils import remove_illegal
 
-Transition = namedtuple('Transition', ['state', 'action', 'reward', 'next_state', 'legal_actions', 'done'])
-
 
 class DQNAgent(object):
     '''
@@ -56,7 +51,11 @@ class DQNAgent(object):
                  train_every=1,
                  mlp_layers=None,
                  learning_rate=0.00005,
-                 device=None):
+                 device=None,
+                 prioritized_replay=False,
+                 prioritized_replay_alpha=0.6,
+                 prioritized_replay_beta=0.4,
+                 target_update_tau=None):
 
         '''
         Q-Learning algorithm for off-policy TD control using Function Approximation.
@@ -81,10 +80,17 @@ class DQNAgent(object):
             mlp_layers (list): The layer number and the dimension of each layer in MLP
             learning_rate (float): The learning rate of the DQN agent.
             device (torch.device): whether to use the cpu or gpu
+            prioritized_replay (boolean): Sample the transitions proportionally to their TD errors
+            prioritized_replay_alpha (float): How much the TD errors skew the sampling
+            prioritized_replay_beta (float): The exponent of the importance sampling weights
+            target_update_tau (float): If set, the target estimator moves towards the Q estimator
+              by this fraction after every training step (Polyak averaging) instead of being
+              overwritten every update_target_estimator_every steps
         '''
         self.use_raw = False
         self.replay_memory_init_size = replay_memory_init_size
         self.update_target_estimator_every = update_target_estimator_every
+        self.target_update_tau = target_update_tau
         self.discount_factor = discount_factor
         self.epsilon_decay_steps = epsilon_decay_steps
         self.batch_size = batch_size
@@ -111,9 +117,17 @@ class DQNAgent(object):
             mlp_layers=mlp_layers, device=self.device)
         self.target_estimator = Estimator(num_actions=num_actions, learning_rate=learning_rate, state_shape=state_shape, \
             mlp_layers=mlp_layers, device=self.device)
+        # Start the target network from the weights of the Q network, which
+        # matters for the soft updates that only move it a little at a time
+        self.target_estimator.sync_with(self.q_estimator)
 
         # Create replay memory
-        self.memory = Memory(replay_memory_size, batch_size)
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            self.memory = PrioritizedMemory(replay_memory_size, batch_size, num_actions,
+                                            alpha=prioritized_replay_alpha, beta=prioritized_replay_beta)
+        else:
+            self.memory = Memory(replay_memory_size, batch_size, num_actions)
 
     def feed(self, ts):
         ''' Store data in to replay buffer and train the agent. There are two stages.
@@ -124,7 +138,7 @@ class DQNAgent(object):
             ts (list): a list of 5 elements that represent the transition
         '''
         (state, action, reward, next_state, done) = tuple(ts)
-        self.feed_memory(state['obs'], action, reward, next_state['obs'], list(next_state['legal_actions'].keys()), done)
+        self.feed_memory(state['obs'], action, reward, next_state['obs'], self._get_legal_actions_mask(next_state), done)
         self.total_t += 1
         tmp = self.total_t - self.replay_memory_init_size
         if tmp>=0 and tmp%self.train_every == 0:
@@ -179,11 +193,23 @@ class DQNAgent(object):
         '''
         
         q_values = self.q_estimator.predict_nograd(np.expand_dims(state['obs'], 0))[0]
-        masked_q_values = -np.inf * np.ones(self.num_actions, dtype=float)
-        legal_actions = list(state['legal_actions'].keys())
-        masked_q_values[legal_actions] = q_values[legal_actions]
+        return np.where(self._get_legal_actions_mask(state), q_values, -np.inf)
 
-        return masked_q_values
+    def _get_legal_actions_mask(self, state):
+        ''' Get the boolean mask of the legal actions of a state. The mask is
+            built from the legal action IDs if the env does not provide it.
+
+        Args:
+            state (dict): A state
+
+        Returns:
+            legal_actions_mask (numpy.array): A boolean array of shape (num_actions,)
+        '''
+        if 'legal_actions_mask' in state:
+            return state['legal_actions_mask']
+        legal_actions_mask = np.zeros(self.num_actions, dtype=bool)
+        legal_actions_mask[list(state['legal_actions'])] = True
+        return legal_actions_mask
 
     def train(self):
         ''' Train the network
@@ -191,32 +217,40 @@ class DQNAgent(object):
         Returns:
             loss (float): The loss of the current batch.
         '''
-        state_batch, action_batch, reward_batch, next_state_batch, legal_actions_batch, done_batch = self.memory.sample()
-
-        # Calculate best next actions using Q-network (Double DQN)
-        q_values_next = self.q_estimator.predict_nograd(next_state_batch)
-        legal_actions = []
-        for b in range(self.batch_size):
-            legal_actions.extend([i + b * self.num_actions for i in legal_actions_batch[b]])
-        masked_q_values = -np.inf * np.ones(self.num_actions * self.batch_size, dtype=float)
-        masked_q_values[legal_actions] = q_values_next.flatten()[legal_actions]
-        masked_q_values = masked_q_values.reshape((self.batch_size, self.num_actions))
-        best_actions = np.argmax(masked_q_values, axis=1)
-
-        # Evaluate best next actions using Target-network (Double DQN)
-        q_values_next_target = self.target_estimator.predict_nograd(next_state_batch)
-        target_batch = reward_batch + np.invert(done_batch).astype(np.float32) * \
-            self.discount_factor * q_values_next_target[np.arange(self.batch_size), best_actions]
+        if self.prioritized_replay:
+            state_batch, action_batch, reward_batch, next_state_batch, legal_actions_batch, done_batch, \
+                indices, weights = self.memory.sample()
+        else:
+            state_batch, action_batch, reward_batch, next_state_batch, legal_actions_batch, done_batch = self.memory.sample()
 
-        # Perform gradient descent update
-        state_batch = np.array(state_batch)
+        with torch.no_grad():
+            next_state_batch = torch.from_numpy(next_state_batch).float().to(self.device)
+            legal_actions_batch = torch.from_numpy(legal_actions_batch).to(self.device)
 
-        loss = self.q_estimator.update(state_batch, action_batch, target_batch)
+            # Calculate best next actions using Q-network (Double DQN)
+            q_values_next = self.q_estimator.qnet(next_state_batch)
+            best_actions = q_values_next.masked_fill(~legal_actions_batch, -np.inf).argmax(dim=1, keepdim=True)
+
+            # Evaluate best next actions using Target-network (Double DQN)
+            q_values_next_target = self.target_estimator.qnet(next_state_batch).gather(1, best_actions).squeeze(1)
+            not_done_batch = torch.from_numpy(~done_batch).float().to(self.device)
+            target_batch = torch.from_numpy(reward_batch).to(self.device) + \
+                not_done_batch * self.discount_factor * q_values_next_target
+            target_batch = target_batch.cpu().numpy()
+
+        # Perform gradient descent update
+        if self.prioritized_replay:
+            loss, td_errors = self.q_estimator.update(state_batch, action_batch, target_batch, weights)
+            self.memory.update_priorities(indices, td_errors)
+        else:
+            loss = self.q_estimator.update(state_batch, action_batch, target_batch)
         print('\rINFO - Step {}, rl-loss: {}'.format(self.total_t, loss), end='')
 
         # Update the target estimator
-        if self.train_t % self.update_target_estimator_every == 0:
-            self.target_estimator = deepcopy(self.q_estimator)
+        if self.target_update_tau is not None:
+            self.target_estimator.sync_with(self.q_estimator, self.target_update_tau)
+        elif self.train_t % self.update_target_estimator_every == 0:
+            self.target_estimator.sync_with(self.q_estimator)
             print("\nINFO - Copied model parameters to target network.")
 
         self.train_t += 1
@@ -297,7 +331,23 @@ class Estimator(object):
             q_as = self.qnet(s).cpu().numpy()
         return q_as
 
-    def update(self, s, a, y):
+    def sync_with(self, estimator, tau=1.0):
+        ''' Move the parameters and buffers of the network towards those of
+            another estimator in place, without allocating new tensors
+
+        Args:
+          estimator (Estimator): The estimator to copy from
+          tau (float): The interpolation factor, 1 copies the parameters
+        '''
+        with torch.no_grad():
+            source_state = estimator.qnet.state_dict()
+            for name, tensor in self.qnet.state_dict().items():
+                if tau == 1.0 or not tensor.is_floating_point():
+                    tensor.copy_(source_state[name])
+                else:
+                    tensor.lerp_(source_state[name], tau)
+
+    def update(self, s, a, y, weights=None):
         ''' Updates the estimator towards the given targets.
             In this case y is the target-network estimated
             value of the Q-network optimal actions, which
@@ -307,9 +357,11 @@ class Estimator(object):
           s (np.ndarray): (batch, state_shape) state representation
           a (np.ndarray): (batch,) integer sampled actions
           y (np.ndarray): (batch,) value of optimal actions according to Q-target
+          weights (np.ndarray): (batch,) importance sampling weights of the squared errors
 
         Returns:
-          The calculated loss on the batch.
+          The calculated loss on the batch. If weights are given, the TD
+          errors of the batch are returned as well.
         '''
         self.optimizer.zero_grad()
 
@@ -326,14 +378,21 @@ class Estimator(object):
         Q = torch.gather(q_as, dim=-1, index=a.unsqueeze(-1)).squeeze(-1)
 
         # update model
-        batch_loss = self.mse_loss(Q, y)
+        if weights is None:
+            batch_loss = self.mse_loss(Q, y)
+        else:
+            td_errors = y - Q
+            w = torch.from_numpy(weights).float().to(self.device)
+            batch_loss = torch.mean(w * td_errors ** 2)
         batch_loss.backward()
         self.optimizer.step()
         batch_loss = batch_loss.item()
 
         self.qnet.eval()
 
-        return batch_loss
+        if weights is None:
+            return batch_loss
+        return batch_loss, td_errors.detach().cpu().numpy()
 
 
 class EstimatorNetwork(nn.Module):
@@ -373,18 +432,40 @@ class EstimatorNetwork(nn.Module):
         '''
         return self.fc_layers(s)
 
+
 class Memory(object):
-    ''' Memory for saving transitions
+    ''' Memory for saving transitions. The transitions are kept in
+        preallocated arrays that are written as a ring buffer, so saving
+        a transition takes constant time and a minibatch is gathered
+        with one fancy index per field.
     '''
 
-    def __init__(self, memory_size, batch_size):
+    def __init__(self, memory_size, batch_size, num_actions):
         ''' Initialize
         Args:
             memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled minibatches
+            num_actions (int): the width of the legal action masks
         '''
         self.memory_size = memory_size
         self.batch_size = batch_size
-        self.memory = []
+        self.num_actions = num_actions
+
+        # The number of stored transitions and the slot written next
+        self.size = 0
+        self.position = 0
+
+        # The state arrays are allocated on the first save, when the shape
+        # and dtype of the observations are known
+        self.states = None
+        self.next_states = None
+        self.actions = np.zeros(memory_size, dtype=np.int64)
+        self.rewards = np.zeros(memory_size, dtype=np.float32)
+        self.legal_actions = np.zeros((memory_size, num_actions), dtype=bool)
+        self.dones = np.zeros(memory_size, dtype=bool)
+
+    def __len__(self):
+        return self.size
 
     def save(self, state, action, reward, next_state, legal_actions, done):
         ''' Save transition into memory
@@ -394,23 +475,196 @@ class Memory(object):
             action (int): the performed action ID
             reward (float): the reward received
             next_state (numpy.array): the next state after performing the action
-            legal_actions (list): the legal actions of the next state
+            legal_actions (list or numpy.array): the legal actions of the next
+                state, as action IDs or as a boolean mask
+            done (boolean): whether the episode is finished
+
+        Returns:
+            (int): The slot where the transition is stored
+        '''
+        if self.states is None:
+            state = np.asarray(state)
+            self.states = np.zeros((self.memory_size,) + state.shape, dtype=state.dtype)
+            self.next_states = np.zeros_like(self.states)
+
+        index = self.position
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = next_state
+        self.legal_actions[index] = False
+        self.legal_actions[index, legal_actions] = True
+        self.dones[index] = done
+
+        self.position = (index + 1) % self.memory_size
+        self.size = min(self.size + 1, self.memory_size)
+        return index
+
+    def sample(self):
+        ''' Sample a minibatch from the replay memory, uniformly with replacement
+
+        Returns:
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            legal_actions_batch (numpy.array): a batch of boolean legal action masks
+            done_batch (numpy.array): a batch of dones
+        '''
+        indices = np.random.randint(self.size, size=self.batch_size)
+        return self.gather(indices)
+
+    def gather(self, indices):
+        ''' Get the transitions stored in the given slots
+
+        Args:
+            indices (numpy.array): The slots to read
+
+        Returns:
+            (tuple): The batches in the order returned by sample
+        '''
+        return (self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.legal_actions[indices], self.dones[indices])
+
+class PrioritizedMemory(Memory):
+    ''' Memory for prioritized experience replay. The transitions are sampled
+        with probability proportional to priority ** alpha, where the priority
+        is the absolute TD error of the last update on the transition. New
+        transitions get the largest priority seen so far.
+
+        See the paper https://arxiv.org/abs/1511.05952 for more details.
+    '''
+
+    def __init__(self, memory_size, batch_size, num_actions, alpha=0.6, beta=0.4, epsilon=1e-6):
+        ''' Initialize
+        Args:
+            memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled minibatches
+            num_actions (int): the width of the legal action masks
+            alpha (float): how much the priorities skew the sampling, 0 is uniform
+            beta (float): the exponent of the importance sampling weights
+            epsilon (float): added to the priorities so that every transition can be sampled
+        '''
+        super().__init__(memory_size, batch_size, num_actions)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.tree = SumTree(memory_size)
+
+    def save(self, state, action, reward, next_state, legal_actions, done):
+        ''' Save transition into memory with the largest priority
+
+        Args:
+            state (numpy.array): the current state
+            action (int): the performed action ID
+            reward (float): the reward received
+            next_state (numpy.array): the next state after performing the action
+            legal_actions (list or numpy.array): the legal actions of the next
+                state, as action IDs or as a boolean mask
             done (boolean): whether the episode is finished
+
+        Returns:
+            (int): The slot where the transition is stored
         '''
-        if len(self.memory) == self.memory_size:
-            self.memory.pop(0)
-        transition = Transition(state, action, reward, next_state, legal_actions, done)
-        self.memory.append(transition)
+        index = super().save(state, action, reward, next_state, legal_actions, done)
+        self.tree.update(np.array([index]), self.max_priority ** self.alpha)
+        return index
 
     def sample(self):
-        ''' Sample a minibatch from the replay memory
+        ''' Sample a minibatch from the replay memory with stratified
+            proportional sampling
+
+        Returns:
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            legal_actions_batch (numpy.array): a batch of boolean legal action masks
+            done_batch (numpy.array): a batch of dones
+            indices (numpy.array): the sampled slots, to update their priorities
+            weights (numpy.array): the normalized importance sampling weights
+        '''
+        total = self.tree.total()
+        values = (np.arange(self.batch_size) + np.random.random_sample(self.batch_size)) * total / self.batch_size
+        indices = self.tree.find(values)
+        probs = self.tree.get(indices) / total
+        weights = (self.size * probs) ** -self.beta
+        weights = (weights / weights.max()).astype(np.float32)
+        return self.gather(indices) + (indices, weights)
+
+    def update_priorities(self, indices, td_errors):
+        ''' Set the priorities of sampled transitions from their TD errors
+
+        Args:
+            indices (numpy.array): The slots returned by sample
+            td_errors (numpy.array): The TD errors of the transitions
+        '''
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+class SumTree(object):
+    ''' A binary tree stored in an array where every node holds the sum of
+        its children. The leaves hold the sampling weights, so a leaf can
+        be drawn proportionally to its weight in logarithmic time. Lookups
+        and updates are vectorized over a batch of leaves.
+    '''
+
+    def __init__(self, capacity):
+        ''' Initialize
+        Args:
+            capacity (int): the number of leaves
+        '''
+        self.depth = max(int(np.ceil(np.log2(max(capacity, 1)))), 0)
+        self.num_leaves = 1 << self.depth
+        self.nodes = np.zeros(2 * self.num_leaves, dtype=np.float64)
+
+    def total(self):
+        ''' Get the sum of all the leaves
+        '''
+        return self.nodes[1]
+
+    def get(self, indices):
+        ''' Get the weights of some leaves
+
+        Args:
+            indices (numpy.array): The leaf indices
+
+        Returns:
+            (numpy.array): The weights
+        '''
+        return self.nodes[indices + self.num_leaves]
+
+    def update(self, indices, weights):
+        ''' Set the weights of some leaves and the sums above them
+
+        Args:
+            indices (numpy.array): The leaf indices
+            weights (numpy.array or float): The new weights
+        '''
+        nodes = indices + self.num_leaves
+        self.nodes[nodes] = weights
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+
+    def find(self, values):
+        ''' Find the leaves at some positions of the cumulative sum of the weights
+
+        Args:
+            values (numpy.array): Positions in [0, total)
 
         Returns:
-            state_batch (list): a batch of states
-            action_batch (list): a batch of actions
-            reward_batch (list): a batch of rewards
-            next_state_batch (list): a batch of states
-            done_batch (list): a batch of dones
+            (numpy.array): The leaf indices
         '''
-        samples = random.sample(self.memory, self.batch_size)
-        return map(np.array, zip(*samples))
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sums = self.nodes[left]
+            # Never step into an empty subtree because of rounding errors
+            go_right = (values >= left_sums) & (self.nodes[left + 1] > 0)
+            values -= np.where(go_right, left_sums, 0)
+            nodes = left + go_right
+        return nodes - self.num_leaves
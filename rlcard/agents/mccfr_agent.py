@@ -0,0 +1,153 @@
+''' Monte Carlo CFR (MCCFR) agents with external and outcome sampling.
+
+See the paper http://mlanctot.info/files/papers/nips09mccfr.pdf for more details.
+'''
+import numpy as np
+
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.utils.utils import remove_illegal
+
+class MCCFRAgent(CFRAgent):
+    ''' Implement Monte Carlo CFR. The chance events are sampled when the
+        environment is reset, and the actions of the players are sampled
+        while the tree is traversed with Env.step and Env.step_back, so the
+        cost of an iteration does not grow with the size of the game tree.
+
+        External sampling enumerates the actions of the traverser and samples
+        one action of every other player. Outcome sampling samples a single
+        trajectory per traversal and corrects the regrets by importance
+        sampling.
+
+        The average policy is updated at the nodes of the player that acts
+        after the traverser (simple averaging). This is exact in two-player
+        games and an approximation with more players.
+    '''
+
+    def __init__(self, env, model_path='./mccfr_model', sampling='external', epsilon=0.6):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class
+            model_path (str): The path to save and load the model
+            sampling (str): 'external' or 'outcome'
+            epsilon (float): The exploration of the traverser in outcome sampling
+        '''
+        if sampling not in ('external', 'outcome'):
+            raise ValueError('Unknown sampling scheme {}'.format(sampling))
+        super().__init__(env, model_path)
+        self.sampling = sampling
+        self.epsilon = epsilon
+
+    def train(self):
+        ''' Do one iteration of MCCFR
+        '''
+        self.iteration += 1
+        for player_id in range(self.env.num_players):
+            self.env.reset()
+            if self.sampling == 'external':
+                self.traverse_external(player_id)
+            else:
+                self.traverse_outcome(player_id, 1.0, 1.0, 1.0)
+
+    def traverse_external(self, player_id):
+        ''' Traverse the game tree with external sampling, update the regrets
+
+        Args:
+            player_id (int): The player to update the value
+
+        Returns:
+            (float): The sampled utility of the player
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id]
+
+        current_player = self.env.get_player_id()
+        obs, legal_actions = self.get_state(current_player)
+        action_probs = self.current_policy(obs, legal_actions)
+
+        if not current_player == player_id:
+            if current_player == (player_id + 1) % self.env.num_players:
+                row = self.infosets.get(obs)
+                self.infosets.average_policy[row, legal_actions] += action_probs[legal_actions]
+            action = np.random.choice(len(action_probs), p=action_probs)
+            self.env.step(action)
+            utility = self.traverse_external(player_id)
+            self.env.step_back()
+            return utility
+
+        action_utilities = np.zeros(self.env.num_actions)
+        for action in legal_actions:
+            self.env.step(action)
+            action_utilities[action] = self.traverse_external(player_id)
+            self.env.step_back()
+        state_utility = np.dot(action_probs, action_utilities)
+
+        row = self.infosets.get(obs)
+        self.infosets.regrets[row, legal_actions] += action_utilities[legal_actions] - state_utility
+        return state_utility
+
+    def traverse_outcome(self, player_id, player_reach, opponent_reach, sample_reach):
+        ''' Sample a trajectory with outcome sampling, update the regrets
+
+        Args:
+            player_id (int): The player to update the value
+            player_reach (float): The reach probability of the player
+            opponent_reach (float): The reach probability of the other players
+            sample_reach (float): The probability of sampling the trajectory so far
+
+        Returns:
+            (tuple) that contains:
+                utility (float): The sampled utility of the player, divided
+                    by the probability of sampling the trajectory
+                tail_reach (float): The probability of the rest of the
+                    trajectory under the current policy
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id] / sample_reach, 1.0
+
+        current_player = self.env.get_player_id()
+        obs, legal_actions = self.get_state(current_player)
+        action_probs = self.current_policy(obs, legal_actions)
+
+        if current_player == player_id:
+            sample_probs = (1 - self.epsilon) * action_probs
+            sample_probs[legal_actions] += self.epsilon / len(legal_actions)
+        else:
+            sample_probs = action_probs
+        action = np.random.choice(len(sample_probs), p=sample_probs)
+
+        self.env.step(action)
+        if current_player == player_id:
+            utility, tail_reach = self.traverse_outcome(player_id, player_reach * action_probs[action],
+                                                        opponent_reach, sample_reach * sample_probs[action])
+        else:
+            utility, tail_reach = self.traverse_outcome(player_id, player_reach,
+                                                        opponent_reach * action_probs[action],
+                                                        sample_reach * sample_probs[action])
+        self.env.step_back()
+
+        row = self.infosets.get(obs)
+        if current_player == player_id:
+            weighted_utility = utility * opponent_reach
+            self.infosets.regrets[row, legal_actions] -= weighted_utility * tail_reach * action_probs[action]
+            self.infosets.regrets[row, action] += weighted_utility * tail_reach
+        elif current_player == (player_id + 1) % self.env.num_players:
+            self.infosets.average_policy[row, legal_actions] += opponent_reach / sample_reach * action_probs[legal_actions]
+
+        return utility, tail_reach * action_probs[action]
+
+    def current_policy(self, obs, legal_actions):
+        ''' Compute the current policy of an information set with regret
+            matching and record it in the policy table
+
+        Args:
+            obs (str): state_str
+            legal_actions (list): Indices of legal actions
+
+        Returns:
+            (numpy.array): The action probabilities, zero for illegal actions
+        '''
+        row = self.infosets.get(obs)
+        policy = self._regret_matching(self.infosets.regrets[row][np.newaxis])[0]
+        self.infosets.policy[row] = policy
+        return remove_illegal(policy, legal_actions)
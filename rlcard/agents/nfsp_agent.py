@@ -19,7 +19,8 @@
 See the paper https://arxiv.org/abs/1603.01121 for more details.
 '''
 
-import random
+import os
+import tempfile
 import collections
 import enum
 import numpy as np
@@ -62,7 +63,9 @@ class NFSPAgent(object):
                  q_train_every=1,
                  q_mlp_layers=None,
                  evaluate_with='average_policy',
-                 device=None):
+                 device=None,
+                 reservoir_buffer_dir=None,
+                 q_target_update_tau=None):
         ''' Initialize the NFSP agent.
 
         Args:
@@ -89,6 +92,10 @@ class NFSPAgent(object):
             q_train_step (int): Train the model every X steps.
             q_mlp_layers (list): The layer sizes of inner DQN agent.
             device (torch.device): Whether to use the cpu or gpu
+            reservoir_buffer_dir (str): If set, the reservoir buffer is kept in
+              memory-mapped files in a new subdirectory of this directory
+            q_target_update_tau (float): If set, the target network of inner DQN agent is
+              updated by Polyak averaging with this factor after every training step
         '''
         self.use_raw = False
         self._num_actions = num_actions
@@ -100,7 +107,7 @@ class NFSPAgent(object):
         self._anticipatory_param = anticipatory_param
         self._min_buffer_size_to_learn = min_buffer_size_to_learn
 
-        self._reservoir_buffer = ReservoirBuffer(reservoir_buffer_capacity)
+        self._reservoir_buffer = ReservoirBuffer(reservoir_buffer_capacity, reservoir_buffer_dir)
         self._prev_timestep = None
         self._prev_action = None
         self.evaluate_with = evaluate_with
@@ -120,7 +127,7 @@ class NFSPAgent(object):
         self._rl_agent = DQNAgent(q_replay_memory_size, q_replay_memory_init_size, \
             q_update_target_estimator_every, q_discount_factor, q_epsilon_start, q_epsilon_end, \
             q_epsilon_decay_steps, q_batch_size, num_actions, state_shape, q_train_every, q_mlp_layers, \
-            rl_learning_rate, device)
+            rl_learning_rate, device, target_update_tau=q_target_update_tau)
 
         # Build the average policy supervised model
         self._build_model()
@@ -260,17 +267,15 @@ class NFSPAgent(object):
             return None
 
         transitions = self._reservoir_buffer.sample(self._batch_size)
-        info_states = [t.info_state for t in transitions]
-        action_probs = [t.action_probs for t in transitions]
 
         self.policy_network_optimizer.zero_grad()
         self.policy_network.train()
 
         # (batch, state_size)
-        info_states = torch.from_numpy(np.array(info_states)).float().to(self.device)
+        info_states = torch.from_numpy(transitions.info_state).to(self.device)
 
         # (batch, num_actions)
-        eval_action_probs = torch.from_numpy(np.array(action_probs)).float().to(self.device)
+        eval_action_probs = torch.from_numpy(transitions.action_probs).to(self.device)
 
         # (batch, num_actions)
         log_forecast_action_probs = self.policy_network(info_states)
@@ -335,34 +340,108 @@ class AveragePolicyNetwork(nn.Module):
         return log_action_probs
 
 class ReservoirBuffer(object):
-    ''' Allows uniform sampling over a stream of data.
+    ''' Allows uniform sampling over a stream of (info_state, action_probs)
+    transitions.
 
-    This class supports the storage of arbitrary elements, such as observation
-    tensors, integer actions, etc.
+    The transitions are stored in two preallocated float32 arrays, which can
+    be memory-mapped files so that the capacity is not limited by the RAM.
+    The arrays are allocated on the first add, when the shapes are known.
 
     See https://en.wikipedia.org/wiki/Reservoir_sampling for more details.
     '''
 
-    def __init__(self, reservoir_buffer_capacity):
+    def __init__(self, reservoir_buffer_capacity, memmap_dir=None):
         ''' Initialize the buffer.
+
+        Args:
+            reservoir_buffer_capacity (int): The maximum number of transitions
+            memmap_dir (str): If set, the arrays are memory-mapped files in
+              a new subdirectory of this directory instead of in-memory arrays,
+              so that several buffers can share memmap_dir
         '''
         self._reservoir_buffer_capacity = reservoir_buffer_capacity
-        self._data = []
+        self._memmap_dir = memmap_dir
+        self._memmap_tmpdir = None
+        self.memmap_path = None
+        self._info_states = None
+        self._action_probs = None
+        self._size = 0
         self._add_calls = 0
 
+    def _allocate(self, info_state_shape, action_probs_shape):
+        ''' Allocate the arrays of the buffer
+
+        Args:
+            info_state_shape (tuple): The shape of one info state
+            action_probs_shape (tuple): The shape of one action probability vector
+        '''
+        info_states_shape = (self._reservoir_buffer_capacity,) + tuple(info_state_shape)
+        action_probs_shape = (self._reservoir_buffer_capacity,) + tuple(action_probs_shape)
+        if self._memmap_dir is None:
+            self._info_states = np.zeros(info_states_shape, dtype=np.float32)
+            self._action_probs = np.zeros(action_probs_shape, dtype=np.float32)
+        else:
+            os.makedirs(self._memmap_dir, exist_ok=True)
+            # The buffer owns its subdirectory, which is removed by close()
+            # or when the buffer is garbage collected
+            self._memmap_tmpdir = tempfile.TemporaryDirectory(prefix='reservoir_buffer_', dir=self._memmap_dir)
+            self.memmap_path = self._memmap_tmpdir.name
+            self._info_states = np.lib.format.open_memmap(os.path.join(self.memmap_path, 'info_states.npy'),
+                                                          mode='w+', dtype=np.float32, shape=info_states_shape)
+            self._action_probs = np.lib.format.open_memmap(os.path.join(self.memmap_path, 'action_probs.npy'),
+                                                           mode='w+', dtype=np.float32, shape=action_probs_shape)
+
     def add(self, element):
         ''' Potentially adds `element` to the reservoir buffer.
 
         Args:
-            element (object): data to be added to the reservoir buffer.
+            element (Transition): data to be added to the reservoir buffer.
         '''
-        if len(self._data) < self._reservoir_buffer_capacity:
-            self._data.append(element)
-        else:
-            idx = np.random.randint(0, self._add_calls + 1)
-            if idx < self._reservoir_buffer_capacity:
-                self._data[idx] = element
+        if self._info_states is None:
+            self._allocate(np.shape(element.info_state), np.shape(element.action_probs))
         self._add_calls += 1
+        if self._size < self._reservoir_buffer_capacity:
+            slot = self._size
+            self._size += 1
+        else:
+            # Replace a random slot with probability capacity / (number of elements seen so far)
+            slot = int(np.random.random_sample() * self._add_calls)
+            if slot >= self._reservoir_buffer_capacity:
+                return
+        self._info_states[slot] = element.info_state
+        self._action_probs[slot] = element.action_probs
+
+    def add_batch(self, info_states, action_probs):
+        ''' Potentially adds a batch of transitions to the reservoir buffer.
+        The result is the same as adding them one by one.
+
+        Args:
+            info_states (numpy.array): (batch, state_shape) info states
+            action_probs (numpy.array): (batch, num_actions) action probabilities
+        '''
+        info_states = np.asarray(info_states)
+        action_probs = np.asarray(action_probs)
+        if self._info_states is None:
+            self._allocate(info_states.shape[1:], action_probs.shape[1:])
+        num_elements = len(info_states)
+
+        # Fill the free slots first
+        num_free = min(self._reservoir_buffer_capacity - self._size, num_elements)
+        self._info_states[self._size:self._size+num_free] = info_states[:num_free]
+        self._action_probs[self._size:self._size+num_free] = action_probs[:num_free]
+        self._size += num_free
+
+        # The i-th of the remaining elements replaces a random slot with
+        # probability capacity / (number of elements seen so far)
+        seen = self._add_calls + np.arange(num_free, num_elements) + 1
+        slots = (np.random.random_sample(len(seen)) * seen).astype(np.int64)
+        kept = np.nonzero(slots < self._reservoir_buffer_capacity)[0]
+        # Later elements must win when the same slot is drawn twice
+        slots, last = np.unique(slots[kept][::-1], return_index=True)
+        kept = kept[::-1][last] + num_free
+        self._info_states[slots] = info_states[kept]
+        self._action_probs[slots] = action_probs[kept]
+        self._add_calls += num_elements
 
     def sample(self, num_samples):
         ''' Returns `num_samples` uniformly sampled from the buffer.
@@ -371,25 +450,60 @@ class ReservoirBuffer(object):
             num_samples (int): The number of samples to draw.
 
         Returns:
-            An iterable over `num_samples` random elements of the buffer.
+            (Transition): Contiguous float32 arrays of the sampled info states,
+              with shape (num_samples, state_shape), and of the action
+              probabilities, with shape (num_samples, num_actions). The arrays
+              can be passed to torch.from_numpy without a copy.
 
         Raises:
             ValueError: If there are less than `num_samples` elements in the buffer
         '''
-        if len(self._data) < num_samples:
+        if self._size < num_samples:
             raise ValueError("{} elements could not be sampled from size {}".format(
-                    num_samples, len(self._data)))
-        return random.sample(self._data, num_samples)
+                    num_samples, self._size))
+        if num_samples * 4 > self._size:
+            indices = np.sort(np.random.choice(self._size, num_samples, replace=False))
+        else:
+            indices = self._sample_distinct(num_samples)
+        return Transition(info_state=self._info_states[indices], action_probs=self._action_probs[indices])
+
+    def _sample_distinct(self, num_samples):
+        ''' Draw distinct indices of the buffer without permuting the whole
+        buffer, redrawing the duplicates
+
+        Args:
+            num_samples (int): The number of samples to draw.
+
+        Returns:
+            (numpy.array): Sorted distinct indices
+        '''
+        indices = np.unique(np.random.randint(self._size, size=num_samples))
+        while len(indices) < num_samples:
+            extra = np.random.randint(self._size, size=num_samples - len(indices))
+            indices = np.unique(np.concatenate((indices, extra)))
+        return indices
 
     def clear(self):
         ''' Clear the buffer
         '''
-        self._data = []
+        self._size = 0
+        self._add_calls = 0
+
+    def close(self):
+        ''' Release the arrays and remove the memory-mapped files, if any
+        '''
+        self._info_states = None
+        self._action_probs = None
+        self._size = 0
         self._add_calls = 0
+        if self._memmap_tmpdir is not None:
+            self._memmap_tmpdir.cleanup()
+            self._memmap_tmpdir = None
+            self.memmap_path = None
 
     def __len__(self):
-        return len(self._data)
+        return self._size
 
     def __iter__(self):
-        return iter(self._data)
-
+        for i in range(self._size):
+            yield Transition(info_state=self._info_states[i], action_probs=self._action_probs[i])
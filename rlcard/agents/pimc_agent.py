@@ -0,0 +1,273 @@
+''' Perfect information Monte Carlo (PIMC) agent for the card play of bridge and maria.
+
+At each decision the hidden hands are sampled many times, consistently with
+what the player has seen, every sample is solved as a perfect information
+game, and the action with the best value on average is played.
+'''
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from rlcard.games.bridge.utils.action_event import ActionEvent as BridgeActionEvent
+from rlcard.games.bridge.utils.double_dummy import DoubleDummySolver, DoubleDummyState
+from rlcard.games.bridge.utils.move import PlayCardMove as BridgePlayCardMove
+from rlcard.games.maria.utils.action_event import ActionEvent as MariaActionEvent
+from rlcard.games.maria.utils.move import PlayCardMove as MariaPlayCardMove, TradeCardMove
+from rlcard.games.maria.utils.paranoid_search import MariaParanoidSolver, MariaSearchState
+from rlcard.games.maria.utils.utils import suit_masks, hearts_mask, queen_of_spades_mask
+
+# The solvers of the worker processes, kept between decisions
+_solvers = {}
+
+
+def _get_solver(game_name, max_trick_count):
+    key = (game_name, max_trick_count)
+    if key not in _solvers:
+        if game_name == 'bridge':
+            _solvers[key] = DoubleDummySolver()
+        else:
+            _solvers[key] = MariaParanoidSolver(max_trick_count=max_trick_count)
+    return _solvers[key]
+
+
+def _analyze_samples(game_name, states, deadline, max_trick_count):
+    ''' Solve sampled states until the deadline
+
+    Args:
+        game_name (str): 'bridge' or 'maria'
+        states (list): The DoubleDummyStates or MariaSearchStates of the samples
+        deadline (float): The time.time() at which the search stops
+        max_trick_count (int): The number of tricks searched in maria
+
+    Returns:
+        (list): The dictionaries of card_id -> value of the samples solved in time
+    '''
+    solver = _get_solver(game_name, max_trick_count)
+    results = []
+    for state in states:
+        try:
+            results.append(solver.analyze(state, deadline=deadline))
+        except TimeoutError:
+            break
+    return results
+
+
+def _popcount(mask):
+    return bin(mask).count('1')
+
+
+def _iter_card_ids(mask):
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+class PIMCAgent(object):
+    ''' Perfect information Monte Carlo agent for bridge and maria.
+
+        The samples deal the unseen cards to the other players so that every
+        player keeps the number of cards in hand, holds the cards that the
+        agent knows about (the dummy in bridge, the traded cards in maria) and
+        has none of the suits it showed out of. Bridge samples are solved with
+        the double dummy solver (tricks of the side of the agent), maria
+        samples with a paranoid search of the next tricks (points of the agent).
+
+        The agent reads the history of the round from the game of the env it
+        is created with, so it must play in that env. It only plays the cards:
+        the calls of bridge are made by bidding_agent (passes by default) and
+        the trades of maria discard the most dangerous cards.
+    '''
+
+    def __init__(self, env, num_samples=32, time_budget=1.0, num_workers=0, max_trick_count=2,
+                 bidding_agent=None, seed=None):
+        ''' Initialize the agent
+
+        Args:
+            env (Env): The bridge or maria env the agent plays in
+            num_samples (int): The number of samples for each decision
+            time_budget (float): The seconds allowed for each decision. The samples
+                that are not solved in time are left out
+            num_workers (int): The number of processes that solve the samples,
+                0 to solve them in the calling process
+            max_trick_count (int): The number of tricks searched in maria
+            bidding_agent (object): The agent that makes the calls in bridge
+            seed (int): The seed of the sampling
+        '''
+        if env.name not in ('bridge', 'maria'):
+            raise ValueError('PIMCAgent only plays bridge and maria, got {}'.format(env.name))
+        self.use_raw = False
+        self.env = env
+        self.num_samples = num_samples
+        self.time_budget = time_budget
+        self.num_workers = num_workers
+        self.max_trick_count = max_trick_count
+        self.bidding_agent = bidding_agent
+        self.np_random = np.random.RandomState(seed)
+        self.pool = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 0 else None
+
+    def step(self, state):
+        ''' Predict the action given the current state
+
+        Args:
+            state (dict): The current state
+
+        Returns:
+            action (int): The action id
+        '''
+        return self.eval_step(state)[0]
+
+    def eval_step(self, state):
+        ''' Predict the action given the current state for evaluation
+
+        Args:
+            state (dict): The current state
+
+        Returns:
+            action (int): The action id
+            info (dict): The average value of each card played over the
+                samples ('values') and the number of samples solved ('num_samples')
+        '''
+        legal_actions = state['raw_legal_actions']
+        info = {'values': {}, 'num_samples': 0}
+        round = self.env.game.round
+        if self.env.name == 'bridge':
+            if not round.is_bidding_over():
+                if self.bidding_agent is not None:
+                    return self.bidding_agent.eval_step(state)[0], info
+                if BridgeActionEvent.pass_action_id in legal_actions:
+                    return BridgeActionEvent.pass_action_id, info
+                return legal_actions[0], info
+            first_action_id = BridgeActionEvent.first_play_card_action_id
+        else:
+            if not round.is_done_trading():
+                return self._get_trade_action(legal_actions), info
+            first_action_id = MariaActionEvent.first_play_card_action_id
+        if len(legal_actions) == 1:
+            return legal_actions[0], info
+
+        deadline = time.time() + self.time_budget
+        states = [self.sample_state() for _ in range(self.num_samples)]
+        if self.pool is None:
+            results = _analyze_samples(self.env.name, states, deadline, self.max_trick_count)
+        else:
+            futures = [self.pool.submit(_analyze_samples, self.env.name, list(chunk), deadline, self.max_trick_count)
+                       for chunk in np.array_split(np.array(states, dtype=object), self.num_workers) if len(chunk)]
+            results = [result for future in futures for result in future.result()]
+        if not results:
+            return self.np_random.choice(legal_actions), info
+
+        values = {}
+        for card_values in results:
+            for card_id, value in card_values.items():
+                values[first_action_id + card_id] = values.get(first_action_id + card_id, 0) + value
+        info['values'] = {action: value / len(results) for action, value in values.items()}
+        info['num_samples'] = len(results)
+        action = max(legal_actions, key=lambda action: info['values'][action])
+        return action, info
+
+    def sample_state(self):
+        ''' Deal the unseen cards of the current round at random, consistently with
+            the observations of the current player
+
+        Returns:
+            (DoubleDummyState or MariaSearchState): The sampled state to solve
+        '''
+        if self.env.name == 'bridge':
+            return self._sample_bridge_state()
+        return self._sample_maria_state()
+
+    def close(self):
+        ''' Shut down the worker processes
+        '''
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def _sample_bridge_state(self):
+        round = self.env.game.round
+        player_id = round.current_player_id
+        # the dummy is seen by everyone, and the dummy sees the declarer
+        dummy = round.get_dummy()
+        seen_player = dummy if dummy.player_id != player_id else round.get_declarer()
+        known_hands = [0, 0, 0, 0]
+        for seen_id in (player_id, seen_player.player_id):
+            known_hands[seen_id] = sum(1 << card.card_id for card in round.players[seen_id].hand)
+        play_moves = [move for move in round.move_sheet if isinstance(move, BridgePlayCardMove)]
+        hands = self._sample_hands(round, known_hands, self._get_void_masks(play_moves), play_moves)
+        state = DoubleDummyState.from_round(round)
+        state.hands = hands
+        return state
+
+    def _sample_maria_state(self):
+        round = self.env.game.round
+        player_id = round.current_player_id
+        known_hands = [0, 0, 0, 0]
+        known_hands[player_id] = round.players[player_id].hand_mask
+        play_moves = [move for move in round.move_sheet if isinstance(move, MariaPlayCardMove)]
+        played_mask = sum(1 << move.card.card_id for move in play_moves)
+        # the cards that the player traded are held by the next player until played
+        for move in round.move_sheet:
+            if isinstance(move, TradeCardMove) and move.player.player_id == player_id:
+                known_hands[(player_id + 1) % 4] |= (1 << move.card.card_id) & ~played_mask
+        void_masks = self._get_void_masks(play_moves)
+        # a heart led before hearts are broken shows a hand of hearts only
+        hearts_broken = False
+        for index in range(0, len(play_moves), 4):
+            trick_mask = sum(1 << move.card.card_id for move in play_moves[index:index + 4])
+            if not hearts_broken and index > 0 and play_moves[index].card.card_id // 13 == 2:
+                void_masks[play_moves[index].player.player_id] |= ~hearts_mask & ((1 << 52) - 1)
+            hearts_broken = hearts_broken or (len(play_moves) - index >= 4 and bool(trick_mask & hearts_mask))
+        hands = self._sample_hands(round, known_hands, void_masks, play_moves)
+        state = MariaSearchState.from_round(round)
+        state.hands = hands
+        return state
+
+    @staticmethod
+    def _get_void_masks(play_moves):
+        # the suits that each player did not follow
+        void_masks = [0, 0, 0, 0]
+        for index, move in enumerate(play_moves):
+            led_suit_index = play_moves[index - index % 4].card.card_id // 13
+            if move.card.card_id // 13 != led_suit_index:
+                void_masks[move.player.player_id] |= suit_masks[led_suit_index]
+        return void_masks
+
+    def _sample_hands(self, round, known_hands, void_masks, play_moves, max_tries=100):
+        # deal the unseen cards, the most constrained cards first, each to a player
+        # that can hold it with probability proportional to the cards the player still needs
+        hand_sizes = [len(player.hand) for player in round.players]
+        unseen_mask = (1 << 52) - 1
+        for move in play_moves:
+            unseen_mask &= ~(1 << move.card.card_id)
+        for known_hand in known_hands:
+            unseen_mask &= ~known_hand
+        unseen_card_ids = list(_iter_card_ids(unseen_mask))
+        for _ in range(max_tries):
+            hands = list(known_hands)
+            needs = [hand_size - _popcount(known_hand) for hand_size, known_hand in zip(hand_sizes, known_hands)]
+            self.np_random.shuffle(unseen_card_ids)
+            eligible_ids = {card_id: [player_id for player_id in range(4)
+                                      if needs[player_id] > 0 and not void_masks[player_id] >> card_id & 1]
+                            for card_id in unseen_card_ids}
+            for card_id in sorted(unseen_card_ids, key=lambda card_id: len(eligible_ids[card_id])):
+                player_ids = [player_id for player_id in eligible_ids[card_id] if needs[player_id] > 0]
+                if not player_ids:
+                    break
+                weights = np.array([needs[player_id] for player_id in player_ids], dtype=float)
+                deal_id = player_ids[self.np_random.choice(len(player_ids), p=weights / weights.sum())]
+                hands[deal_id] |= 1 << card_id
+                needs[deal_id] -= 1
+            else:
+                return hands
+        raise Exception('PIMCAgent: could not deal the unseen cards consistently with the observations')
+
+    def _get_trade_action(self, legal_actions):
+        # trade the queen, king and ace of spades first, then the highest hearts, then the highest cards
+        def get_danger(action):
+            card_id = action - MariaActionEvent.first_trade_card_action_id
+            card_mask = 1 << card_id
+            is_high_spade = card_id // 13 == 3 and card_mask >= queen_of_spades_mask
+            return is_high_spade, bool(card_mask & hearts_mask), card_id % 13
+        return max(legal_actions, key=get_danger)
@@ -14,6 +14,7 @@ from rlcard.games.bridge import Game
 from rlcard.games.bridge.game import BridgeGame
 from rlcard.games.bridge.utils.action_event import ActionEvent
 from rlcard.games.bridge.utils.bridge_card import BridgeCard
+from rlcard.games.bridge.utils.double_dummy import DoubleDummySolver
 from rlcard.games.bridge.utils.move import CallMove, PlayCardMove
 
 #   [] Why no_bid_action_id in bidding_rep ?
@@ -116,8 +117,16 @@ class BridgePayoffDelegate(object):
 
 class DefaultBridgePayoffDelegate(BridgePayoffDelegate):
 
-    def __init__(self):
+    def __init__(self, double_dummy_solver: DoubleDummySolver or None = None):
+        ''' Initialize the delegate
+
+        Args:
+            double_dummy_solver (DoubleDummySolver): If set, the tricks that are not played yet
+                are counted as if the rest of the deal were played double dummy, so the payoffs
+                of a contract are known as soon as the bidding is over
+        '''
         self.make_bid_bonus = 2
+        self.double_dummy_solver = double_dummy_solver
 
     def get_payoffs(self, game: BridgeGame):
         ''' Get the payoffs of players.
@@ -129,7 +138,10 @@ class DefaultBridgePayoffDelegate(BridgePayoffDelegate):
         if contract_bid_move:
             declarer = contract_bid_move.player
             bid_trick_count = contract_bid_move.action.bid_amount + 6
-            won_trick_counts = game.round.won_trick_counts
+            if self.double_dummy_solver is not None and game.round.is_bidding_over():
+                won_trick_counts = self.double_dummy_solver.get_trick_counts(game.round)
+            else:
+                won_trick_counts = game.round.won_trick_counts
             declarer_won_trick_count = won_trick_counts[declarer.player_id % 2]
             defender_won_trick_count = won_trick_counts[(declarer.player_id + 1) % 2]
             declarer_payoff = bid_trick_count + self.make_bid_bonus if bid_trick_count <= declarer_won_trick_count else declarer_won_trick_count - bid_trick_count
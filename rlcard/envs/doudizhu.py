@@ -1,4 +1,4 @@
-from collections import Counter, OrderedDict
+from collections import OrderedDict
 import numpy as np
 
 from rlcard.envs import Env
@@ -29,22 +29,29 @@ class DoudizhuEnv(Env):
         Args:
             state (dict): dict of original state
         '''
+        # The public part of the state is read from the incremental records
+        # of the round and the action encodings are looked up by ID
+        game_round = self.game.round
+        trace_action_ids = game_round.trace_action_ids
+        action_arrays = _get_action_arrays()
+
         current_hand = _cards2array(state['current_hand'])
         others_hand = _cards2array(state['others_hand'])
 
-        last_action = ''
-        if len(state['trace']) != 0:
-            if state['trace'][-1][1] == 'pass':
-                last_action = state['trace'][-2][1]
+        last_action = _NO_ACTION
+        if len(trace_action_ids) != 0:
+            if trace_action_ids[-1] == _PASS_ID:
+                last_action = trace_action_ids[-2]
             else:
-                last_action = state['trace'][-1][1]
-        last_action = _cards2array(last_action)
+                last_action = trace_action_ids[-1]
+        last_action = action_arrays[last_action]
 
-        last_9_actions = _action_seq2array(_process_action_seq(state['trace']))
+        last_9_actions = trace_action_ids[-9:]
+        last_9_actions = action_arrays[[_NO_ACTION] * (9 - len(last_9_actions)) + last_9_actions].flatten()
 
         if state['self'] == 0: # landlord
-            landlord_up_played_cards = _cards2array(state['played_cards'][2])
-            landlord_down_played_cards = _cards2array(state['played_cards'][1])
+            landlord_up_played_cards = _counts2array(game_round.played_cards[2])
+            landlord_down_played_cards = _counts2array(game_round.played_cards[1])
             landlord_up_num_cards_left = _get_one_hot_array(state['num_cards_left'][2], 17) 
             landlord_down_num_cards_left = _get_one_hot_array(state['num_cards_left'][1], 17)
             obs = np.concatenate((current_hand,
@@ -56,20 +63,17 @@ class DoudizhuEnv(Env):
                                   landlord_up_num_cards_left,
                                   landlord_down_num_cards_left))
         else:
-            landlord_played_cards = _cards2array(state['played_cards'][0])
-            for i, action in reversed(state['trace']):
-                if i == 0:
-                    last_landlord_action = action
-            last_landlord_action = _cards2array(last_landlord_action)
+            # The landlord and teammate actions have always been their first
+            # actions in the trace, which the encoding keeps
+            landlord_played_cards = _counts2array(game_round.played_cards[0])
+            landlord_action_ids = game_round.player_action_ids[0]
+            last_landlord_action = action_arrays[landlord_action_ids[0] if landlord_action_ids else _NO_ACTION]
             landlord_num_cards_left = _get_one_hot_array(state['num_cards_left'][0], 20)
 
             teammate_id = 3 - state['self']
-            teammate_played_cards = _cards2array(state['played_cards'][teammate_id])
-            last_teammate_action = 'pass'
-            for i, action in reversed(state['trace']):
-                if i == teammate_id:
-                    last_teammate_action = action
-            last_teammate_action = _cards2array(last_teammate_action)
+            teammate_played_cards = _counts2array(game_round.played_cards[teammate_id])
+            teammate_action_ids = game_round.player_action_ids[teammate_id]
+            last_teammate_action = action_arrays[teammate_action_ids[0] if teammate_action_ids else _NO_ACTION]
             teammate_num_cards_left = _get_one_hot_array(state['num_cards_left'][teammate_id], 17)
             obs = np.concatenate((current_hand,
                                   others_hand,
@@ -114,7 +118,8 @@ class DoudizhuEnv(Env):
             legal_actions (list): a list of legal actions' id
         '''
         legal_actions = self.game.state['actions']
-        legal_actions = {self._ACTION_2_ID[action]: _cards2array(action) for action in legal_actions}
+        action_arrays = _get_action_arrays()
+        legal_actions = {self._ACTION_2_ID[action]: action_arrays[self._ACTION_2_ID[action]] for action in legal_actions}
         return legal_actions
 
     def get_perfect_information(self):
@@ -131,56 +136,62 @@ class DoudizhuEnv(Env):
         state['legal_actions'] = self.game.state['actions']
         return state
 
-    def get_action_feature(self, action):
-        ''' For some environments such as DouDizhu, we can have action features
+    def _build_action_feature_matrix(self):
+        ''' The features of an action are the encodings of its cards
 
         Returns:
-            (numpy.array): The action features
+            (numpy.array): An array of shape (27472, 54)
         '''
-        return _cards2array(self._decode_action(action))
+        return _get_action_arrays()[:-1]
 
 Card2Column = {'3': 0, '4': 1, '5': 2, '6': 3, '7': 4, '8': 5, '9': 6, 'T': 7,
                'J': 8, 'Q': 9, 'K': 10, 'A': 11, '2': 12}
 
-NumOnes2Array = {0: np.array([0, 0, 0, 0]),
-                 1: np.array([1, 0, 0, 0]),
-                 2: np.array([1, 1, 0, 0]),
-                 3: np.array([1, 1, 1, 0]),
-                 4: np.array([1, 1, 1, 1])}
+# The encodings of the number of cards of a rank and of a joker
+_NUM_ONES_BYTES = [bytes([1] * num + [0] * (4 - num)) for num in range(5)]
+_JOKER_BYTES = [b'\x00', b'\x01']
 
 def _cards2array(cards):
     if cards == 'pass':
         return np.zeros(54, dtype=np.int8)
 
-    matrix = np.zeros([4, 13], dtype=np.int8)
-    jokers = np.zeros(2, dtype=np.int8)
-    counter = Counter(cards)
-    for card, num_times in counter.items():
-        if card == 'B':
-            jokers[0] = 1
-        elif card == 'R':
-            jokers[1] = 1
-        else:
-            matrix[:, Card2Column[card]] = NumOnes2Array[num_times]
-    return np.concatenate((matrix.flatten('F'), jokers))
+    return np.frombuffer(b''.join([_NUM_ONES_BYTES[cards.count(card)] for card in Card2Column]
+                                  + [_JOKER_BYTES['B' in cards], _JOKER_BYTES['R' in cards]]), dtype=np.int8)
+
+def _counts2array(counts):
+    ''' Encode the number of cards of each rank, in the order of Card2Column
+        followed by the black and red jokers, like _cards2array
+    '''
+    counts = counts.tolist()
+    return np.frombuffer(b''.join([_NUM_ONES_BYTES[num] for num in counts[:13]]
+                                  + [_JOKER_BYTES[counts[13] > 0], _JOKER_BYTES[counts[14] > 0]]), dtype=np.int8)
+
+# The encodings of all the actions, with an extra row of zeros at
+# _NO_ACTION for the empty slots of the action history. Built on first use,
+# which only takes a few milliseconds.
+_ACTION_ARRAYS = None
+_PASS_ID = None
+_NO_ACTION = None
+
+def _get_action_arrays():
+    global _ACTION_ARRAYS, _PASS_ID, _NO_ACTION
+    if _ACTION_ARRAYS is None:
+        from rlcard.games.doudizhu.utils import ACTION_PACKED, ACTION_2_ID
+        from rlcard.games.doudizhu.utils import _RANK_BITS
+
+        shifts = np.arange(15) * _RANK_BITS
+        counts = (ACTION_PACKED[:, np.newaxis] >> shifts) & ((1 << _RANK_BITS) - 1)
+        counts = np.concatenate((counts, np.zeros((1, 15), dtype=np.int64)))
+        matrix = np.arange(4) < counts[:, :13, np.newaxis]
+        action_arrays = np.concatenate((matrix.reshape(-1, 52), counts[:, 13:] > 0), axis=1).astype(np.int8)
+        action_arrays.setflags(write=False)
+        _PASS_ID = ACTION_2_ID['pass']
+        _NO_ACTION = len(ACTION_PACKED)
+        _ACTION_ARRAYS = action_arrays
+    return _ACTION_ARRAYS
 
 def _get_one_hot_array(num_left_cards, max_num_cards):
     one_hot = np.zeros(max_num_cards, dtype=np.int8)
     one_hot[num_left_cards - 1] = 1
 
     return one_hot
-
-def _action_seq2array(action_seq_list):
-    action_seq_array = np.zeros((len(action_seq_list), 54), np.int8)
-    for row, cards in enumerate(action_seq_list):
-        action_seq_array[row, :] = _cards2array(cards)
-    action_seq_array = action_seq_array.flatten()
-    return action_seq_array
-
-def _process_action_seq(sequence, length=9):
-    sequence = [action[1] for action in sequence[-length:]]
-    if len(sequence) < length:
-        empty_sequence = ['' for _ in range(length - len(sequence))]
-        empty_sequence.extend(sequence)
-        sequence = empty_sequence
-    return sequence
@@ -6,6 +6,10 @@ class Env(object):
     we should base on this class and implement as many functions
     as we can.
     '''
+    # The action feature matrices of the envs, shared by all the instances
+    # (and copies) of an env with the same name and number of actions
+    _action_feature_matrices = {}
+
     def __init__(self, config):
         ''' Initialize the environment
 
@@ -60,7 +64,7 @@ class Env(object):
         '''
         state, player_id = self.game.init_game()
         self.action_recorder = []
-        return self._extract_state(state), player_id
+        return self._get_extracted_state(state), player_id
 
     def step(self, action, raw_action=False):
         ''' Step forward
@@ -83,7 +87,7 @@ class Env(object):
         self.action_recorder.append((self.get_player_id(), action))
         next_state, player_id = self.game.step(action)
 
-        return self._extract_state(next_state), player_id
+        return self._get_extracted_state(next_state), player_id
 
     def step_back(self):
         ''' Take one step backward.
@@ -194,7 +198,7 @@ class Env(object):
         Returns:
             (numpy.array): The observed state of the player
         '''
-        return self._extract_state(self.game.get_state(player_id))
+        return self._get_extracted_state(self.game.get_state(player_id))
 
     def get_payoffs(self):
         ''' Get the payoffs of players. Must be implemented in the child class.
@@ -218,18 +222,57 @@ class Env(object):
         ''' For some environments such as DouDizhu, we can have action features
 
         Returns:
-            (numpy.array): The action features
+            (numpy.array): The action features, a read-only row of the
+                action feature matrix
+        '''
+        return self.get_action_feature_matrix()[action]
+
+    def get_action_feature_matrix(self):
+        ''' Get the features of all the actions. The matrix is built on the
+            first call and shared by the envs of the same game.
+
+        Returns:
+            (numpy.array): A read-only array of shape (num_actions, feature_dim)
+        '''
+        key = (self.name, self.num_actions)
+        if key not in Env._action_feature_matrices:
+            matrix = self._build_action_feature_matrix()
+            matrix.setflags(write=False)
+            Env._action_feature_matrices[key] = matrix
+        return Env._action_feature_matrices[key]
+
+    def _build_action_feature_matrix(self):
+        ''' Build the features of all the actions. Override it in the child
+            class if the actions have features.
+
+        Returns:
+            (numpy.array): An array of shape (num_actions, feature_dim)
         '''
         # By default we use one-hot encoding
-        feature = np.zeros(self.num_actions, dtype=np.int8)
-        feature[action] = 1
-        return feature
+        return np.eye(self.num_actions, dtype=np.int8)
 
     def seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
         self.game.np_random = self.np_random
         return seed
 
+    def _get_extracted_state(self, state):
+        ''' Extract the state and add a boolean mask of the legal actions,
+            so that agents can select actions without building one
+
+        Args:
+            state (dict): The raw state
+
+        Returns:
+            (dict): The extracted state with a 'legal_actions_mask' entry
+                of shape (num_actions,)
+        '''
+        extracted_state = self._extract_state(state)
+        legal_actions_mask = np.zeros(self.num_actions, dtype=bool)
+        legal_actions_mask[list(extracted_state['legal_actions'])] = True
+        extracted_state['legal_actions_mask'] = legal_actions_mask
+        return extracted_state
+
     def _extract_state(self, state):
         ''' Extract useful information from state for RL. Must be implemented in the child class.
 
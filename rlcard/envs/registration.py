@@ -1,5 +1,7 @@
 import importlib
 
+from rlcard.envs.vec_env import VectorEnv
+
 # Default Config
 DEFAULT_CONFIG = {
         'allow_step_back': False,
@@ -62,6 +64,18 @@ class EnvRegistry(object):
             raise ValueError('Cannot find env_id: {}'.format(env_id))
         return self.env_specs[env_id].make(config)
 
+    def make_vec(self, env_id, num_envs, config=DEFAULT_CONFIG):
+        ''' Create a vectorized environment
+
+        Args:
+            env_id (string): The name of the environment
+            num_envs (int): The number of games stepped together
+            config (dict): A dictionary of the environment settings
+        '''
+        if env_id not in self.env_specs:
+            raise ValueError('Cannot find env_id: {}'.format(env_id))
+        return VectorEnv(self.env_specs[env_id].make, num_envs, config)
+
 # Have a global registry
 registry = EnvRegistry()
 
@@ -87,3 +101,17 @@ def make(env_id, config={}):
         _config[key] = config[key]
 
     return registry.make(env_id, _config)
+
+def make_vec(env_id, num_envs, config={}):
+    ''' Create a vectorized environment that steps several games in lockstep
+
+    Args:
+        env_id (string): The name of the environment
+        num_envs (int): The number of games stepped together
+        config (dict): A dictionary of the environment settings
+    '''
+    _config = DEFAULT_CONFIG.copy()
+    for key in config:
+        _config[key] = config[key]
+
+    return registry.make_vec(env_id, num_envs, _config)
@@ -0,0 +1,120 @@
+''' Vectorized environment that steps several games in lockstep
+'''
+import numpy as np
+
+
+class VectorEnv(object):
+    '''
+    VectorEnv holds N independent instances of the same environment and steps
+    them together, so that agents can batch their network inference across
+    tables. Finished games are reset automatically.
+    '''
+
+    def __init__(self, make_env, num_envs, config):
+        ''' Initialize the vectorized environment
+
+        Args:
+            make_env (function): A function that takes a config dictionary
+                and returns an instance of the environment
+            num_envs (int): The number of games stepped together
+            config (dict): The environment config. If 'seed' is set, the
+                i-th game is seeded with seed + i so that the games are
+                independent but reproducible.
+        '''
+        if num_envs < 1:
+            raise ValueError('num_envs should be a positive integer, got {}'.format(num_envs))
+        self.num_envs = num_envs
+        self.envs = []
+        for i in range(num_envs):
+            _config = config.copy()
+            if config.get('seed') is not None:
+                _config['seed'] = config['seed'] + i
+            self.envs.append(make_env(_config))
+
+        env = self.envs[0]
+        self.name = env.name
+        self.num_players = env.num_players
+        self.num_actions = env.num_actions
+        self.state_shape = env.state_shape
+        self.action_shape = env.action_shape
+
+        # The latest state dictionaries of each game
+        self.states = [None for _ in range(num_envs)]
+        self.player_ids = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self):
+        ''' Start a new game in every environment
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array or list): The stacked observations of the current players
+                (numpy.array): Boolean legal action masks with shape (num_envs, num_actions)
+                (numpy.array): The IDs of the current players
+        '''
+        for i, env in enumerate(self.envs):
+            self.states[i], self.player_ids[i] = env.reset()
+        return self._stack_obs(), self._stack_legal_actions_mask(), self.player_ids.copy()
+
+    def step(self, actions, raw_action=False):
+        ''' Step forward every environment with the action of its current player.
+            The games that end are recorded and reset right away, so the
+            returned observations always belong to live games.
+
+        Args:
+            actions (list or numpy.array): One action per environment
+            raw_action (boolean): True if the actions are raw actions
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array or list): The stacked observations of the next players
+                (numpy.array): Boolean legal action masks with shape (num_envs, num_actions)
+                (numpy.array): The IDs of the next players
+                (numpy.array): The payoffs with shape (num_envs, num_players). The
+                    rows are zeros for the games that are not over
+                (numpy.array): Boolean flags marking the games that ended in this step
+        '''
+        if len(actions) != self.num_envs:
+            raise ValueError('Expected {} actions, got {}'.format(self.num_envs, len(actions)))
+        payoffs = np.zeros((self.num_envs, self.num_players))
+        dones = np.zeros(self.num_envs, dtype=bool)
+        for i, env in enumerate(self.envs):
+            self.states[i], self.player_ids[i] = env.step(actions[i], raw_action)
+            if env.is_over():
+                payoffs[i] = env.get_payoffs()
+                dones[i] = True
+                self.states[i], self.player_ids[i] = env.reset()
+        return self._stack_obs(), self._stack_legal_actions_mask(), self.player_ids.copy(), payoffs, dones
+
+    def seed(self, seed=None):
+        ''' Seed every environment, the i-th one with seed + i
+
+        Args:
+            seed (int): The base seed
+
+        Returns:
+            (list): The seeds used by each environment
+        '''
+        return [env.seed(None if seed is None else seed + i) for i, env in enumerate(self.envs)]
+
+    def _stack_obs(self):
+        ''' Stack the observations of all the games
+
+        Returns:
+            (numpy.array or list): A (num_envs, ...) array. If the observation
+                shape depends on the player (e.g., DouDizhu), a list of arrays
+                is returned instead.
+        '''
+        obs = [state['obs'] for state in self.states]
+        if all(o.shape == obs[0].shape for o in obs):
+            return np.stack(obs)
+        return obs
+
+    def _stack_legal_actions_mask(self):
+        ''' Build the legal action masks of all the games
+
+        Returns:
+            (numpy.array): Boolean masks with shape (num_envs, num_actions)
+        '''
+        return np.stack([state['legal_actions_mask'] for state in self.states])
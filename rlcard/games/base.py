@@ -7,12 +7,25 @@ class Card:
     Note:
         The suit variable in a standard card game should be one of [S, H, D, C, BJ, RJ] meaning [Spades, Hearts, Diamonds, Clubs, Black Joker, Red Joker]
         Similarly the rank variable should be one of [A, 2, 3, 4, 5, 6, 7, 8, 9, T, J, Q, K]
+
+        Cards are immutable and interned: constructing a card that already
+        exists returns the shared instance, so decks, hands and copies of
+        the game hold references to the same few objects.
     '''
-    suit = None
-    rank = None
+    __slots__ = ('suit', 'rank', '_hash')
+
     valid_suit = ['S', 'H', 'D', 'C', 'BJ', 'RJ']
     valid_rank = ['A', '2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K']
 
+    _interned = {}
+
+    def __new__(cls, suit, rank):
+        card = Card._interned.get((cls, suit, rank))
+        if card is None:
+            card = super().__new__(cls)
+            Card._interned[(cls, suit, rank)] = card
+        return card
+
     def __init__(self, suit, rank):
         ''' Initialize the suit and rank of a card
 
@@ -22,8 +35,22 @@ class Card:
         '''
         self.suit = suit
         self.rank = rank
+        # Jokers have no rank, they are ranked after the king
+        rank_index = Card.valid_rank.index(rank) if rank in Card.valid_rank else len(Card.valid_rank)
+        self._hash = rank_index + 100 * Card.valid_suit.index(suit)
+
+    def __getnewargs__(self):
+        return self.suit, self.rank
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, Card):
             return self.rank == other.rank and self.suit == other.suit
         else:
@@ -31,9 +58,7 @@ class Card:
             return NotImplemented
 
     def __hash__(self):
-        suit_index = Card.valid_suit.index(self.suit)
-        rank_index = Card.valid_rank.index(self.rank)
-        return rank_index + 100 * suit_index
+        return self._hash
 
     def __str__(self):
         ''' Get string representation of a card.
@@ -28,10 +28,17 @@ class BlackjackDealer:
 
         Args:
             player_id (int): the target player's id
+
+        Returns:
+            (int): The index of the card in the deck, or None if the card is not
+                removed from the deck (infinite decks)
         '''
         idx = self.np_random.choice(len(self.deck))
         card = self.deck[idx]
         if self.num_decks != 0:  # If infinite decks, do not pop card from deck
             self.deck.pop(idx)
+        else:
+            idx = None
         # card = self.deck.pop()
         player.hand.append(card)
+        return idx
@@ -1,4 +1,3 @@
-from copy import deepcopy
 import numpy as np
 
 from rlcard.games.blackjack import Dealer
@@ -64,22 +63,24 @@ class BlackjackGame:
             int: next plater's id
         '''
         if self.allow_step_back:
-            p = deepcopy(self.players[self.game_pointer])
-            d = deepcopy(self.dealer)
-            w = deepcopy(self.winner)
-            self.history.append((d, p, w))
+            # Record only the fields that the action can change, so that
+            # stepping back does not need to copy the whole game
+            p = self.players[self.game_pointer]
+            d = self.dealer
+            self.history.append((self.game_pointer, len(p.hand), p.status, p.score,
+                                 len(d.hand), d.status, d.score, self.winner.copy(), []))
 
         next_state = {}
         # Play hit
         if action != "stand":
-            self.dealer.deal_card(self.players[self.game_pointer])
+            self._deal_card(self.players[self.game_pointer])
             self.players[self.game_pointer].status, self.players[self.game_pointer].score = self.judger.judge_round(
                 self.players[self.game_pointer])
             if self.players[self.game_pointer].status == 'bust':
                 # game over, set up the winner, print out dealer's hand # If bust, pass the game pointer
                 if self.game_pointer >= self.num_players - 1:
                     while self.judger.judge_score(self.dealer.hand) < 17:
-                        self.dealer.deal_card(self.dealer)
+                        self._deal_card(self.dealer)
                     self.dealer.status, self.dealer.score = self.judger.judge_round(self.dealer)
                     for i in range(self.num_players):
                         self.judger.judge_game(self, i) 
@@ -93,7 +94,7 @@ class BlackjackGame:
                 self.players[self.game_pointer])
             if self.game_pointer >= self.num_players - 1:
                 while self.judger.judge_score(self.dealer.hand) < 17:
-                    self.dealer.deal_card(self.dealer)
+                    self._deal_card(self.dealer)
                 self.dealer.status, self.dealer.score = self.judger.judge_round(self.dealer)
                 for i in range(self.num_players):
                     self.judger.judge_game(self, i) 
@@ -130,10 +131,30 @@ class BlackjackGame:
         '''
         #while len(self.history) > 0:
         if len(self.history) > 0:
-            self.dealer, self.players[self.game_pointer], self.winner = self.history.pop()
+            self.game_pointer, hand_len, status, score, dealer_hand_len, dealer_status, dealer_score, \
+                self.winner, dealt = self.history.pop()
+            p = self.players[self.game_pointer]
+            d = self.dealer
+            # Put the dealt cards back to where they were in the deck
+            for idx, card in reversed(dealt):
+                d.deck.insert(idx, card)
+            del p.hand[hand_len:]
+            del d.hand[dealer_hand_len:]
+            p.status, p.score = status, score
+            d.status, d.score = dealer_status, dealer_score
             return True
         return False
 
+    def _deal_card(self, player):
+        ''' Deal a card to the player (or the dealer) and record it for step_back
+
+        Args:
+            player (object): The player that receives the card
+        '''
+        idx = self.dealer.deal_card(player)
+        if self.allow_step_back and idx is not None:
+            self.history[-1][-1].append((idx, player.hand[-1]))
+
     def get_num_players(self):
         ''' Return the number of players in blackjack
 
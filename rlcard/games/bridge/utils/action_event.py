@@ -19,6 +19,8 @@ from .bridge_card import BridgeCard
 
 class ActionEvent(object):  # Interface
 
+    __slots__ = ('action_id',)
+
     no_bid_action_id = 0
     first_bid_action_id = 1
     pass_action_id = 36
@@ -29,6 +31,12 @@ class ActionEvent(object):  # Interface
     def __init__(self, action_id: int):
         self.action_id = action_id
 
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __eq__(self, other):
         result = False
         if isinstance(other, ActionEvent):
@@ -37,6 +45,20 @@ class ActionEvent(object):  # Interface
 
     @staticmethod
     def from_action_id(action_id: int):
+        ''' Return the shared action event of an action id
+
+        Args:
+            action_id (int): the id of the action
+
+        Returns:
+            (ActionEvent): the flyweight action event, which must not be modified
+        '''
+        if ActionEvent.first_bid_action_id <= action_id < ActionEvent.first_play_card_action_id + 52:
+            return _action_events[action_id]
+        raise Exception(f'ActionEvent from_action_id: invalid action_id={action_id}')
+
+    @staticmethod
+    def _make(action_id: int):
         if action_id == ActionEvent.pass_action_id:
             return PassAction()
         elif ActionEvent.first_bid_action_id <= action_id <= 35:
@@ -63,11 +85,14 @@ class ActionEvent(object):  # Interface
 
 
 class CallActionEvent(ActionEvent):  # Interface
-    pass
+
+    __slots__ = ()
 
 
 class PassAction(CallActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=ActionEvent.pass_action_id)
 
@@ -80,6 +105,8 @@ class PassAction(CallActionEvent):
 
 class BidAction(CallActionEvent):
 
+    __slots__ = ('bid_amount', 'bid_suit')
+
     def __init__(self, bid_amount: int, bid_suit: str or None):
         suits = BridgeCard.suits
         if bid_suit and bid_suit not in suits:
@@ -105,6 +132,8 @@ class BidAction(CallActionEvent):
 
 class DblAction(CallActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=ActionEvent.dbl_action_id)
 
@@ -117,6 +146,8 @@ class DblAction(CallActionEvent):
 
 class RdblAction(CallActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=ActionEvent.rdbl_action_id)
 
@@ -129,6 +160,8 @@ class RdblAction(CallActionEvent):
 
 class PlayCardAction(ActionEvent):
 
+    __slots__ = ('card',)
+
     def __init__(self, card: BridgeCard):
         play_card_action_id = ActionEvent.first_play_card_action_id + card.card_id
         super().__init__(action_id=play_card_action_id)
@@ -139,3 +172,7 @@ class PlayCardAction(ActionEvent):
 
     def __repr__(self):
         return f"{self.card}"
+
+
+# action events are shared by all the games, indexed by action_id (no_bid has no action event)
+_action_events = [None] + [ActionEvent._make(action_id) for action_id in range(1, ActionEvent.get_num_actions())]  # want this to be read-only
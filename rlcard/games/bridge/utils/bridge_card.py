@@ -9,6 +9,8 @@ from rlcard.games.base import Card
 
 class BridgeCard(Card):
 
+    __slots__ = ('card_id',)
+
     suits = ['C', 'D', 'H', 'S']
     ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
 
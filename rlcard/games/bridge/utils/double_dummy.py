@@ -0,0 +1,529 @@
+'''
+    File name: bridge/utils/double_dummy.py
+'''
+
+import time
+from typing import Dict, List, Tuple
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from ..round import BridgeRound
+
+from .bridge_card import BridgeCard
+
+# ====================================
+# Bitboards:
+#       A hand is an int where bit card_id is set for each card.
+#       The suits are contiguous runs of 13 bits in the order C, D, H, S,
+#       and within a suit a higher bit is a higher rank.
+# ====================================
+
+suit_masks = [((1 << 13) - 1) << (13 * suit_index) for suit_index in range(4)]
+
+
+if hasattr(int, 'bit_count'):  # Python 3.10+
+    _popcount = int.bit_count
+else:
+    def _popcount(mask: int) -> int:
+        return bin(mask).count('1')
+
+
+class DoubleDummyState(object):
+    ''' Bitboard version of the card play of a BridgeRound: the four hands,
+        the trump suit, the leader and the cards of the current trick
+    '''
+
+    def __init__(self, hands: List[int], trump_suit_index: int or None, leader_id: int, trick: List[int] = None):
+        ''' Initialize the state
+
+        Args:
+            hands (list): The bitboards of the hands of the four players
+            trump_suit_index (int): The index of the trump suit in BridgeCard.suits, None for no trump
+            leader_id (int): The player who leads the current trick
+            trick (list): The card_ids played to the current trick, in order
+        '''
+        self.hands = list(hands)
+        self.trump_suit_index = trump_suit_index
+        self.leader_id = leader_id
+        self.trick = list(trick) if trick else []
+        if len(self.trick) >= 4:
+            raise Exception(f'DoubleDummyState: a trick has at most 3 cards in play, got {len(self.trick)}')
+
+    @property
+    def current_player_id(self) -> int:
+        return (self.leader_id + len(self.trick)) % 4
+
+    def get_remaining_trick_count(self) -> int:
+        ''' Return the number of tricks left to play, including the current trick
+        '''
+        return _popcount(self.hands[self.leader_id]) + (1 if self.trick else 0)
+
+    @staticmethod
+    def from_round(round: 'BridgeRound') -> 'DoubleDummyState':
+        ''' Build the state of the card play of a round whose bidding is over
+        '''
+        if not round.is_bidding_over() or not round.contract_bid_move:
+            raise Exception('DoubleDummyState: the round has no contract to play')
+        hands = [sum(1 << card.card_id for card in player.hand) for player in round.players]
+        trick_moves = round.get_trick_moves()
+        if len(trick_moves) == 4:
+            trick_moves = []  # the trick is complete, its winner leads the next one
+        trick = [move.card.card_id for move in trick_moves]
+        leader_id = (round.current_player_id - len(trick)) % 4
+        trump_suit = round.get_trump_suit()
+        trump_suit_index = BridgeCard.suits.index(trump_suit) if trump_suit else None
+        return DoubleDummyState(hands=hands, trump_suit_index=trump_suit_index, leader_id=leader_id, trick=trick)
+
+    @staticmethod
+    def from_perfect_information(perfect_information: dict) -> 'DoubleDummyState':
+        ''' Build the state from the dictionary of BridgeRound.get_perfect_information
+        '''
+        contract_bid_move = perfect_information['contact']
+        if not contract_bid_move:
+            raise Exception('DoubleDummyState: the perfect information has no contract to play')
+        hands = [sum(1 << card.card_id for card in hand) for hand in perfect_information['hands']]
+        current_player_id = perfect_information['current_player_id']
+        trick_cards = perfect_information['trick_moves']
+        trick_count = sum(card is not None for card in trick_cards)
+        if trick_count == 4:
+            trick_count = 0  # the trick is complete, its winner leads the next one
+        leader_id = (current_player_id - trick_count) % 4
+        trick = [trick_cards[(leader_id + i) % 4].card_id for i in range(trick_count)]
+        trump_suit = contract_bid_move.action.bid_suit
+        trump_suit_index = BridgeCard.suits.index(trump_suit) if trump_suit else None
+        return DoubleDummyState(hands=hands, trump_suit_index=trump_suit_index, leader_id=leader_id, trick=trick)
+
+
+class DoubleDummySolver(object):
+    ''' Alpha-beta double dummy solver for the card play of bridge.
+
+        The number of tricks is found by a sequence of null window searches
+        ("can north-south take at least n tricks?"). Positions at the start
+        of a trick are stored in a transposition table with the bounds that
+        were proved for them, and the table is kept between searches and
+        between calls, so solving several positions of the same deal is cheap.
+        Cards that are next to each other in a hand once the played cards
+        are removed are equivalent, and only one of them is searched.
+
+        A stored bound holds for every position with the same suit lengths
+        in which the cards that decided the search (the winners of the tricks
+        that were won by rank) and the cards above them have the same owners,
+        so one entry answers many positions (partition search).
+
+        Endgames and partial deals are solved in milliseconds to a fraction of
+        a second; a full deal of 13 tricks takes from seconds to about a minute.
+    '''
+
+    def __init__(self, max_table_size: int = 1000000):
+        ''' Initialize the solver
+
+        Args:
+            max_table_size (int): The table is cleared when it holds more positions than this
+        '''
+        self.max_table_size = max_table_size
+        self.table: Dict[tuple, list] = {}
+        self.table_size = 0
+        self.suit_keys: Dict[tuple, tuple] = {}
+        self.node_count = 0
+        self.deadline = None
+
+    def solve(self, state: DoubleDummyState, deadline: float = None) -> int:
+        ''' Return the number of the remaining tricks, including the current one,
+            that the side of the player to move takes with best play of both sides
+
+        Args:
+            state (DoubleDummyState): The state to solve
+            deadline (float): If set, a TimeoutError is raised when time.time() passes it
+        '''
+        self._load(state, deadline)
+        north_south_tricks = self._solve()
+        if state.current_player_id % 2 == 0:
+            return north_south_tricks
+        return state.get_remaining_trick_count() - north_south_tricks
+
+    def analyze(self, state: DoubleDummyState, deadline: float = None) -> Dict[int, int]:
+        ''' Return the number of the remaining tricks taken by the side of the
+            player to move after playing each of the legal cards
+
+        Args:
+            state (DoubleDummyState): The state to analyze
+            deadline (float): If set, a TimeoutError is raised when time.time() passes it
+
+        Returns:
+            (dict): A dictionary of card_id -> tricks
+        '''
+        self._load(state, deadline)
+        player_id = state.current_player_id
+        remaining_trick_count = state.get_remaining_trick_count()
+        card_tricks = {}
+        for card_id in self._iter_cards(self._legal_mask(player_id)):
+            won, _ = self._play(player_id, card_id)
+            north_south_tricks = won + self._solve()
+            self._unplay(player_id, card_id)
+            tricks = north_south_tricks if player_id % 2 == 0 else remaining_trick_count - north_south_tricks
+            card_tricks[card_id] = tricks
+        return card_tricks
+
+    def get_trick_counts(self, round: 'BridgeRound') -> List[int]:
+        ''' Return the number of tricks won by each side (north-south, east-west)
+            at the end of the round if it is played double dummy from now on
+        '''
+        won_trick_counts = round.won_trick_counts.copy()
+        if not round.is_over():
+            state = DoubleDummyState.from_round(round)
+            self._load(state)
+            north_south_tricks = self._solve()
+            won_trick_counts[0] += north_south_tricks
+            won_trick_counts[1] += state.get_remaining_trick_count() - north_south_tricks
+        return won_trick_counts
+
+    def _load(self, state: DoubleDummyState, deadline: float or None = None):
+        self.deadline = deadline
+        self.hands = state.hands.copy()
+        self.trump_suit_index = state.trump_suit_index
+        self.leader_id = state.leader_id
+        self.trick = state.trick.copy()
+        self.trick_players = [(state.leader_id + i) % 4 for i in range(len(state.trick))]
+        self.finished_tricks = []
+        if self.table_size > self.max_table_size:
+            self.table.clear()
+            self.table_size = 0
+            self.suit_keys.clear()
+
+    def _solve(self) -> int:
+        # north-south tricks from the loaded position by null window searches
+        lower = 0
+        upper = _popcount(self.hands[self.leader_id]) + (1 if self.trick else 0)
+        while lower < upper:
+            target = (lower + upper + 1) // 2
+            if self._search(target)[0]:
+                lower = target
+            else:
+                upper = target - 1
+        return lower
+
+    def _search(self, target: int) -> Tuple[bool, int]:
+        # whether north-south take at least target of the remaining tricks, and the mask
+        # of the cards whose ranks decided it: the result is the same in every position
+        # with the same suit lengths where the cards down to these ranks have the same owners
+        self.node_count += 1
+        if self.deadline is not None and not self.node_count & 1023 and time.time() > self.deadline:
+            raise TimeoutError('DoubleDummySolver: the deadline has passed')
+        hands = self.hands
+        key = None
+        best_card_id = None
+        if not self.trick:
+            if target <= 0:
+                return True, 0
+            leader_id = self.leader_id
+            remaining_trick_count = _popcount(hands[leader_id])
+            if target > remaining_trick_count:
+                return False, 0
+            if remaining_trick_count == 1:
+                # the last trick has no choices left
+                self.trick = [hands[(leader_id + i) % 4].bit_length() - 1 for i in range(4)]
+                winning_index = self._get_winning_index()
+                rank_mask = self._get_rank_mask()
+                self.trick = []
+                return (leader_id + winning_index) % 2 == 0, rank_mask
+            quick_trick_count, quick_trick_mask = self._get_quick_tricks()
+            if leader_id % 2 == 0:
+                if quick_trick_count >= target:
+                    return True, quick_trick_mask
+            elif remaining_trick_count - quick_trick_count < target:
+                return False, quick_trick_mask
+            key, suit_keys = self._get_table_key()
+            entries = self.table.get(key)
+            if entries is not None:
+                for shifts, prefixes, bounds in entries:
+                    if suit_keys[0] >> shifts[0] == prefixes[0] and suit_keys[1] >> shifts[1] == prefixes[1] \
+                            and suit_keys[2] >> shifts[2] == prefixes[2] and suit_keys[3] >> shifts[3] == prefixes[3]:
+                        if bounds[0] >= target:
+                            return True, self._get_top_mask(shifts)
+                        if bounds[1] < target:
+                            return False, self._get_top_mask(shifts)
+                        if best_card_id is None:
+                            best_card_id = bounds[2]
+        player_id = (self.leader_id + len(self.trick)) % 4
+        is_north_south = player_id % 2 == 0
+        cards = self._ordered_cards(player_id)
+        if best_card_id in cards:
+            # try first the lead that decided the last search of this position
+            cards.remove(best_card_id)
+            cards.insert(0, best_card_id)
+        result = not is_north_south
+        relevant_mask = 0
+        best_card_id = None
+        for card_id in cards:
+            won, rank_mask = self._play(player_id, card_id)
+            value, child_relevant_mask = self._search(target - won)
+            self._unplay(player_id, card_id)
+            if value == is_north_south:
+                result = value
+                relevant_mask = child_relevant_mask | rank_mask
+                best_card_id = card_id
+                break
+            relevant_mask |= child_relevant_mask | rank_mask
+        if key is not None:
+            self._store(key, suit_keys, relevant_mask, result, target, best_card_id)
+        return result, relevant_mask
+
+    def _store(self, key: tuple, suit_keys: tuple, relevant_mask: int, result: bool, target: int, best_card_id: int):
+        # record the bound in the entry of the owners of the cards down to the lowest relevant rank of each suit
+        hands = self.hands
+        in_play = hands[0] | hands[1] | hands[2] | hands[3]
+        shifts = []
+        for shift in (0, 13, 26, 39):
+            suit_in_play = (in_play >> shift) & 8191
+            suit_relevant = (relevant_mask >> shift) & 8191
+            if suit_relevant:
+                lowest = (suit_relevant & -suit_relevant).bit_length() - 1
+                shifts.append(2 * _popcount(suit_in_play & ((1 << lowest) - 1)))
+            else:
+                shifts.append(2 * _popcount(suit_in_play))
+        shifts = tuple(shifts)
+        prefixes = tuple(suit_key >> shift for suit_key, shift in zip(suit_keys, shifts))
+        entries = self.table.get(key)
+        if entries is None:
+            entries = self.table[key] = []
+        for entry_shifts, entry_prefixes, bounds in entries:
+            if entry_shifts == shifts and entry_prefixes == prefixes:
+                break
+        else:
+            bounds = [0, _popcount(hands[self.leader_id]), None]
+            entries.append((shifts, prefixes, bounds))
+            self.table_size += 1
+        if result:
+            bounds[0] = max(bounds[0], target)
+        else:
+            bounds[1] = min(bounds[1], target - 1)
+        if best_card_id is not None:
+            bounds[2] = best_card_id
+
+    def _get_top_mask(self, shifts: tuple) -> int:
+        # the cards of each suit above the ones left out of an entry
+        hands = self.hands
+        in_play = hands[0] | hands[1] | hands[2] | hands[3]
+        top_mask = 0
+        for suit_index in range(4):
+            suit_in_play = in_play & suit_masks[suit_index]
+            for _ in range(shifts[suit_index] // 2):
+                suit_in_play &= suit_in_play - 1  # drop the lowest card
+            top_mask |= suit_in_play
+        return top_mask
+
+    def _get_table_key(self) -> Tuple[tuple, tuple]:
+        # the key holds the leader and the suit lengths of the hands, and the owners of the
+        # cards of each suit from high to low are returned to match the entries of the key
+        hands = self.hands
+        suit_keys = self.suit_keys
+        key = [self.trump_suit_index, self.leader_id]
+        owners = []
+        for shift in (0, 13, 26, 39):
+            suit_hands = ((hands[0] >> shift) & 8191, (hands[1] >> shift) & 8191,
+                          (hands[2] >> shift) & 8191, (hands[3] >> shift) & 8191)
+            suit_key = suit_keys.get(suit_hands)
+            if suit_key is None:
+                suit_owners = 1
+                mask = suit_hands[0] | suit_hands[1] | suit_hands[2] | suit_hands[3]
+                while mask:
+                    bit = 1 << (mask.bit_length() - 1)
+                    mask ^= bit
+                    for owner_id in range(4):
+                        if suit_hands[owner_id] & bit:
+                            suit_owners = suit_owners * 4 + owner_id
+                            break
+                suit_lengths = tuple(_popcount(suit_hand) for suit_hand in suit_hands)
+                suit_key = suit_keys[suit_hands] = (suit_lengths, suit_owners)
+            key.append(suit_key[0])
+            owners.append(suit_key[1])
+        return tuple(key), tuple(owners)
+
+    def _get_quick_tricks(self) -> Tuple[int, int]:
+        # tricks the side of the leader can cash from the top without giving up the lead,
+        # either from the hand of the leader or after a low lead to a winner of the partner,
+        # and the cards whose ranks decide it
+        hands = self.hands
+        leader_id = self.leader_id
+        partner_id = (leader_id + 2) % 4
+        opponents = hands[(leader_id + 1) % 4] | hands[(leader_id + 3) % 4]
+        if self.trump_suit_index is not None and opponents & suit_masks[self.trump_suit_index]:
+            suit_indexes = (self.trump_suit_index,)  # the opponents can ruff the other suits
+        else:
+            suit_indexes = (0, 1, 2, 3)
+        quick_trick_count, quick_trick_mask = self._get_cashing_tricks(leader_id, suit_indexes)
+        for suit_index in suit_indexes:
+            suit_mask = suit_masks[suit_index]
+            leader_suit_hand = hands[leader_id] & suit_mask
+            partner_suit_hand = hands[partner_id] & suit_mask
+            if not leader_suit_hand or not partner_suit_hand:
+                continue
+            partner_top_mask = 1 << (partner_suit_hand.bit_length() - 1)
+            if partner_top_mask < leader_suit_hand & -leader_suit_hand or \
+                    partner_top_mask < (opponents & suit_mask):
+                continue
+            partner_count, partner_mask = self._get_cashing_tricks(partner_id, suit_indexes)
+            if partner_count > quick_trick_count:
+                quick_trick_count = partner_count
+                quick_trick_mask = partner_mask | partner_top_mask
+            break
+        return quick_trick_count, quick_trick_mask
+
+    def _get_cashing_tricks(self, player_id: int, suit_indexes: tuple) -> Tuple[int, int]:
+        # the winners of a player in the suits that cannot be ruffed
+        hands = self.hands
+        hand = hands[player_id]
+        others = hands[(player_id + 1) % 4] | hands[(player_id + 2) % 4] | hands[(player_id + 3) % 4]
+        trick_count = 0
+        winners_mask = 0
+        for suit_index in suit_indexes:
+            suit_hand = hand & suit_masks[suit_index]
+            suit_others = others & suit_masks[suit_index]
+            if not suit_others:
+                trick_count += _popcount(suit_hand)  # the ranks do not matter
+                continue
+            # the cards above the highest card of the other players
+            winners = suit_hand >> suit_others.bit_length() << suit_others.bit_length()
+            trick_count += _popcount(winners)
+            winners_mask |= winners
+        return trick_count, winners_mask
+
+    def _play(self, player_id: int, card_id: int) -> Tuple[int, int]:
+        # play a card, returns 1 if north-south win the trick it completes
+        # and the mask of the winning card if it won by its rank
+        self.hands[player_id] ^= 1 << card_id
+        self.trick.append(card_id)
+        self.trick_players.append(player_id)
+        if len(self.trick) < 4:
+            return 0, 0
+        winner_id = self.trick_players[self._get_winning_index()]
+        rank_mask = self._get_rank_mask()
+        self.finished_tricks.append((self.leader_id, self.trick, self.trick_players))
+        self.leader_id = winner_id
+        self.trick = []
+        self.trick_players = []
+        return (1 if winner_id % 2 == 0 else 0), rank_mask
+
+    def _get_rank_mask(self) -> int:
+        # the winning card of a full trick if it beat a card of its suit
+        trick = self.trick
+        winning_card_id = trick[self._get_winning_index()]
+        for card_id in trick:
+            if card_id != winning_card_id and card_id // 13 == winning_card_id // 13:
+                return 1 << winning_card_id
+        return 0
+
+    def _unplay(self, player_id: int, card_id: int):
+        if not self.trick:
+            self.leader_id, self.trick, self.trick_players = self.finished_tricks.pop()
+        self.trick.pop()
+        self.trick_players.pop()
+        self.hands[player_id] ^= 1 << card_id
+
+    def _get_winning_index(self) -> int:
+        # index in the trick of the card that wins it so far
+        trick = self.trick
+        winning_index = 0
+        winning_card_id = trick[0]
+        for index in range(1, len(trick)):
+            card_id = trick[index]
+            if card_id // 13 == winning_card_id // 13:
+                if card_id > winning_card_id:
+                    winning_index, winning_card_id = index, card_id
+            elif card_id // 13 == self.trump_suit_index:
+                winning_index, winning_card_id = index, card_id
+        return winning_index
+
+    def _legal_mask(self, player_id: int) -> int:
+        hand = self.hands[player_id]
+        if self.trick:
+            follow_mask = hand & suit_masks[self.trick[0] // 13]
+            if follow_mask:
+                return follow_mask
+        return hand
+
+    def _iter_cards(self, mask: int):
+        # the cards of a mask, from high to low
+        while mask:
+            card_id = mask.bit_length() - 1
+            yield card_id
+            mask ^= 1 << card_id
+
+    def _ordered_cards(self, player_id: int) -> List[int]:
+        # one card of each run of equivalent legal cards, the most promising first
+        legal_mask = self._legal_mask(player_id)
+        in_play = self.hands[0] | self.hands[1] | self.hands[2] | self.hands[3]
+        for card_id in self.trick:
+            in_play |= 1 << card_id
+        cards = []
+        higher_card_id = None
+        for card_id in self._iter_cards(legal_mask):
+            if higher_card_id is not None and higher_card_id // 13 == card_id // 13 \
+                    and not in_play & ((1 << higher_card_id) - (2 << card_id)):
+                higher_card_id = card_id
+                continue
+            cards.append(card_id)
+            higher_card_id = card_id
+        if len(cards) == 1:
+            return cards
+        if not self.trick:
+            cards.sort(key=lambda card_id: self._get_lead_priority(player_id, card_id), reverse=True)
+            return cards
+        winning_index = self._get_winning_index()
+        winning_card_id = self.trick[winning_index]
+        partner_is_winning = (len(self.trick) - winning_index) % 2 == 0
+        trump_suit_index = self.trump_suit_index
+        if partner_is_winning:
+            cards.sort(key=lambda card_id: (card_id // 13 == trump_suit_index, card_id % 13))
+            return cards
+        # the cheapest card that surely wins the trick, then (except in second
+        # seat) the cheapest card that takes the lead, then the cheapest cards
+        led_suit_mask = suit_masks[self.trick[0] // 13]
+        trump_mask = suit_masks[trump_suit_index] if trump_suit_index is not None else 0
+        later_opponent_hands = [self.hands[(player_id + i) % 4] for i in range(1, 4 - len(self.trick), 2)]
+        is_second_seat = len(self.trick) == 1
+
+        def get_priority(card_id):
+            is_trump = card_id // 13 == trump_suit_index
+            if card_id // 13 == winning_card_id // 13:
+                beats = card_id > winning_card_id
+            else:
+                beats = is_trump
+            if beats:
+                for hand in later_opponent_hands:
+                    if hand & led_suit_mask:
+                        if not is_trump or trump_mask & led_suit_mask:
+                            if (hand & led_suit_mask).bit_length() > card_id:
+                                break
+                    elif hand & trump_mask:
+                        if not is_trump or (hand & trump_mask).bit_length() > card_id:
+                            break
+                else:
+                    return 0, is_trump, card_id % 13
+                if not is_second_seat:
+                    return 1, is_trump, card_id % 13
+            return 2, is_trump, card_id % 13
+
+        cards.sort(key=get_priority)
+        return cards
+
+    def _get_lead_priority(self, player_id: int, card_id: int) -> tuple:
+        # cash the winners first, then lead towards the winners of the partner;
+        # avoid the suits that an opponent can ruff
+        hands = self.hands
+        suit_mask = suit_masks[card_id // 13]
+        partner_suit_hand = hands[(player_id + 2) % 4] & suit_mask
+        left_suit_hand = hands[(player_id + 1) % 4] & suit_mask
+        right_suit_hand = hands[(player_id + 3) % 4] & suit_mask
+        opponents_top = max(left_suit_hand, right_suit_hand).bit_length()
+        trump_suit_index = self.trump_suit_index
+        if trump_suit_index is not None and card_id // 13 != trump_suit_index:
+            trump_mask = suit_masks[trump_suit_index]
+            if (not left_suit_hand and hands[(player_id + 1) % 4] & trump_mask) or \
+                    (not right_suit_hand and hands[(player_id + 3) % 4] & trump_mask):
+                return 0, card_id % 13
+        if card_id >= opponents_top:
+            return 3, card_id % 13
+        if partner_suit_hand.bit_length() > opponents_top:
+            return 2, -(card_id % 13)
+        return 1, -(card_id % 13)
@@ -8,7 +8,7 @@
 #   These classes are used to keep a move_sheet history of the moves in a round.
 #
 
-from .action_event import ActionEvent, BidAction, PassAction, DblAction, RdblAction, PlayCardAction
+from .action_event import ActionEvent, BidAction, PlayCardAction
 from .bridge_card import BridgeCard
 
 from ..player import BridgePlayer
@@ -47,7 +47,7 @@ class DealHandMove(BridgeMove):
 class MakePassMove(CallMove):
 
     def __init__(self, player: BridgePlayer):
-        super().__init__(player=player, action=PassAction())
+        super().__init__(player=player, action=ActionEvent.from_action_id(ActionEvent.pass_action_id))
 
     def __str__(self):
         return f'{self.player} {self.action}'
@@ -56,7 +56,7 @@ class MakePassMove(CallMove):
 class MakeDblMove(CallMove):
 
     def __init__(self, player: BridgePlayer):
-        super().__init__(player=player, action=DblAction())
+        super().__init__(player=player, action=ActionEvent.from_action_id(ActionEvent.dbl_action_id))
 
     def __str__(self):
         return f'{self.player} {self.action}'
@@ -65,7 +65,7 @@ class MakeDblMove(CallMove):
 class MakeRdblMove(CallMove):
 
     def __init__(self, player: BridgePlayer):
-        super().__init__(player=player, action=RdblAction())
+        super().__init__(player=player, action=ActionEvent.from_action_id(ActionEvent.rdbl_action_id))
 
     def __str__(self):
         return f'{self.player} {self.action}'
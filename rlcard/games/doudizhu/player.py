@@ -30,7 +30,6 @@ class DoudizhuPlayer:
         self._current_hand = []
         self.role = ''
         self.played_cards = None
-        self.singles = '3456789TJQKA2BR'
 
         #record cards removed from self._current_hand for each play()
         # and restore cards back to self._current_hand when play_back()
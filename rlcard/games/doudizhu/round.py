@@ -7,7 +7,7 @@ import numpy as np
 
 from rlcard.games.doudizhu import Dealer
 from rlcard.games.doudizhu.utils import cards2str, doudizhu_sort_card
-from rlcard.games.doudizhu.utils import CARD_RANK_STR, CARD_RANK_STR_INDEX
+from rlcard.games.doudizhu.utils import CARD_RANK_STR, CARD_RANK_STR_INDEX, ACTION_2_ID
 
 
 class DoudizhuRound:
@@ -18,6 +18,11 @@ class DoudizhuRound:
         self.played_cards = played_cards
         self.trace = []
 
+        # The action IDs of the trace, in total and per player, kept along
+        # the trace so that the env can encode the history without parsing it
+        self.trace_action_ids = []
+        self.player_action_ids = []
+
         self.greater_player = None
         self.dealer = Dealer(self.np_random)
         self.deck_str = cards2str(self.dealer.deck)
@@ -34,6 +39,7 @@ class DoudizhuRound:
         self.seen_cards = cards2str(seen_cards)
         self.landlord_id = landlord_id
         self.current_player = landlord_id
+        self.player_action_ids = [[] for _ in range(len(players))]
         self.public = {'deck': self.deck_str, 'seen_cards': self.seen_cards,
                        'landlord': self.landlord_id, 'trace': self.trace,
                        'played_cards': ['' for _ in range(len(players))]}
@@ -56,6 +62,9 @@ class DoudizhuRound:
             action(str): string of legal specific action
         '''
         self.trace.append((self.current_player, action))
+        action_id = ACTION_2_ID[action]
+        self.trace_action_ids.append(action_id)
+        self.player_action_ids[self.current_player].append(action_id)
         if action != 'pass':
             for c in action:
                 self.played_cards[self.current_player][CARD_RANK_STR_INDEX[c]] += 1
@@ -87,6 +96,8 @@ class DoudizhuRound:
             The last player id and the cards played
         '''
         player_id, cards = self.trace.pop()
+        self.trace_action_ids.pop()
+        self.player_action_ids[player_id].pop()
         self.current_player = player_id
         if (cards != 'pass'):
             for card in cards:
@@ -5,6 +5,7 @@ import json
 from collections import OrderedDict
 import threading
 import collections
+import numpy as np
 
 import rlcard
 
@@ -52,6 +53,69 @@ INDEX = {'3': 0, '4': 1, '5': 2, '6': 3, '7': 4,
          'K': 10, 'A': 11, '2': 12, 'B': 13, 'R': 14}
 INDEX = OrderedDict(sorted(INDEX.items(), key=lambda t: t[1]))
 
+# Cards are also packed into integers with 4 bits for the count of each
+# rank. A hand contains an action if no field of the hand minus the action
+# borrows, which is checked for all the actions at once with a guard bit in
+# every field.
+_RANK_BITS = 4
+_GUARD_BITS = sum(8 << (_RANK_BITS * rank) for rank in range(len(CARD_RANK_STR)))
+
+def pack_cards(cards):
+    ''' Pack the counts of the ranks of cards into an integer
+
+    Args:
+        cards (str): string of cards. Eg: '33344'
+
+    Returns:
+        int: the packed counts
+    '''
+    packed = 0
+    for card in cards:
+        packed += 1 << (_RANK_BITS * CARD_RANK_STR_INDEX[card])
+    return packed
+
+# The packed cards of every action, indexed by action id ('pass' is empty)
+ACTION_PACKED = np.array([pack_cards(action) if action != 'pass' else 0 for action in ID_2_ACTION], dtype=np.int64)
+_ACTION_STR = np.array(ID_2_ACTION, dtype=object)
+
+# The actions of every type sorted by weight: (action ids, weights, packed cards)
+TYPE_ACTION_INDEX = {}
+for _card_type, _weights in TYPE_CARD.items():
+    _ids = np.array([ACTION_2_ID[cards] for weight in _weights for cards in _weights[weight]], dtype=np.int64)
+    _ids_weights = np.array([int(weight) for weight in _weights for _ in _weights[weight]], dtype=np.int64)
+    TYPE_ACTION_INDEX[_card_type] = (_ids, _ids_weights, ACTION_PACKED[_ids])
+
+# All the actions except 'pass' sorted by the number of cards: (action ids, numbers of cards, packed cards)
+_ids = np.array(sorted((ACTION_2_ID[action] for action in ID_2_ACTION if action != 'pass'),
+                       key=lambda action_id: len(ID_2_ACTION[action_id])), dtype=np.int64)
+CARDS_ACTION_INDEX = (_ids, np.array([len(ID_2_ACTION[action_id]) for action_id in _ids]), ACTION_PACKED[_ids])
+del _card_type, _weights, _ids, _ids_weights
+
+def contains_packed(packed_hand, packed_actions):
+    ''' Check which actions can be played with a hand
+
+    Args:
+        packed_hand (int): the packed cards of the hand
+        packed_actions (numpy.array): the packed cards of the actions
+
+    Returns:
+        numpy.array: boolean mask of the actions contained in the hand
+    '''
+    return ((packed_hand | _GUARD_BITS) - packed_actions) & _GUARD_BITS == _GUARD_BITS
+
+def playable_actions(cards):
+    ''' Get all the actions that can be played with a hand when leading
+
+    Args:
+        cards (str): string of cards of the hand
+
+    Returns:
+        list: list of string of playable cards
+    '''
+    action_ids, num_cards, packed_actions = CARDS_ACTION_INDEX
+    end = np.searchsorted(num_cards, len(cards), side='right')
+    contained = contains_packed(pack_cards(cards), packed_actions[:end])
+    return _ACTION_STR[action_ids[:end][contained]].tolist()
 
 def doudizhu_sort_str(card_1, card_2):
     ''' Compare the rank of two cards of str representation
@@ -238,7 +302,7 @@ def get_gt_cards(player, greater_player):
     '''
     # add 'pass' to legal actions
     gt_cards = ['pass']
-    current_hand = cards2str(player.current_hand)
+    packed_hand = pack_cards(cards2str(player.current_hand))
     target_cards = greater_player.played_cards
     target_types = CARD_TYPE[0][target_cards]
     type_dict = {}
@@ -251,12 +315,8 @@ def get_gt_cards(player, greater_player):
     if 'bomb' not in type_dict:
         type_dict['bomb'] = -1
     for card_type, weight in type_dict.items():
-        candidate = TYPE_CARD[card_type]
-        for can_weight, cards_list in candidate.items():
-            if int(can_weight) > int(weight):
-                for cards in cards_list:
-                    # TODO: improve efficiency
-                    if cards not in gt_cards and contains_cards(current_hand, cards):
-                        # if self.contains_cards(current_hand, cards):
-                        gt_cards.append(cards)
+        action_ids, weights, packed_actions = TYPE_ACTION_INDEX[card_type]
+        start = np.searchsorted(weights, int(weight), side='right')
+        contained = contains_packed(packed_hand, packed_actions[start:])
+        gt_cards.extend(_ACTION_STR[action_ids[start:][contained]].tolist())
     return gt_cards
@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .game import GinRummyGame
 
+from functools import lru_cache
 from typing import List, Tuple
 
 from .utils.action_event import *
@@ -43,32 +44,31 @@ class GinRummyJudge:
             current_player = self.game.get_current_player()
             going_out_deadwood_count = self.game.settings.going_out_deadwood_count
             hand = current_player.hand
-            meld_clusters = current_player.get_meld_clusters()  # improve speed 2020-Apr
-            knock_cards, gin_cards = _get_going_out_cards(meld_clusters=meld_clusters,
-                                                          hand=hand,
-                                                          going_out_deadwood_count=going_out_deadwood_count)
+            knock_mask, gin_mask = _get_going_out_card_masks(hand_mask=current_player.hand_mask,
+                                                             going_out_deadwood_count=going_out_deadwood_count)
+            knock_cards, gin_cards = melding.get_cards(knock_mask), melding.get_cards(gin_mask)
             if self.game.settings.is_allowed_gin and gin_cards:
-                legal_actions = [GinAction()]
+                legal_actions = [ActionEvent.decode_action(gin_action_id)]
             else:
                 cards_to_discard = [card for card in hand]
                 if isinstance(last_action, PickUpDiscardAction):
                     if not self.game.settings.is_allowed_to_discard_picked_up_card:
                         picked_up_card = self.game.round.move_sheet[-1].card
                         cards_to_discard.remove(picked_up_card)
-                discard_actions = [DiscardAction(card=card) for card in cards_to_discard]
+                discard_actions = [ActionEvent.decode_action(discard_action_id + utils.get_card_id(card)) for card in cards_to_discard]
                 legal_actions = discard_actions
                 if self.game.settings.is_allowed_knock:
                     if current_player.player_id == 0 or not self.game.settings.is_south_never_knocks:
                         if knock_cards:
-                            knock_actions = [KnockAction(card=card) for card in knock_cards]
+                            knock_actions = [ActionEvent.decode_action(knock_action_id + utils.get_card_id(card)) for card in knock_cards]
                             if not self.game.settings.is_always_knock:
                                 legal_actions.extend(knock_actions)
                             else:
                                 legal_actions = knock_actions
         elif isinstance(last_action, DeclareDeadHandAction):
-            legal_actions = [ScoreNorthPlayerAction()]
+            legal_actions = [ActionEvent.decode_action(score_player_0_action_id)]
         elif isinstance(last_action, GinAction):
-            legal_actions = [ScoreNorthPlayerAction()]
+            legal_actions = [ActionEvent.decode_action(score_player_0_action_id)]
         elif isinstance(last_action, DiscardAction):
             can_draw_card = len(self.game.round.dealer.stock_pile) > self.game.settings.stockpile_dead_card_count
             if self.game.settings.max_drawn_card_count < 52:  # NOTE: this
@@ -77,19 +77,19 @@ class GinRummyJudge:
                     can_draw_card = False
             move_count = len(self.game.round.move_sheet)
             if move_count >= self.game.settings.max_move_count:
-                legal_actions = [DeclareDeadHandAction()]  # prevent unlimited number of moves in a game
+                legal_actions = [ActionEvent.decode_action(declare_dead_hand_action_id)]  # prevent unlimited number of moves in a game
             elif can_draw_card:
-                legal_actions = [DrawCardAction()]
+                legal_actions = [ActionEvent.decode_action(draw_card_action_id)]
                 if self.game.settings.is_allowed_pick_up_discard:
-                    legal_actions.append(PickUpDiscardAction())
+                    legal_actions.append(ActionEvent.decode_action(pick_up_discard_action_id))
             else:
-                legal_actions = [DeclareDeadHandAction()]
+                legal_actions = [ActionEvent.decode_action(declare_dead_hand_action_id)]
                 if self.game.settings.is_allowed_pick_up_discard:
-                    legal_actions.append(PickUpDiscardAction())
+                    legal_actions.append(ActionEvent.decode_action(pick_up_discard_action_id))
         elif isinstance(last_action, KnockAction):
-            legal_actions = [ScoreNorthPlayerAction()]
+            legal_actions = [ActionEvent.decode_action(score_player_0_action_id)]
         elif isinstance(last_action, ScoreNorthPlayerAction):
-            legal_actions = [ScoreSouthPlayerAction()]
+            legal_actions = [ActionEvent.decode_action(score_player_1_action_id)]
         elif isinstance(last_action, ScoreSouthPlayerAction):
             pass
         else:
@@ -105,11 +105,9 @@ def get_going_out_cards(hand: List[Card], going_out_deadwood_count: int) -> Tupl
     '''
     if not len(hand) == 11:
         raise GinRummyProgramError("len(hand) is {}: should be 11.".format(len(hand)))
-    meld_clusters = melding.get_meld_clusters(hand=hand)
-    knock_cards, gin_cards = _get_going_out_cards(meld_clusters=meld_clusters,
-                                                  hand=hand,
-                                                  going_out_deadwood_count=going_out_deadwood_count)
-    return list(knock_cards), list(gin_cards)
+    knock_mask, gin_mask = _get_going_out_card_masks(hand_mask=melding.get_hand_mask(hand),
+                                                     going_out_deadwood_count=going_out_deadwood_count)
+    return melding.get_cards(knock_mask), melding.get_cards(gin_mask)
 
 
 #
@@ -153,3 +151,38 @@ def _get_going_out_cards(meld_clusters: List[List[List[Card]]],
                     if next_deadwood_count <= going_out_deadwood_count:
                         knock_cards.add(card)
     return list(knock_cards), list(gin_cards)
+
+
+@lru_cache(maxsize=1 << 16)
+def _get_going_out_card_masks(hand_mask: int, going_out_deadwood_count: int) -> Tuple[int, int]:
+    '''
+    :param hand_mask: int -- mask of a hand of 11 cards
+    :param going_out_deadwood_count: int
+    :return int, int: masks of the cards in hand that can be knocked and of the cards in hand that can be ginned
+    '''
+    knock_mask = 0
+    gin_mask = 0
+    for meld_cluster_mask in melding.get_meld_cluster_masks(hand_mask=hand_mask):
+        meld_mask = 0
+        for meld in meld_cluster_mask:
+            meld_mask |= meld
+        deadwood_mask = hand_mask & ~meld_mask
+        if not deadwood_mask:
+            # all 11 cards are melded;
+            # take gin_card as lowest card of first 4+ meld, which leaves a meld of the other cards.
+            for meld in meld_cluster_mask:
+                if bin(meld).count('1') >= 4:
+                    gin_mask |= meld & -meld
+                    break
+        elif not deadwood_mask & (deadwood_mask - 1):
+            gin_mask |= deadwood_mask
+        else:
+            hand_deadwood = melding.get_cards(deadwood_mask)
+            hand_deadwood_values = [utils.get_deadwood_value(card) for card in hand_deadwood]
+            hand_deadwood_count = sum(hand_deadwood_values)
+            max_hand_deadwood_value = max(hand_deadwood_values, default=0)
+            if hand_deadwood_count <= 10 + max_hand_deadwood_value:
+                for card, deadwood_value in zip(hand_deadwood, hand_deadwood_values):
+                    if hand_deadwood_count - deadwood_value <= going_out_deadwood_count:
+                        knock_mask |= 1 << utils.get_card_id(card)
+    return knock_mask, gin_mask
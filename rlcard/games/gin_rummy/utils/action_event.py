@@ -32,9 +32,17 @@ knock_action_id = discard_action_id + 52
 
 class ActionEvent(object):
 
+    __slots__ = ('action_id',)
+
     def __init__(self, action_id: int):
         self.action_id = action_id
 
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __eq__(self, other):
         result = False
         if isinstance(other, ActionEvent):
@@ -56,7 +64,14 @@ class ActionEvent(object):
 
         Returns:
             action (ActionEvent): the action that will be passed to the game engine.
+                It is shared by all the games and must not be modified.
         '''
+        if 0 <= action_id < len(_action_events):
+            return _action_events[action_id]
+        raise Exception("decode_action: unknown action_id={}".format(action_id))
+
+    @staticmethod
+    def _make(action_id) -> 'ActionEvent':
         if action_id == score_player_0_action_id:
             action_event = ScoreNorthPlayerAction()
         elif action_id == score_player_1_action_id:
@@ -84,6 +99,8 @@ class ActionEvent(object):
 
 class ScoreNorthPlayerAction(ActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=score_player_0_action_id)
 
@@ -93,6 +110,8 @@ class ScoreNorthPlayerAction(ActionEvent):
 
 class ScoreSouthPlayerAction(ActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=score_player_1_action_id)
 
@@ -102,6 +121,8 @@ class ScoreSouthPlayerAction(ActionEvent):
 
 class DrawCardAction(ActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=draw_card_action_id)
 
@@ -111,6 +132,8 @@ class DrawCardAction(ActionEvent):
 
 class PickUpDiscardAction(ActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=pick_up_discard_action_id)
 
@@ -120,6 +143,8 @@ class PickUpDiscardAction(ActionEvent):
 
 class DeclareDeadHandAction(ActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=declare_dead_hand_action_id)
 
@@ -129,6 +154,8 @@ class DeclareDeadHandAction(ActionEvent):
 
 class GinAction(ActionEvent):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(action_id=gin_action_id)
 
@@ -138,6 +165,8 @@ class GinAction(ActionEvent):
 
 class DiscardAction(ActionEvent):
 
+    __slots__ = ('card',)
+
     def __init__(self, card: Card):
         card_id = utils.get_card_id(card)
         super().__init__(action_id=discard_action_id + card_id)
@@ -149,6 +178,8 @@ class DiscardAction(ActionEvent):
 
 class KnockAction(ActionEvent):
 
+    __slots__ = ('card',)
+
     def __init__(self, card: Card):
         card_id = utils.get_card_id(card)
         super().__init__(action_id=knock_action_id + card_id)
@@ -156,3 +187,7 @@ class KnockAction(ActionEvent):
 
     def __str__(self):
         return "knock {}".format(str(self.card))
+
+
+# action events are shared by all the games, indexed by action_id
+_action_events = [ActionEvent._make(action_id) for action_id in range(ActionEvent.get_num_actions())]  # want this to be read-only
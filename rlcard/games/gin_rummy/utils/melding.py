@@ -4,7 +4,8 @@
     Date created: 2/12/2020
 '''
 
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
 from rlcard.games.base import Card
 
@@ -19,51 +20,98 @@ from rlcard.games.gin_rummy.utils.gin_rummy_error import GinRummyProgramError
 #        meld_piles - a list of meld_pile
 #        meld_cluster - same as meld_piles, but usually with the piles being mutually disjoint
 #        meld_clusters - a list of meld_cluster
+#
+#    Bitmasks:
+#        A set of cards is also kept as an int with bit utils.get_card_id(card) set for each card.
+#        meld_masks - the masks of every run_meld and set_meld of the deck, runs first
+#        The functions on masks are cached, since the same hands are melded again and again.
 # ===============================================================
 
 
 def get_meld_clusters(hand: List[Card]) -> List[List[List[Card]]]:
-    result = []  # type: List[List[List[Card]]]
-    all_run_melds = [frozenset(x) for x in get_all_run_melds(hand)]
-    all_set_melds = [frozenset(x) for x in get_all_set_melds(hand)]
-    all_melds = all_run_melds + all_set_melds
-    all_melds_count = len(all_melds)
-    for i in range(0, all_melds_count):
-        first_meld = all_melds[i]
-        first_meld_list = list(first_meld)
-        meld_cluster_1 = [first_meld_list]
-        result.append(meld_cluster_1)
-        for j in range(i + 1, all_melds_count):
-            second_meld = all_melds[j]
-            second_meld_list = list(second_meld)
-            if not second_meld.isdisjoint(first_meld):
-                continue
-            meld_cluster_2 = [first_meld_list, second_meld_list]
-            result.append(meld_cluster_2)
-            for k in range(j + 1, all_melds_count):
-                third_meld = all_melds[k]
-                third_meld_list = list(third_meld)
-                if not third_meld.isdisjoint(first_meld) or not third_meld.isdisjoint(second_meld):
-                    continue
-                meld_cluster_3 = [first_meld_list, second_meld_list, third_meld_list]
-                result.append(meld_cluster_3)
-    return result
+    return get_meld_clusters_of_mask(hand_mask=get_hand_mask(hand))
+
+
+def get_meld_clusters_of_mask(hand_mask: int) -> List[List[List[Card]]]:
+    meld_cluster_masks = get_meld_cluster_masks(hand_mask=hand_mask)
+    return [[get_cards(meld_mask) for meld_mask in meld_cluster_mask] for meld_cluster_mask in meld_cluster_masks]
 
 
 def get_best_meld_clusters(hand: List[Card]) -> List[List[List[Card]]]:
     if len(hand) != 10:
         raise GinRummyProgramError("Hand contain {} cards: should be 10 cards.".format(len(hand)))
-    result = []  # type: List[List[List[Card]]]
-    meld_clusters = get_meld_clusters(hand=hand)  # type: List[List[List[Card]]]
-    meld_clusters_count = len(meld_clusters)
-    if meld_clusters_count > 0:
-        deadwood_counts = [utils.get_deadwood_count(hand=hand, meld_cluster=meld_cluster)
-                           for meld_cluster in meld_clusters]
-        best_deadwood_count = min(deadwood_counts)
-        for i in range(meld_clusters_count):
-            if deadwood_counts[i] == best_deadwood_count:
-                result.append(meld_clusters[i])
-    return result
+    _, best_meld_cluster_masks = get_best_deadwood(hand_mask=get_hand_mask(hand))
+    return [[get_cards(meld_mask) for meld_mask in meld_cluster_mask] for meld_cluster_mask in best_meld_cluster_masks]
+
+
+def get_hand_mask(hand: List[Card]) -> int:
+    hand_mask = 0
+    for card in hand:
+        hand_mask |= 1 << utils.get_card_id(card)
+    return hand_mask
+
+
+def get_cards(mask: int) -> List[Card]:
+    ''' Return the cards of a mask in card_id order
+    '''
+    cards = []
+    while mask:
+        low_bit = mask & -mask
+        cards.append(utils.get_card(low_bit.bit_length() - 1))
+        mask ^= low_bit
+    return cards
+
+
+def get_deadwood_count_of_mask(mask: int) -> int:
+    deadwood_count = 0
+    while mask:
+        low_bit = mask & -mask
+        deadwood_count += _deadwood_values[low_bit.bit_length() - 1]
+        mask ^= low_bit
+    return deadwood_count
+
+
+@lru_cache(maxsize=1 << 16)
+def get_meld_cluster_masks(hand_mask: int) -> Tuple[Tuple[int, ...], ...]:
+    ''' Return the meld clusters of a hand, with at most 3 mutually disjoint melds each, as tuples of meld masks
+    '''
+    melds = _get_melds_of_mask(hand_mask)
+    result = []
+    melds_count = len(melds)
+    for i in range(melds_count):
+        first_meld = melds[i]
+        result.append((first_meld,))
+        for j in range(i + 1, melds_count):
+            second_meld = melds[j]
+            if second_meld & first_meld:
+                continue
+            result.append((first_meld, second_meld))
+            for k in range(j + 1, melds_count):
+                third_meld = melds[k]
+                if third_meld & (first_meld | second_meld):
+                    continue
+                result.append((first_meld, second_meld, third_meld))
+    return tuple(result)
+
+
+@lru_cache(maxsize=1 << 16)
+def get_best_deadwood(hand_mask: int) -> Tuple[int, Tuple[Tuple[int, ...], ...]]:
+    ''' Return the least deadwood count of a hand and the meld clusters (as tuples of meld masks) that reach it.
+        A hand without melds has its whole value as deadwood and no meld cluster.
+    '''
+    best_deadwood_count = get_deadwood_count_of_mask(hand_mask)
+    best_meld_cluster_masks = []
+    for meld_cluster_mask in get_meld_cluster_masks(hand_mask):
+        meld_mask = 0
+        for meld in meld_cluster_mask:
+            meld_mask |= meld
+        deadwood_count = get_deadwood_count_of_mask(hand_mask & ~meld_mask)
+        if deadwood_count < best_deadwood_count or not best_meld_cluster_masks:
+            best_deadwood_count = deadwood_count
+            best_meld_cluster_masks = [meld_cluster_mask]
+        elif deadwood_count == best_deadwood_count:
+            best_meld_cluster_masks.append(meld_cluster_mask)
+    return best_deadwood_count, tuple(best_meld_cluster_masks)
 
 
 def get_all_run_melds(hand: List[Card]) -> List[List[Card]]:
@@ -149,3 +197,54 @@ def get_all_run_melds_for_suit(cards: List[Card], suit: str) -> List[List[Card]]
             for j in range(i + 3, max_run_meld_count + 1):
                 result.append(max_run_meld[i:j])
     return result
+
+
+def _get_meld_masks() -> List[int]:
+    result = []
+    for suit_id in range(4):
+        for first_rank_id in range(11):
+            for last_rank_id in range(first_rank_id + 2, 13):
+                run_meld_mask = 0
+                for rank_id in range(first_rank_id, last_rank_id + 1):
+                    run_meld_mask |= 1 << (13 * suit_id + rank_id)
+                result.append(run_meld_mask)
+    for rank_id in range(13):
+        max_set_meld_mask = 0
+        for suit_id in range(4):
+            max_set_meld_mask |= 1 << (13 * suit_id + rank_id)
+        result.append(max_set_meld_mask)
+        for suit_id in range(4):
+            result.append(max_set_meld_mask ^ 1 << (13 * suit_id + rank_id))
+    return result
+
+
+def _get_melds_of_mask(hand_mask: int) -> List[int]:
+    # the run_melds suit by suit, then the set_melds of the ranks held in at least 3 suits, in the order of meld_masks
+    suit_masks = [hand_mask >> (13 * suit_id) & 0x1FFF for suit_id in range(4)]
+    result = []
+    for suit_id, suit_mask in enumerate(suit_masks):
+        if suit_mask & suit_mask >> 1 & suit_mask >> 2:
+            result.extend(_get_run_meld_masks_for_suit(suit_mask=suit_mask, suit_id=suit_id))
+    s, h, d, c = suit_masks
+    set_ranks_mask = s & h & (d | c) | d & c & (s | h)
+    while set_ranks_mask:
+        low_bit = set_ranks_mask & -set_ranks_mask
+        rank_id = low_bit.bit_length() - 1
+        set_meld_mask = hand_mask & _max_set_meld_masks[rank_id]
+        result.append(set_meld_mask)
+        if set_meld_mask == _max_set_meld_masks[rank_id]:
+            for suit_id in range(4):
+                result.append(set_meld_mask ^ 1 << (13 * suit_id + rank_id))
+        set_ranks_mask ^= low_bit
+    return result
+
+
+@lru_cache(maxsize=None)
+def _get_run_meld_masks_for_suit(suit_mask: int, suit_id: int) -> Tuple[int, ...]:
+    return tuple(meld_mask for meld_mask in meld_masks[suit_id * 66:(suit_id + 1) * 66]
+                 if meld_mask >> (13 * suit_id) & suit_mask == meld_mask >> (13 * suit_id))
+
+
+meld_masks = _get_meld_masks()  # want this to be read-only
+_max_set_meld_masks = [sum(1 << (13 * suit_id + rank_id) for suit_id in range(4)) for rank_id in range(13)]
+_deadwood_values = [utils.get_deadwood_value(utils.card_from_card_id(card_id)) for card_id in range(52)]
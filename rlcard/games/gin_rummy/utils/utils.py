@@ -36,6 +36,7 @@ def card_from_card_id(card_id: int) -> Card:
 
 # deck is always in order from AS, 2S, ..., AH, 2H, ..., AD, 2D, ..., AC, 2C, ... QC, KC
 _deck = [card_from_card_id(card_id) for card_id in range(52)]  # want this to be read-only
+_card_ids = {card: card_id for card_id, card in enumerate(_deck)}
 
 
 def card_from_text(text: str) -> Card:
@@ -53,9 +54,7 @@ def get_card(card_id: int):
 
 
 def get_card_id(card: Card) -> int:
-    rank_id = get_rank_id(card)
-    suit_id = get_suit_id(card)
-    return rank_id + 13 * suit_id
+    return _card_ids[card]
 
 
 def get_rank_id(card: Card) -> int:
@@ -107,16 +107,13 @@ class LeducholdemGame(Game):
                 (int): next plater's id
         '''
         if self.allow_step_back:
-            # First snapshot the current state
-            r = copy(self.round)
-            r_raised = copy(self.round.raised)
-            gp = self.game_pointer
-            r_c = self.round_counter
-            d_deck = copy(self.dealer.deck)
-            p = copy(self.public_card)
-            ps = [copy(self.players[i]) for i in range(self.num_players)]
-            ps_hand = [copy(self.players[i].hand) for i in range(self.num_players)]
-            self.history.append((r, r_raised, gp, r_c, d_deck, p, ps, ps_hand))
+            # Record only the fields that the action can change, so that
+            # stepping back does not need to copy the whole game
+            r = self.round
+            p = self.players[r.game_pointer]
+            self.history.append((self.game_pointer, self.round_counter, self.public_card, p.in_chips, p.status,
+                                 r.game_pointer, r.raise_amount, r.have_raised, r.not_raise_num,
+                                 copy(r.raised), r.player_folded))
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -184,10 +181,16 @@ class LeducholdemGame(Game):
             (bool): True if the game steps back successfully
         '''
         if len(self.history) > 0:
-            self.round, r_raised, self.game_pointer, self.round_counter, d_deck, self.public_card, self.players, ps_hand = self.history.pop()
-            self.round.raised = r_raised
-            self.dealer.deck = d_deck
-            for i, hand in enumerate(ps_hand):
-                self.players[i].hand = hand
+            self.game_pointer, self.round_counter, public_card, in_chips, status, \
+                pointer, raise_amount, have_raised, not_raise_num, raised, player_folded = self.history.pop()
+            # Put the dealt public card back on the top of the deck
+            if self.public_card is not public_card:
+                self.dealer.deck.append(self.public_card)
+                self.public_card = public_card
+            self.players[pointer].in_chips = in_chips
+            self.players[pointer].status = status
+            r = self.round
+            r.game_pointer, r.raise_amount, r.have_raised, r.not_raise_num, r.raised, r.player_folded = \
+                pointer, raise_amount, have_raised, not_raise_num, raised, player_folded
             return True
         return False
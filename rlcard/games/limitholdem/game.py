@@ -1,4 +1,4 @@
-from copy import deepcopy, copy
+from copy import copy
 import numpy as np
 
 from rlcard.games.limitholdem import Dealer
@@ -116,15 +116,14 @@ class LimitHoldemGame:
                 (int): next player id
         """
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            rn = copy(self.history_raise_nums)
-            self.history.append((r, b, r_c, d, p, ps, rn))
+            # Record only the fields that the action can change, so that
+            # stepping back does not need to copy the whole game
+            r = self.round
+            p = self.players[r.game_pointer]
+            self.history.append((self.game_pointer, self.round_counter, len(self.public_cards),
+                                 self.history_raise_nums[self.round_counter], p.in_chips, p.status,
+                                 r.game_pointer, r.raise_amount, r.have_raised, r.not_raise_num,
+                                 copy(r.raised), r.player_folded))
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -163,8 +162,17 @@ class LimitHoldemGame:
             (bool): True if the game steps back successfully
         """
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, \
-                self.players, self.history_raises_nums = self.history.pop()
+            self.game_pointer, self.round_counter, num_public_cards, raise_num, in_chips, status, \
+                pointer, raise_amount, have_raised, not_raise_num, raised, player_folded = self.history.pop()
+            # Put the dealt public cards back on the top of the deck
+            while len(self.public_cards) > num_public_cards:
+                self.dealer.deck.append(self.public_cards.pop())
+            self.history_raise_nums[self.round_counter] = raise_num
+            self.players[pointer].in_chips = in_chips
+            self.players[pointer].status = status
+            r = self.round
+            r.game_pointer, r.raise_amount, r.have_raised, r.not_raise_num, r.raised, r.player_folded = \
+                pointer, raise_amount, have_raised, not_raise_num, raised, player_folded
             return True
         return False
 
@@ -1,3 +1,6 @@
+import zlib
+from functools import lru_cache
+
 import numpy as np
 
 class Hand:
@@ -406,209 +409,293 @@ class Hand:
         High_cards = self.all_cards[2:7]
         return High_cards
 
-def compare_ranks(position, hands, winner):
+# Lookup-table hand evaluator
+#
+# A 7-card hand is scored as an integer, the higher the better. The score is
+# category * 16^5 plus the ranks that break ties, most significant first.
+# The categories are the same as Hand.category, from 1 (high card) to
+# 9 (straight flush). The rank multiset of a hand is mapped to a dense index
+# with a perfect hash, so that a hand without a flush is scored with one
+# lookup. With seven cards, a hand with a flush cannot contain a four of a
+# kind or a full house, so a flush is scored by looking up the bitmask of the
+# ranks of the flush suit.
+
+RANKS = '23456789TJQKA'
+SUITS = 'SHDC'
+NUM_HAND_CARDS = 7
+_RANK_INDEX = {rank: i for i, rank in enumerate(RANKS)}
+# The card indices of card2index.json
+_CARD_INDEX = {suit + rank: i * 13 + j for i, suit in enumerate(SUITS) for j, rank in enumerate('A23456789TJQK')}
+
+_NONFLUSH_TABLE = None
+_FLUSH_TABLE = None
+_HASH_TABLE = None
+
+def get_hand_category(score):
     '''
-    Compare cards in same position of plays' five handcards
+    Get the category of a score
     Args:
-        position(int): the position of a card in a sorted handcard
-        hands(list): cards of those players.
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        winner: array of same length than hands with 1 if the hand is among winners and 0 among losers
+        score (int): the score returned by evaluate_hand
     Returns:
-        new updated winner array
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
-
+        (int): the category, 1 for high card to 9 for straight flush
     '''
-    assert len(hands) == len(winner)
-    RANKS = '23456789TJQKA'
-    cards_figure_all_players = [None]*len(hands)  #cards without suit
-    for i, hand in enumerate(hands):
-        if winner[i]:
-            cards = hands[i].get_hand_five_cards()
-            if len(cards[0]) != 1:# remove suit
-                for p in range(5):
-                    cards[p] = cards[p][1:]
-            cards_figure_all_players[i] = cards
-
-    rival_ranks = [] # ranks of rival_figures
-    for i, cards_figure in enumerate(cards_figure_all_players):
-        if winner[i]:
-            rank = cards_figure_all_players[i][position]
-            rival_ranks.append(RANKS.index(rank))
-        else:
-            rival_ranks.append(-1)  # player has already lost
-    new_winner = list(winner)
-    for i, rival_rank in enumerate(rival_ranks):
-        if rival_rank != max(rival_ranks):
-            new_winner[i] = 0
-    return new_winner
-
-def determine_winner(key_index, hands, all_players, potential_winner_index):
+    return score >> 20
+
+def evaluate_hand(cards):
     '''
-    Find out who wins in the situation of having players with same highest hand_catagory
+    Score the best five cards among seven cards
     Args:
-        key_index(int): the position of a card in a sorted handcard
-        hands(list): cards of those players with same highest hand_catagory.
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        all_players(list): all the players in this round, 0 for losing and 1 for winning or draw
-        potential_winner_index(list): the positions of those players with same highest hand_catagory in all_players
+        cards (list): seven cards as strings of suit and rank, e.g. ['CJ', 'SJ', 'H9', 'D9', 'C2', 'C8', 'C7']
     Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
-
+        (int): the score of the hand, a higher score wins
     '''
-    winner = [1]*len(hands)
-    i_index = 0
-    while i_index < len(key_index) and sum(winner) > 1:
-        index_break_tie = key_index[i_index]
-        winner = compare_ranks(index_break_tie, hands, winner)
-        i_index += 1
-    for i in range(len(potential_winner_index)):
-        if winner[i]:
-            all_players[potential_winner_index[i]] = 1
-    return all_players
-
-def determine_winner_straight(hands, all_players, potential_winner_index):
+    if len(cards) != NUM_HAND_CARDS:
+        raise Exception("There are not enough 7 cards in this hand, quit evaluation now ! ")
+    _init_tables()
+    counts = [0] * 13
+    suit_masks = {}
+    suit_counts = {}
+    for card in cards:
+        rank = _RANK_INDEX[card[1]]
+        counts[rank] += 1
+        suit_masks[card[0]] = suit_masks.get(card[0], 0) | (1 << rank)
+        suit_counts[card[0]] = suit_counts.get(card[0], 0) + 1
+    for suit, count in suit_counts.items():
+        if count >= 5:
+            return int(_FLUSH_TABLE[suit_masks[suit]])
+    return int(_NONFLUSH_TABLE[_quinary_hash(counts)])
+
+def evaluate_hands(cards):
     '''
-    Find out who wins in the situation of having players all having a straight or straight flush
+    Score a batch of hands
     Args:
-        key_index(int): the position of a card in a sorted handcard
-        hands(list): cards of those players which all have a straight or straight flush
-        all_players(list): all the players in this round, 0 for losing and 1 for winning or draw
-        potential_winner_index(list): the positions of those players with same highest hand_catagory in all_players
+        cards (numpy.array): card indices with shape (num_hands, 7). The indices
+            follow card2index.json, i.e., suit_index * 13 + rank_index with
+            the suits in the order S, H, D, C and the ranks A, 2, ..., K
     Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
+        (numpy.array): the scores of the hands
     '''
-    highest_ranks = []
-    for hand in hands:
-        highest_rank = hand.STRING_TO_RANK[hand.best_five[-1][1]]  # cards are sorted in ascending order
-        highest_ranks.append(highest_rank)
-    max_highest_rank = max(highest_ranks)
-    for i_player in range(len(highest_ranks)):
-        if highest_ranks[i_player] == max_highest_rank:
-            all_players[potential_winner_index[i_player]] = 1
-    return all_players
-
-def determine_winner_four_of_a_kind(hands, all_players, potential_winner_index):
+    _init_tables()
+    cards = np.asarray(cards, dtype=np.int64)
+    if cards.ndim != 2 or cards.shape[1] != NUM_HAND_CARDS:
+        raise ValueError('Expected card indices with shape (num_hands, 7), got {}'.format(cards.shape))
+    suits = cards // 13
+    ranks = (cards + 12) % 13  # Rank 0 is the deuce and rank 12 the ace
+
+    counts = np.zeros((len(cards), 13), dtype=np.int64)
+    np.add.at(counts, (np.arange(len(cards))[:, np.newaxis], ranks), 1)
+    remaining = NUM_HAND_CARDS - np.cumsum(counts, axis=1) + counts
+    scores = _NONFLUSH_TABLE[_HASH_TABLE[np.arange(13), counts, remaining].sum(axis=1)]
+
+    rank_bits = np.left_shift(1, ranks)
+    for suit in range(len(SUITS)):
+        in_suit = suits == suit
+        flush = in_suit.sum(axis=1) >= 5
+        if flush.any():
+            masks = np.where(in_suit[flush], rank_bits[flush], 0).sum(axis=1)
+            scores[flush] = _FLUSH_TABLE[masks]
+    return scores
+
+def _quinary_hash(counts):
     '''
-    Find out who wins in the situation of having players which all have a four of a kind
+    Map the rank counts of seven cards to a dense index
     Args:
-        key_index(int): the position of a card in a sorted handcard
-        hands(list): cards of those players with a four of a kind
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        all_players(list): all the players in this round, 0 for losing and 1 for winning or draw
-        potential_winner_index(list): the positions of those players with same highest hand_catagory in all_players
+        counts (list): the number of cards of each rank
     Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
+        (int): the index of the rank multiset
     '''
-    ranks = []
-    for hand in hands:
-        rank_1 = hand.STRING_TO_RANK[hand.best_five[-1][1]]  # rank of the four of a kind
-        rank_2 = hand.STRING_TO_RANK[hand.best_five[0][1]]  # rank of the kicker
-        ranks.append((rank_1, rank_2))
-    max_rank = max(ranks)
-    for i, rank in enumerate(ranks):
-        if rank == max_rank:
-            all_players[potential_winner_index[i]] = 1
-    return all_players
+    index = 0
+    remaining = NUM_HAND_CARDS
+    for rank, count in enumerate(counts):
+        index += _HASH_TABLE[rank, count, remaining]
+        remaining -= count
+    return index
+
+def _init_tables():
+    '''
+    Build the lookup tables on first use
+    '''
+    global _NONFLUSH_TABLE, _FLUSH_TABLE, _HASH_TABLE
+    if _NONFLUSH_TABLE is not None:
+        return
+
+    # num_vectors[n][k] is the number of count vectors of length n summing to k
+    num_vectors = np.zeros((14, NUM_HAND_CARDS + 1), dtype=np.int64)
+    num_vectors[0][0] = 1
+    for n in range(1, 14):
+        for k in range(NUM_HAND_CARDS + 1):
+            num_vectors[n][k] = sum(num_vectors[n - 1][k - c] for c in range(min(k, 4) + 1))
+
+    # hash_table[rank, count, k] counts the vectors that come before the
+    # ones with this count at this rank, given k cards left to place
+    hash_table = np.zeros((13, 5, NUM_HAND_CARDS + 1), dtype=np.int64)
+    for rank in range(13):
+        for count in range(5):
+            for k in range(NUM_HAND_CARDS + 1):
+                hash_table[rank, count, k] = sum(num_vectors[12 - rank][k - c] for c in range(min(count, k + 1)) if k - c >= 0)
+    _HASH_TABLE = hash_table
+
+    nonflush_table = np.zeros(num_vectors[13][NUM_HAND_CARDS], dtype=np.int64)
+    for counts in _count_vectors(13, NUM_HAND_CARDS):
+        nonflush_table[_quinary_hash(counts)] = _score_counts(counts)
+
+    flush_table = np.zeros(1 << 13, dtype=np.int64)
+    for mask in range(1 << 13):
+        ranks = [rank for rank in range(12, -1, -1) if mask >> rank & 1]
+        if len(ranks) >= 5:
+            high = _straight_high(mask)
+            flush_table[mask] = _pack(9, [high]) if high is not None else _pack(6, ranks[:5])
+    _FLUSH_TABLE = flush_table
+    _NONFLUSH_TABLE = nonflush_table
+
+def _count_vectors(length, total):
+    '''
+    Generate the count vectors with entries from 0 to 4
+    '''
+    if length == 0:
+        if total == 0:
+            yield []
+        return
+    for count in range(min(total, 4) + 1):
+        for rest in _count_vectors(length - 1, total - count):
+            yield [count] + rest
+
+def _pack(category, ranks):
+    score = category
+    for i in range(5):
+        score = score * 16 + (ranks[i] if i < len(ranks) else 0)
+    return score
+
+def _straight_high(mask):
+    '''
+    Get the highest rank of a straight in a bitmask of ranks, None if there is no straight
+    '''
+    for high in range(12, 3, -1):
+        if mask >> (high - 4) & 0b11111 == 0b11111:
+            return high
+    if mask & 0b1111 == 0b1111 and mask >> 12 & 1:
+        return 3  # A-2-3-4-5
+    return None
+
+def _score_counts(counts):
+    '''
+    Score the best five cards of a rank multiset, ignoring flushes
+    '''
+    ranks = [rank for rank in range(12, -1, -1) if counts[rank] > 0]
+    quads = [rank for rank in ranks if counts[rank] == 4]
+    trips = [rank for rank in ranks if counts[rank] == 3]
+    pairs = [rank for rank in ranks if counts[rank] == 2]
+    if quads:
+        return _pack(8, [quads[0]] + [rank for rank in ranks if rank != quads[0]][:1])
+    if trips and (len(trips) > 1 or pairs):
+        return _pack(7, [trips[0], max(trips[1:] + pairs)])
+    high = _straight_high(sum(1 << rank for rank in ranks))
+    if high is not None:
+        return _pack(5, [high])
+    if trips:
+        return _pack(4, trips + [rank for rank in ranks if rank != trips[0]][:2])
+    if len(pairs) > 1:
+        return _pack(3, pairs[:2] + [rank for rank in ranks if rank not in pairs[:2]][:1])
+    if pairs:
+        return _pack(2, pairs + [rank for rank in ranks if rank != pairs[0]][:3])
+    return _pack(1, ranks[:5])
+
+def canonicalize_cards(hand, public_cards):
+    '''
+    Map the cards to a canonical representative of their suit-isomorphic
+    class. The suits are relabeled in the order of the ranks they hold in
+    the hand and then on the board, so that hands that only differ by a
+    permutation of the suits (e.g. ['SA', 'SK'] and ['HA', 'HK']) get the
+    same cards.
+    Args:
+        hand (list): the hole cards, e.g. ['SA', 'HK']
+        public_cards (list): the public cards
+    Returns:
+        (tuple): Tuple containing:
 
-def compare_hands(hands):
+            (tuple): the sorted canonical hole cards
+            (tuple): the sorted canonical public cards
     '''
-    Compare all palyer's all seven cards
+    signatures = {}
+    for suit in SUITS:
+        signatures[suit] = (sorted((_RANK_INDEX[card[1]] for card in hand if card[0] == suit), reverse=True),
+                            sorted((_RANK_INDEX[card[1]] for card in public_cards if card[0] == suit), reverse=True))
+    order = sorted(SUITS, key=lambda suit: signatures[suit], reverse=True)
+    mapping = {suit: SUITS[i] for i, suit in enumerate(order)}
+    return (tuple(sorted(mapping[card[0]] + card[1] for card in hand)),
+            tuple(sorted(mapping[card[0]] + card[1] for card in public_cards)))
+
+def estimate_equity(hand, public_cards, num_opponents=1, num_samples=1000):
+    '''
+    Estimate the equity of the hole cards against random hands of the
+    opponents by sampling the opponent hands and the rest of the board.
+    The estimates are cached by suit-isomorphic class, so repeated queries
+    only cost a lookup. The sampling is seeded by the canonical cards,
+    which makes the estimates deterministic.
     Args:
-        hands(list): cards of those players with same highest hand_catagory.
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
+        hand (list): the two hole cards, e.g. ['SA', 'HK']
+        public_cards (list): the public cards, from zero to five cards
+        num_opponents (int): the number of opponents
+        num_samples (int): the number of sampled showdowns
     Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
+        (tuple): Tuple containing:
 
-    if hands[0] == None:
-        return [0, 1]
-    elif hands[1] == None:
-        return [1, 0]
+            (float): the probability of winning
+            (float): the probability of a tie
+            (float): the equity, i.e., the expected share of the pot
     '''
-    hand_category = [] #such as high_card, straight_flush, etc
-    all_players = [0]*len(hands) #all the players in this round, 0 for losing and 1 for winning or draw
-    if None in hands:
-        fold_players = [i for i, j in enumerate(hands) if j is None]
-        if len(fold_players) == len(all_players) - 1:
-            for _ in enumerate(hands):
-                if _[0] in fold_players:
-                    all_players[_[0]] = 0
-                else:
-                    all_players[_[0]] = 1
-            return all_players
-        else:
-            for _ in enumerate(hands):
-                if hands[_[0]] is not None:
-                    hand = Hand(hands[_[0]])
-                    hand.evaluateHand()
-                    hand_category.append(hand.category)
-                elif hands[_[0]] is None:
-                    hand_category.append(0)
-    else:
-            for i in enumerate(hands):
-                hand = Hand(hands[i[0]])
-                hand.evaluateHand()
-                hand_category.append(hand.category)
-    potential_winner_index = [i for i, j in enumerate(hand_category) if j == max(hand_category)]# potential winner are those with same max card_catagory
-
-    return final_compare(hands, potential_winner_index, all_players)
-
-def final_compare(hands, potential_winner_index, all_players):
+    if len(hand) != 2 or len(public_cards) > 5:
+        raise ValueError('Expected two hole cards and at most five public cards, got {} and {}'.format(hand, public_cards))
+    # Our 2 hole cards, a full board of 5 and 2 hole cards per opponent
+    if 7 + 2 * num_opponents > 52:
+        raise ValueError('Not enough cards for {} opponents'.format(num_opponents))
+    return _lookup_equity(tuple(hand), tuple(public_cards), num_opponents, num_samples)
+
+@lru_cache(maxsize=65536)
+def _lookup_equity(hand, public_cards, num_opponents, num_samples):
+    # Cache the queries as they are to skip the canonicalization
+    hand, public_cards = canonicalize_cards(hand, public_cards)
+    return _estimate_equity(hand, public_cards, num_opponents, num_samples)
+
+@lru_cache(maxsize=65536)
+def _estimate_equity(hand, public_cards, num_opponents, num_samples):
+    rng = np.random.RandomState(zlib.crc32(repr((hand, public_cards, num_opponents)).encode()))
+    known = np.array([_CARD_INDEX[card] for card in hand + public_cards], dtype=np.int64)
+    deck = np.setdiff1d(np.arange(52), known)
+    num_board_cards = 5 - len(public_cards)
+
+    # Each row is a random permutation of the remaining deck, whose first
+    # cards complete the board and the next ones are the opponent hands
+    drawn = deck[np.argsort(rng.rand(num_samples, len(deck)), axis=1)[:, :num_board_cards + 2 * num_opponents]]
+    board = np.concatenate([np.broadcast_to(known[2:], (num_samples, len(public_cards))),
+                            drawn[:, :num_board_cards]], axis=1)
+    player_hands = np.concatenate([np.broadcast_to(known[:2], (num_samples, 2)), board], axis=1)
+    opponent_hands = np.concatenate([drawn[:, num_board_cards:].reshape(num_samples, num_opponents, 2),
+                                     np.broadcast_to(board[:, np.newaxis], (num_samples, num_opponents, 5))], axis=2)
+
+    scores = evaluate_hands(np.concatenate([player_hands, opponent_hands.reshape(-1, NUM_HAND_CARDS)]))
+    player_scores = scores[:num_samples]
+    opponent_scores = scores[num_samples:].reshape(num_samples, num_opponents)
+    best_opponent_scores = opponent_scores.max(axis=1)
+    wins = player_scores > best_opponent_scores
+    ties = player_scores == best_opponent_scores
+    num_tied = (opponent_scores == player_scores[:, np.newaxis]).sum(axis=1)
+    return float(wins.mean()), float(ties.mean()), float(np.mean(wins + ties / (num_tied + 1)))
+
+def compare_hands(hands):
     '''
-    Find out the winners from those who didn't fold
+    Compare all palyer's all seven cards
     Args:
-        hands(list): cards of those players with same highest hand_catagory.
+        hands(list): cards of those players, None for the players who folded.
         e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        potential_winner_index(list): index of those with same max card_catagory in all_players
-        all_players(list): a list of all the player's win/lose situation, 0 for lose and 1 for win
     Returns:
         [0, 1, 0]: player1 wins
         [1, 0, 0]: player0 wins
         [1, 1, 1]: draw
         [1, 1, 0]: player1 and player0 draws
-
-    if hands[0] == None:
-        return [0, 1]
-    elif hands[1] == None:
-        return [1, 0]
     '''
-    if len(potential_winner_index) == 1:
-        all_players[potential_winner_index[0]] = 1
-        return all_players
-    elif len(potential_winner_index) > 1:
-        # compare when having equal max categories
-        equal_hands = []
-        for _ in potential_winner_index:
-            hand = Hand(hands[_])
-            hand.evaluateHand()
-            equal_hands.append(hand)
-        hand = equal_hands[0]
-        if hand.category == 8:
-            return determine_winner_four_of_a_kind(equal_hands, all_players, potential_winner_index)
-        if hand.category == 7:
-            return determine_winner([2, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 4:
-            return determine_winner([2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 3:
-            return determine_winner([4, 2, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 2:
-            return determine_winner([4, 2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 1 or hand.category == 6:
-            return determine_winner([4, 3, 2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category in [5, 9]:
-            return determine_winner_straight(equal_hands, all_players, potential_winner_index)
+    if sum(hand is not None for hand in hands) == 1:
+        return [int(hand is not None) for hand in hands]
+    scores = [evaluate_hand(hand) if hand is not None else -1 for hand in hands]
+    best_score = max(scores)
+    return [int(score == best_score) for score in scores]
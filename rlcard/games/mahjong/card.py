@@ -1,6 +1,8 @@
 
 class MahjongCard:
 
+    __slots__ = ('type', 'trait', 'index_num', 'str')
+
     info = {'type':  ['dots', 'bamboo', 'characters', 'dragons', 'winds'],
             'trait': ['1', '2', '3', '4', '5', '6', '7', '8', '9', 'green', 'red', 'white', 'east', 'west', 'north', 'south']
             }
@@ -15,6 +17,13 @@ class MahjongCard:
         self.type = card_type
         self.trait = trait
         self.index_num = 0
+        self.str = card_type + '-' + trait
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def get_str(self):
         ''' Get the string representation of card
@@ -22,7 +31,7 @@ class MahjongCard:
         Return:
             (str): The string of card's color and trait
         '''
-        return self.type+ '-'+ self.trait
+        return self.str
 
     def set_index_num(self, index_num):
 
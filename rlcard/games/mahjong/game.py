@@ -1,5 +1,4 @@
 import numpy as np
-from copy import deepcopy
 
 from rlcard.games.mahjong import Dealer
 from rlcard.games.mahjong import Player
@@ -61,10 +60,16 @@ class MahjongGame:
         '''
         # First snapshot the current state
         if self.allow_step_back:
-            hist_dealer = deepcopy(self.dealer)
-            hist_round = deepcopy(self.round)
-            hist_players = deepcopy(self.players)
-            self.history.append((hist_dealer, hist_players, hist_round))
+            # Record only the fields that the action can change, so that
+            # stepping back does not need to copy the whole game. An action
+            # deals at most one card from the deck and takes at most the
+            # last card from the table.
+            r = self.round
+            player = self.players[r.current_player]
+            self.history.append((r.current_player, r.last_player, r.player_before_act, r.valid_act, r.last_cards,
+                                 self.cur_state, player.hand.copy(), [len(p.hand) for p in self.players],
+                                 len(player.pile), len(self.dealer.table), self.dealer.table[-1:],
+                                 len(self.dealer.deck), self.dealer.deck[-1:]))
         self.round.proceed_round(self.players, action)
         state = self.get_state(self.round.current_player)
         self.cur_state = state
@@ -78,7 +83,18 @@ class MahjongGame:
         '''
         if not self.history:
             return False
-        self.dealer, self.players, self.round = self.history.pop()
+        r = self.round
+        r.current_player, r.last_player, r.player_before_act, r.valid_act, r.last_cards, self.cur_state, \
+            hand, hand_lens, pile_len, table_len, table_tail, deck_len, deck_tail = self.history.pop()
+        del self.dealer.table[table_len - len(table_tail):]
+        self.dealer.table.extend(table_tail)
+        del self.dealer.deck[deck_len - len(deck_tail):]
+        self.dealer.deck.extend(deck_tail)
+        for player, hand_len in zip(self.players, hand_lens):
+            del player.hand[hand_len:]
+        player = self.players[r.current_player]
+        player.hand[:] = hand
+        del player.pile[pile_len:]
         return True
 
     def get_state(self, player_id):
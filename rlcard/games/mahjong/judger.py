@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 ''' Implement Mahjong Judger class
 '''
-from collections import defaultdict
 import numpy as np
 
+from rlcard.games.mahjong.utils import card_encoding_dict, card_decoding_dict, num_kinds
+from rlcard.games.mahjong.utils import cards2counts, get_sets, get_set_count, get_max_set_count_with_pair
+
 class MahjongJudger:
     ''' Determine what cards a player can play
     '''
@@ -28,9 +30,6 @@ class MahjongJudger:
         #last_card_type = last_card_str.split("-")[0]
         for player in players:
             hand = [card.get_str() for card in player.hand]
-            hand_dict = defaultdict(list)
-            for card in hand:
-                hand_dict[card.split("-")[0]].append(card.split("-")[1])
             #pile = player.pile
             # check gong
             if hand.count(last_card_str) == 3 and last_player != player.player_id:
@@ -49,8 +48,7 @@ class MahjongJudger:
         '''
 
         last_card = dealer.table[-1]
-        last_card_str = last_card.get_str()
-        last_card_type = last_card_str.split("-")[0]
+        last_card_type = last_card.type
         last_card_index = last_card.index_num
         for player in players:
             if last_card_type != "dragons" and last_card_type != "winds" and last_player == player.get_player_id() - 1:
@@ -61,7 +59,7 @@ class MahjongJudger:
                 hand_list = np.zeros(9)
 
                 for card in player.hand:
-                    if card.get_str().split("-")[0] == last_card_type:
+                    if card.type == last_card_type:
                         hand_list[card.index_num] = hand_list[card.index_num]+1
 
                 #pile = player.pile
@@ -84,7 +82,7 @@ class MahjongJudger:
                     cards = []
                     for i in l:
                         for card in player.hand:
-                            if card.index_num == i and card.get_str().split("-")[0] == last_card_type:
+                            if card.index_num == i and card.type == last_card_type:
                                 cards.append(card)
                                 break
                     cards.append(last_card)
@@ -120,47 +118,16 @@ class MahjongJudger:
             Result (bool): Win or not
             Maximum_score (int): Set count score of the player
         '''
-        set_count = 0
-        hand = [card.get_str() for card in player.hand]
-        count_dict = {card: hand.count(card) for card in hand}
         set_count = len(player.pile)
         if set_count >= 4:
             return True, set_count
-        used = []
-        maximum = 0
-        for each in count_dict:
-            if each in used:
-                continue
-            tmp_set_count = 0
-            tmp_hand = hand.copy()
-            if count_dict[each] == 2:
-                for _ in range(count_dict[each]):
-                    tmp_hand.pop(tmp_hand.index(each))
-                tmp_set_count, _set = self.cal_set(tmp_hand)
-                used.extend(_set)
-                if tmp_set_count + set_count > maximum:
-                    maximum = tmp_set_count + set_count
-                if tmp_set_count + set_count >= 4:
-                    #print(player.get_player_id(), sorted([card.get_str() for card in player.hand]))
-                    #print([[c.get_str() for c in s] for s in player.pile])
-                    #print(len(player.hand), sum([len(s) for s in player.pile]))
-                    #exit()
-                    return True, maximum
-        return False, maximum
-
-    @staticmethod
-    def check_consecutive(_list):
-        ''' Check if list is consecutive
-        Args:
-            _list (list): The target list
-
-        Return:
-            Result (bool): consecutive or not
-        '''
-        l = list(map(int, _list))
-        if sorted(l) == list(range(min(l), max(l)+1)):
-            return True
-        return False
+        counts = cards2counts(player.hand)
+        hand_set_count = get_max_set_count_with_pair(counts)
+        if hand_set_count < 0:
+            # without a pair the hand can not win
+            return False, set_count + get_set_count(counts)
+        maximum = set_count + hand_set_count
+        return maximum >= 4, maximum
 
     def cal_set(self, cards):
         ''' Calculate the set for given cards
@@ -171,45 +138,11 @@ class MahjongJudger:
             Set_count (int):
             Sets (list): List of cards that has been pop from user's hand
         '''
-        tmp_cards = cards.copy()
-        sets = []
-        set_count = 0
-        _dict = {card: tmp_cards.count(card) for card in tmp_cards}
-        # check pong/gang
-        for each in _dict:
-            if _dict[each] == 3 or _dict[each] == 4:
-                set_count += 1
-                for _ in range(_dict[each]):
-                    tmp_cards.pop(tmp_cards.index(each))
-
-        # get all of the traits of each type in hand (except dragons and winds)
-        _dict_by_type = defaultdict(list)
-        for card in tmp_cards:
-            _type = card.split("-")[0]
-            _trait = card.split("-")[1]
-            if _type == 'dragons' or _type == 'winds':
-                continue
-            else:
-                _dict_by_type[_type].append(_trait)
-        for _type in _dict_by_type.keys():
-            values = sorted(_dict_by_type[_type])
-            if len(values) > 2:
-                for index, _ in enumerate(values):
-                    if index == 0:
-                        test_case = [values[index], values[index+1], values[index+2]]
-                    elif index == len(values)-1:
-                        test_case = [values[index-2], values[index-1], values[index]]
-                    else:
-                        test_case = [values[index-1], values[index], values[index+1]]
-                    if self.check_consecutive(test_case):
-                        set_count += 1
-                        for each in test_case:
-                            values.pop(values.index(each))
-                            c = _type+"-"+str(each)
-                            sets.append(c)
-                            if c in tmp_cards:
-                                tmp_cards.pop(tmp_cards.index(c))
-        return set_count, sets
+        counts = [0] * num_kinds
+        for card in cards:
+            counts[card_encoding_dict[card]] += 1
+        sets = get_sets(counts)
+        return len(sets), [card_decoding_dict[index] for _set in sets for index in _set]
 
 #if __name__ == "__main__":
 #    judger = MahjongJudger()
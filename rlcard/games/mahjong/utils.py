@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 from rlcard.games.mahjong.card import MahjongCard as Card
 
@@ -25,7 +27,7 @@ card_encoding_dict['stand'] = num + 3
 
 card_decoding_dict = {card_encoding_dict[key]: key for key in card_encoding_dict.keys()}
 
-def init_deck():
+def _init_cards():
     deck = []
     info = Card.info
     for _type in info['type']:
@@ -48,10 +50,17 @@ def init_deck():
                 card.set_index_num(index_num)
                 index_num = index_num + 1
                 deck.append(card)
-    deck = deck * 4
     return deck
 
 
+# every game shares these 34 cards, which are never modified after they are created
+_cards = _init_cards()
+
+
+def init_deck():
+    return _cards * 4
+
+
 def pile2list(pile):
     cards_list = []
     for each in pile:
@@ -73,3 +82,121 @@ def encode_cards(cards):
         num = cards.count(card)
         plane[index][:num] = 1
     return plane
+
+
+# The 34 kinds of cards in the order of card_encoding_dict: bamboo, characters and dots
+# (9 each, the suits that make chows), then the dragons and the winds
+suit_ranges = [(0, 9), (9, 18), (18, 27)]
+num_kinds = 34
+
+
+def cards2counts(cards):
+    ''' Count the cards of each of the 34 kinds
+
+    Args:
+        cards (list): List of MahjongCard
+
+    Returns:
+        (list): The 34 counts, indexed as card_encoding_dict
+    '''
+    counts = [0] * num_kinds
+    for card in cards:
+        counts[card_encoding_dict[card.str]] += 1
+    return counts
+
+
+@lru_cache(maxsize=None)
+def get_suit_sets(suit_counts):
+    ''' Split the cards of one suit into as many sets (pongs and chows) as possible
+
+    Args:
+        suit_counts (tuple): The counts of the 9 cards of a suit
+
+    Returns:
+        (tuple): The sets, each a tuple of 3 indexes in the suit
+    '''
+    for index, count in enumerate(suit_counts):
+        if count:
+            break
+    else:
+        return ()
+    counts = list(suit_counts)
+    # leave one card of the lowest kind out of the sets
+    counts[index] -= 1
+    best_sets = get_suit_sets(tuple(counts))
+    counts[index] += 1
+    if count >= 3:
+        counts[index] -= 3
+        sets = ((index,) * 3,) + get_suit_sets(tuple(counts))
+        counts[index] += 3
+        if len(sets) > len(best_sets):
+            best_sets = sets
+    if index < 7 and counts[index + 1] and counts[index + 2]:
+        for i in range(index, index + 3):
+            counts[i] -= 1
+        sets = ((index, index + 1, index + 2),) + get_suit_sets(tuple(counts))
+        if len(sets) > len(best_sets):
+            best_sets = sets
+    return best_sets
+
+
+def get_sets(counts):
+    ''' Split cards into as many sets (pongs and chows) as possible. Suits are
+        split independently with get_suit_sets, dragons and winds only make pongs.
+
+    Args:
+        counts (list): The 34 counts of the cards, as returned by cards2counts
+
+    Returns:
+        (list): The sets, each a list of 3 indexes in card_encoding_dict
+    '''
+    sets = []
+    for start, end in suit_ranges:
+        for suit_set in get_suit_sets(tuple(counts[start:end])):
+            sets.append([start + index for index in suit_set])
+    for index in range(suit_ranges[-1][1], num_kinds):
+        if counts[index] >= 3:
+            sets.append([index] * 3)
+    return sets
+
+
+def get_set_count(counts):
+    ''' Return the largest number of sets (pongs and chows) in the cards
+    '''
+    set_count = 0
+    for start, end in suit_ranges:
+        set_count += len(get_suit_sets(tuple(counts[start:end])))
+    for index in range(suit_ranges[-1][1], num_kinds):
+        if counts[index] >= 3:
+            set_count += 1
+    return set_count
+
+
+def get_max_set_count_with_pair(counts):
+    ''' Return the largest number of sets (pongs and chows) in the cards when two
+        equal cards are kept out of them as the pair of a winning hand
+
+    Args:
+        counts (list): The 34 counts of the cards, as returned by cards2counts
+
+    Returns:
+        (int): The set count, -1 if there is no pair
+    '''
+    suit_set_counts = [len(get_suit_sets(tuple(counts[start:end]))) for start, end in suit_ranges]
+    honor_set_count = sum(count >= 3 for count in counts[suit_ranges[-1][1]:])
+    total_set_count = sum(suit_set_counts) + honor_set_count
+    maximum = -1
+    for index, count in enumerate(counts):
+        if count < 2:
+            continue
+        counts[index] -= 2
+        if index < suit_ranges[-1][1]:
+            suit_id = index // 9
+            start, end = suit_ranges[suit_id]
+            set_count = total_set_count - suit_set_counts[suit_id] + len(get_suit_sets(tuple(counts[start:end])))
+        else:
+            set_count = total_set_count - (count >= 3)
+        counts[index] += 2
+        maximum = max(maximum, set_count)
+    return maximum
+
@@ -29,4 +29,4 @@ class MariaDealer:
             num (int): The number of cards to be dealt
         '''
         for _ in range(num):
-            player.hand.append(self.stock_pile.pop())
+            player.add_card_to_hand(card=self.stock_pile.pop())
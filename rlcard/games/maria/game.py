@@ -4,12 +4,11 @@
     Date created: 11/25/2021
 '''
 
-from copy import deepcopy
 from typing import List
 
 import numpy as np
 
-from rlcard.games.maria.utils.maria_card import MariaCard
+from rlcard.games.maria.utils.utils import get_points, two_of_clubs_mask
 
 from .judger import MariaJudger
 from .round import MariaRound
@@ -44,7 +43,7 @@ class MariaGame:
             player.order_cards()
         first_player = self.round.current_player_id
         for player in self.round.players:
-            if MariaCard('C', '2') in player.hand:
+            if player.hand_mask & two_of_clubs_mask:
                 first_player = player.player_id
                 break
         current_player_id = first_player
@@ -64,7 +63,7 @@ class MariaGame:
             player.order_cards()
         first_player = self.round.current_player_id
         for player in self.round.players:
-            if MariaCard('C', '2') in player.hand:
+            if player.hand_mask & two_of_clubs_mask:
                 first_player = player.player_id
                 break
         current_player_id = first_player
@@ -77,12 +76,20 @@ class MariaGame:
         '''
 
         if self.allow_step_back:
-            sb_actions = deepcopy(self.actions)
-            sb_won_points = deepcopy(self.won_points)
-            sb_round_number = deepcopy(self.round_number)
-            sb_round = deepcopy(self.round)
-            sb_round_current_player_id = deepcopy(self.round.current_player_id)
-            self.history.append((sb_actions, sb_won_points, sb_round_number, sb_round, sb_round_current_player_id))
+            # Record only the fields that the action can change, so that
+            # stepping back does not need to copy the whole game. The round
+            # is kept by reference since a finished round is replaced rather
+            # than modified by init_round.
+            r = self.round
+            hand = r.players[r.current_player_id].hand
+            hand_index = hand.index(action.card)
+            # Finishing the trades hands the traded cards to every player
+            hands = [player.hand.copy() for player in r.players] if r.is_start() else None
+            self.history.append((self.actions, len(self.actions), self.won_points.copy(), self.round_number, r,
+                                 r.current_player_id, r.play_card_count, len(r.move_sheet),
+                                 [len(pile) for pile in r.won_pile], [len(pile) for pile in r.trade_pile],
+                                 hand_index, hand[hand_index], hands, [player.hand_mask for player in r.players],
+                                 r.trick_moves.copy(), r.won_masks.copy(), r.trick_mask, r.hearts_broken))
 
         if isinstance(action, PlayCardAction):
             self.round.play_card(action=action)
@@ -93,11 +100,8 @@ class MariaGame:
         self.actions.append(action)
         if self.round.is_over():
             for player in self.round.players:
-                for card in self.round.won_pile[player.player_id]:
-                    if card.suit == 'H':
-                        self.won_points[player.player_id] -= 1
-                    elif card.suit == 'S' and card.rank == 'Q':
-                        self.won_points[player.player_id] -= 13
+                won_mask = self.round.won_masks[player.player_id]
+                self.won_points[player.player_id] += get_points(won_mask)
                 if self.won_points[player.player_id] == -26:
                     if len(self.round.won_pile[player.player_id]) == 13:
                         for player_id in self.round.players:
@@ -129,7 +133,26 @@ class MariaGame:
         '''
         if not self.history:
             return False
-        self.actions, self.won_points, self.round_number, self.round, self.round.current_player_id = self.history.pop()
+        self.actions, num_actions, self.won_points, self.round_number, self.round, current_player_id, \
+            play_card_count, num_moves, won_pile_lens, trade_pile_lens, hand_index, card, hands, hand_masks, \
+            trick_moves, won_masks, trick_mask, hearts_broken = self.history.pop()
+        del self.actions[num_actions:]
+        r = self.round
+        r.current_player_id = current_player_id
+        r.play_card_count = play_card_count
+        r.trick_moves, r.won_masks, r.trick_mask, r.hearts_broken = trick_moves, won_masks, trick_mask, hearts_broken
+        for player, hand_mask in zip(r.players, hand_masks):
+            player.hand_mask = hand_mask
+        del r.move_sheet[num_moves:]
+        for pile, pile_len in zip(r.won_pile, won_pile_lens):
+            del pile[pile_len:]
+        for pile, pile_len in zip(r.trade_pile, trade_pile_lens):
+            del pile[pile_len:]
+        if hands is not None:
+            for player, hand in zip(r.players, hands):
+                player.hand[:] = hand
+        else:
+            r.players[current_player_id].hand.insert(hand_index, card)
         return True
 
     def get_num_players(self) -> int:
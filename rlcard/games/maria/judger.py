@@ -10,8 +10,8 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .game import MariaGame
 
-from .utils.action_event import ActionEvent, PlayCardAction, TradeCardAction
-from .utils.maria_card import MariaCard
+from .utils.action_event import ActionEvent
+from .utils.utils import get_suit_mask, hearts_mask, iter_card_ids, two_of_clubs_mask
 
 class MariaJudger:
 
@@ -32,32 +32,24 @@ class MariaJudger:
         legal_actions: List[ActionEvent] = []
         if not self.game.round.is_over():
             current_player = self.game.round.get_current_player()
-            hand = self.game.round.players[current_player.player_id].hand
+            hand_mask = self.game.round.players[current_player.player_id].hand_mask
             if self.game.round.is_start():
-                for card in hand:
-                    action = TradeCardAction(card=card)
-                    legal_actions.append(action)
+                legal_mask = hand_mask
+                first_action_id = ActionEvent.first_trade_card_action_id
             else:
-                trick_moves = self.game.round.get_trick_moves()
-                is_hearts_broken = False
-                legal_cards = hand
+                trick_moves = self.game.round.trick_moves
+                legal_mask = hand_mask
                 if trick_moves and len(trick_moves) < 4:
-                    led_card: MariaCard = trick_moves[0].card
-                    cards_of_led_suit = [card for card in hand if card.suit == led_card.suit]
+                    cards_of_led_suit = hand_mask & get_suit_mask(trick_moves[0].card)
                     if cards_of_led_suit:
-                        legal_cards = cards_of_led_suit
-                for pile in self.game.round.won_pile:
-                    if [i for i in pile if i in [MariaCard.card(i) for i in range(26, 39)]]:
-                        is_hearts_broken = True
-                        break
-                if not is_hearts_broken and len(trick_moves) == 4:
-                    if not [i for i in hand if i not in [MariaCard.card(i) for i in range(26, 39)]]:
-                        legal_cards = hand
-                    else:
-                        legal_cards = [i for i in hand if i not in [MariaCard.card(i) for i in range(26, 39)]]
+                        legal_mask = cards_of_led_suit
+                if not self.game.round.hearts_broken and len(trick_moves) == 4:
+                    # cannot lead a heart before hearts are broken, unless the hand has only hearts
+                    if hand_mask & ~hearts_mask:
+                        legal_mask = hand_mask & ~hearts_mask
                 if self.game.round.is_first_trick() and self.game.round.play_card_count == 0:
-                    legal_cards = [MariaCard('C', '2')]
-                for card in legal_cards:
-                    action = PlayCardAction(card=card)
-                    legal_actions.append(action)
+                    legal_mask = two_of_clubs_mask
+                first_action_id = ActionEvent.first_play_card_action_id
+            for card_id in iter_card_ids(legal_mask):
+                legal_actions.append(ActionEvent.from_action_id(first_action_id + card_id))
         return legal_actions
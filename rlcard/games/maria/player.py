@@ -20,12 +20,15 @@ class MariaPlayer:
             raise Exception(f'MariaPlayer has invalid player_id: {player_id}')
         self.player_id: int = player_id
         self.hand: List[MariaCard] = []
+        self.hand_mask: int = 0  # bitboard of the cards in hand
 
     def remove_card_from_hand(self, card: MariaCard):
         self.hand.remove(card)
+        self.hand_mask &= ~(1 << card.card_id)
 
     def add_card_to_hand(self, card: MariaCard):
         self.hand.append(card)
+        self.hand_mask |= 1 << card.card_id
 
     def order_cards(self):
         self.hand.sort(key=lambda e:e.card_id)
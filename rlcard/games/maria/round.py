@@ -14,6 +14,7 @@ from .player import MariaPlayer
 from .utils.action_event import PlayCardAction, TradeCardAction
 from .utils.move import MariaMove, DealHandMove, PlayCardMove, TradeCardMove
 from .utils.tray import Tray
+from .utils.utils import get_suit_mask, hearts_mask, two_of_clubs_mask
 
 class MariaRound:
 
@@ -38,6 +39,9 @@ class MariaRound:
                 3) current_player_id: the id of the current player who has the move
                 4) play_card_count: count of PlayCardMoves
                 5) move_sheet: history of the moves of the players (including the deal_hand_move)
+                6) trick_moves: the PlayCardMoves of the current (or just completed) trick
+                7) won_masks, trick_mask, hearts_broken: bitboards of the won piles and of the current trick,
+                   and whether a heart has been won, kept in step with the piles by play_card
 
             The round class maintains a list of moves made by the players in self.move_sheet.
             move_sheet is similar to a chess score sheet.
@@ -55,6 +59,7 @@ class MariaRound:
             tray = Tray(dealer_id)
         dealer_id = tray.dealer_id
         self.tray = tray
+        self.round_number = round_number
         self.np_random = np_random
         self.dealer: MariaDealer = MariaDealer(self.np_random)
         self.players: List[MariaPlayer] = []
@@ -66,16 +71,15 @@ class MariaRound:
         self.move_sheet: List[MariaMove] = []
         self.move_sheet.append(DealHandMove(dealer=self.players[dealer_id], shuffled_deck=self.dealer.shuffled_deck))
         self.current_player_id: int = dealer_id
+        self.trick_moves: List[PlayCardMove] = []
+        self.won_masks: List[int] = [0, 0, 0, 0]
+        self.trick_mask: int = 0
+        self.hearts_broken: bool = False
 
     def is_over(self) -> bool:
         ''' Return whether the current round is over
         '''
-        is_over = True
-        for player in self.players:
-            if player.hand:
-                is_over = False
-                break
-        return is_over
+        return not any(player.hand_mask for player in self.players)
 
     def is_start(self) -> bool:
         ''' Return whether the current round just started
@@ -100,56 +104,39 @@ class MariaRound:
     def is_first_trick(self) -> bool:
         ''' Return whether no tricks have been won yet
         '''
-        is_first_trick = True
-        for pile in self.won_pile:
-            if len(pile) > 0:
-                is_first_trick = False
-                break
-        return is_first_trick
+        return not any(self.won_masks)
 
     def get_current_player(self) -> MariaPlayer or None:
         current_player_id = self.current_player_id
         return None if current_player_id is None else self.players[current_player_id]
 
     def get_trick_moves(self) -> List[PlayCardMove]:
-        trick_moves: List[PlayCardMove] = []
-        if self.play_card_count > 0:
-            trick_pile_count = self.play_card_count % 4
-            if trick_pile_count == 0:
-                trick_pile_count = 4  # wch: note this
-            for move in self.move_sheet[-trick_pile_count:]:
-                if isinstance(move, PlayCardMove):
-                    trick_moves.append(move)
-            if len(trick_moves) != trick_pile_count:
-                raise Exception(f'get_trick_moves: count of trick_moves={[str(move.card) for move in trick_moves]} does not equal {trick_pile_count}')
-        return trick_moves
+        return self.trick_moves.copy()
 
     def play_card(self, action: PlayCardAction):
         # when current_player takes PlayCardAction step, the move is recorded and executed
         current_player = self.players[self.current_player_id]
-        self.move_sheet.append(PlayCardMove(current_player, action))
+        move = PlayCardMove(current_player, action)
+        self.move_sheet.append(move)
         card = action.card
         current_player.remove_card_from_hand(card=card)
         self.play_card_count += 1
+        if len(self.trick_moves) == 4:
+            self.trick_moves = []
+            self.trick_mask = 0
+        self.trick_moves.append(move)
+        self.trick_mask |= 1 << card.card_id
         # update current_player_id
-        trick_moves = self.get_trick_moves()
-        if len(trick_moves) == 4:
-            winning_card = trick_moves[0].card
-            trick_winner = trick_moves[0].player
-            trick_points = 0
-            for move in trick_moves[1:]:
-                trick_card = move.card
-                trick_player = move.player
-                if trick_card.suit == 'H':
-                    trick_points -= 1
-                elif trick_card.rank == 'Q' and trick_card.suit == 'S':
-                    trick_points -= 13
-                if trick_card.suit == winning_card.suit:
-                    if trick_card.card_id > winning_card.card_id:
-                        winning_card = trick_card
-                        trick_winner = trick_player
+        if len(self.trick_moves) == 4:
+            # the highest card of the led suit wins the trick
+            led_suit_trick_mask = self.trick_mask & get_suit_mask(self.trick_moves[0].card)
+            winning_card_id = led_suit_trick_mask.bit_length() - 1
+            trick_winner = next(move.player for move in self.trick_moves if move.card.card_id == winning_card_id)
             self.current_player_id = trick_winner.player_id
-            self.won_pile[trick_winner.player_id].extend([*map(lambda e: e.card, trick_moves)])
+            self.won_pile[trick_winner.player_id].extend([move.card for move in self.trick_moves])
+            self.won_masks[trick_winner.player_id] |= self.trick_mask
+            if self.trick_mask & hearts_mask:
+                self.hearts_broken = True
         else:
             self.current_player_id = (self.current_player_id + 1) % 4
 
@@ -170,7 +157,8 @@ class MariaRound:
                     self.players[i].add_card_to_hand(card=card)
             for player in self.players:
                 player.order_cards()
-                if MariaCard('C', '2') in player.hand:
+            for player in self.players:
+                if player.hand_mask & two_of_clubs_mask:
                     self.current_player_id = player.player_id
                     break
 
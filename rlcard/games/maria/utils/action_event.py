@@ -15,12 +15,20 @@ from .maria_card import MariaCard
 
 class ActionEvent(object):  # Interface
 
+    __slots__ = ('action_id',)
+
     first_play_card_action_id = 0
     first_trade_card_action_id = 52
 
     def __init__(self, action_id: int):
         self.action_id = action_id
 
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __eq__(self, other):
         result = False
         if isinstance(other, ActionEvent):
@@ -29,6 +37,20 @@ class ActionEvent(object):  # Interface
 
     @staticmethod
     def from_action_id(action_id: int):
+        ''' Return the shared action event of an action id
+
+        Args:
+            action_id (int): the id of the action
+
+        Returns:
+            (ActionEvent): the flyweight action event, which must not be modified
+        '''
+        if ActionEvent.first_play_card_action_id <= action_id < ActionEvent.first_trade_card_action_id + 52:
+            return _action_events[action_id]
+        raise Exception(f'ActionEvent from_action_id: invalid action_id={action_id}')
+
+    @staticmethod
+    def _make(action_id: int):
         if ActionEvent.first_play_card_action_id <= action_id < ActionEvent.first_play_card_action_id + 52:
             card_id = action_id - ActionEvent.first_play_card_action_id
             card = MariaCard.card(card_id=card_id)
@@ -48,6 +70,8 @@ class ActionEvent(object):  # Interface
 
 class PlayCardAction(ActionEvent):
 
+    __slots__ = ('card',)
+
     def __init__(self, card: MariaCard):
         play_card_action_id = ActionEvent.first_play_card_action_id + card.card_id
         super().__init__(action_id=play_card_action_id)
@@ -61,6 +85,8 @@ class PlayCardAction(ActionEvent):
 
 class TradeCardAction(ActionEvent):
 
+    __slots__ = ('card',)
+
     def __init__(self, card: MariaCard):
         trade_card_action_id = ActionEvent.first_trade_card_action_id + card.card_id
         super().__init__(action_id=trade_card_action_id)
@@ -71,3 +97,7 @@ class TradeCardAction(ActionEvent):
 
     def __repr__(self):
         return f"{self.card}"
+
+
+# action events are shared by all the games, indexed by action_id
+_action_events = [ActionEvent._make(action_id) for action_id in range(ActionEvent.get_num_actions())]  # want this to be read-only
@@ -0,0 +1,192 @@
+'''
+    File name: maria/utils/paranoid_search.py
+'''
+
+import time
+from typing import Dict, List
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from ..round import MariaRound
+
+from .utils import suit_masks, hearts_mask, queen_of_spades_mask, get_points
+
+
+class MariaSearchState(object):
+    ''' Bitboard version of the card play of a MariaRound: the four hands,
+        the leader, the cards of the current trick and whether hearts are broken
+    '''
+
+    def __init__(self, hands: List[int], leader_id: int, trick: List[int] = None, hearts_broken: bool = False):
+        ''' Initialize the state
+
+        Args:
+            hands (list): The bitboards of the hands of the four players
+            leader_id (int): The player who leads the current trick
+            trick (list): The card_ids played to the current trick, in order
+            hearts_broken (bool): Whether a trick with a heart has been won, so that hearts can be led
+        '''
+        self.hands = list(hands)
+        self.leader_id = leader_id
+        self.trick = list(trick) if trick else []
+        self.hearts_broken = hearts_broken
+        if len(self.trick) >= 4:
+            raise Exception(f'MariaSearchState: a trick has at most 3 cards in play, got {len(self.trick)}')
+
+    @property
+    def current_player_id(self) -> int:
+        return (self.leader_id + len(self.trick)) % 4
+
+    @staticmethod
+    def from_round(round: 'MariaRound') -> 'MariaSearchState':
+        ''' Build the state of the card play of a round whose trades are done
+        '''
+        if not round.is_done_trading():
+            raise Exception('MariaSearchState: the round is still trading')
+        hands = [player.hand_mask for player in round.players]
+        trick_moves = round.get_trick_moves()
+        if len(trick_moves) == 4:
+            trick_moves = []  # the trick is complete, its winner leads the next one
+        trick = [move.card.card_id for move in trick_moves]
+        leader_id = (round.current_player_id - len(trick)) % 4
+        return MariaSearchState(hands=hands, leader_id=leader_id, trick=trick, hearts_broken=round.hearts_broken)
+
+
+class MariaParanoidSolver(object):
+    ''' Depth limited alpha-beta search of the card play of maria for one player.
+
+        The search is paranoid: the other three players are assumed to play
+        together to give the player as many points as they can. The value of a
+        line is the (negative) points of the cards that the player wins in the
+        searched tricks, so the search is exact when it reaches the end of the
+        round, apart from shooting the moon. Cards that are next to each other
+        in a hand once the played cards are removed, and that are worth the
+        same points, are equivalent, and only one of them is searched.
+    '''
+
+    def __init__(self, max_trick_count: int = 2):
+        ''' Initialize the solver
+
+        Args:
+            max_trick_count (int): The number of tricks searched, including the current one
+        '''
+        self.max_trick_count = max_trick_count
+        self.node_count = 0
+        self.deadline = None
+
+    def analyze(self, state: MariaSearchState, player_id: int = None, deadline: float = None) -> Dict[int, int]:
+        ''' Return the points that a player wins in the searched tricks after
+            each of the legal cards of the player to move
+
+        Args:
+            state (MariaSearchState): The state to search
+            player_id (int): The player whose points are counted, the player to move by default
+            deadline (float): If set, a TimeoutError is raised when time.time() passes it
+
+        Returns:
+            (dict): A dictionary of card_id -> points
+        '''
+        self._load(state, player_id, deadline)
+        mover_id = state.current_player_id
+        card_points = {}
+        for card_id in self._iter_legal_cards(mover_id):
+            points = self._play(mover_id, card_id)
+            trick_count = self.max_trick_count - (0 if self.trick else 1)
+            card_points[card_id] = points + self._search(-27, 1, trick_count)
+            self._unplay(mover_id, card_id)
+        return card_points
+
+    def _load(self, state: MariaSearchState, player_id: int or None, deadline: float or None):
+        self.hands = state.hands.copy()
+        self.leader_id = state.leader_id
+        self.trick = state.trick.copy()
+        self.hearts_broken = state.hearts_broken
+        self.player_id = state.current_player_id if player_id is None else player_id
+        self.deadline = deadline
+        self.finished_tricks = []
+
+    def _search(self, alpha: int, beta: int, trick_count: int) -> int:
+        # the points of the player in the rest of the searched tricks, fail hard within (alpha, beta)
+        self.node_count += 1
+        if self.deadline is not None and not self.node_count & 1023 and time.time() > self.deadline:
+            raise TimeoutError('MariaParanoidSolver: the deadline has passed')
+        if not self.trick and (trick_count <= 0 or not self.hands[self.leader_id]):
+            return 0
+        player_id = (self.leader_id + len(self.trick)) % 4
+        is_maximizing = player_id == self.player_id
+        for card_id in self._ordered_cards(player_id, is_maximizing):
+            points = self._play(player_id, card_id)
+            value = points + self._search(alpha - points, beta - points, trick_count - (0 if self.trick else 1))
+            self._unplay(player_id, card_id)
+            if is_maximizing:
+                if value >= beta:
+                    return beta
+                alpha = max(alpha, value)
+            else:
+                if value <= alpha:
+                    return alpha
+                beta = min(beta, value)
+        return alpha if is_maximizing else beta
+
+    def _play(self, player_id: int, card_id: int) -> int:
+        # play a card, returns the points that the player of the search wins with the trick it completes
+        self.hands[player_id] ^= 1 << card_id
+        self.trick.append(card_id)
+        if len(self.trick) < 4:
+            return 0
+        led_suit_mask = suit_masks[self.trick[0] // 13]
+        trick_mask = 0
+        for trick_card_id in self.trick:
+            trick_mask |= 1 << trick_card_id
+        winning_card_id = (trick_mask & led_suit_mask).bit_length() - 1
+        winner_id = (self.leader_id + self.trick.index(winning_card_id)) % 4
+        self.finished_tricks.append((self.leader_id, self.trick, self.hearts_broken))
+        self.leader_id = winner_id
+        self.trick = []
+        if trick_mask & hearts_mask:
+            self.hearts_broken = True
+        return get_points(trick_mask) if winner_id == self.player_id else 0
+
+    def _unplay(self, player_id: int, card_id: int):
+        if not self.trick:
+            self.leader_id, self.trick, self.hearts_broken = self.finished_tricks.pop()
+        self.trick.pop()
+        self.hands[player_id] ^= 1 << card_id
+
+    def _legal_mask(self, player_id: int) -> int:
+        # the same rules as MariaJudger.get_legal_actions
+        hand = self.hands[player_id]
+        if self.trick:
+            follow_mask = hand & suit_masks[self.trick[0] // 13]
+            if follow_mask:
+                return follow_mask
+        elif not self.hearts_broken and hand & ~hearts_mask:
+            return hand & ~hearts_mask
+        return hand
+
+    def _iter_legal_cards(self, player_id: int):
+        mask = self._legal_mask(player_id)
+        while mask:
+            card_id = mask.bit_length() - 1
+            yield card_id
+            mask ^= 1 << card_id
+
+    def _ordered_cards(self, player_id: int, is_maximizing: bool) -> List[int]:
+        # one card of each run of equivalent legal cards; the player of the search tries to shed
+        # points and high cards first, the others try to give points to the player first
+        in_play = self.hands[0] | self.hands[1] | self.hands[2] | self.hands[3]
+        for card_id in self.trick:
+            in_play |= 1 << card_id
+        cards = []
+        higher_card_id = None
+        for card_id in self._iter_legal_cards(player_id):
+            if higher_card_id is not None and higher_card_id // 13 == card_id // 13 \
+                    and not in_play & ((1 << higher_card_id) - (2 << card_id)) \
+                    and not (1 << higher_card_id | 1 << card_id) & queen_of_spades_mask:
+                higher_card_id = card_id
+                continue
+            cards.append(card_id)
+            higher_card_id = card_id
+        if len(cards) > 1:
+            cards.sort(key=lambda card_id: (-get_points(1 << card_id), card_id % 13), reverse=not is_maximizing)
+        return cards
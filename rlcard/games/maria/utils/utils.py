@@ -4,14 +4,51 @@
     Date created: 11/26/2021
 '''
 
-from typing import List
+from typing import List, Iterator
 
 import numpy as np
 
 from .maria_card import MariaCard
 
+# ====================================
+# Bitboards:
+#       A set of cards is an int where bit card_id is set for each card.
+#       The suits are contiguous runs of 13 bits in the order C, D, H, S,
+#       and within a suit a higher bit is a higher rank.
+# ====================================
+
+suit_masks = [((1 << 13) - 1) << (13 * suit_index) for suit_index in range(4)]
+hearts_mask = suit_masks[MariaCard.suits.index('H')]
+queen_of_spades_mask = 1 << MariaCard('S', 'Q').card_id
+two_of_clubs_mask = 1 << MariaCard('C', '2').card_id
+
+
 def encode_cards(cards: List[MariaCard]) -> np.ndarray:  # Note: not used ??
     plane = np.zeros(52, dtype=int)
     for card in cards:
         plane[card.card_id] = 1
     return plane
+
+
+def get_suit_mask(card: MariaCard) -> int:
+    ''' Return the bitboard of all the cards in the suit of a card
+    '''
+    return suit_masks[card.card_id // 13]
+
+
+def iter_card_ids(mask: int) -> Iterator[int]:
+    ''' Iterate over the card ids in a bitboard in increasing order
+    '''
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+def get_points(mask: int) -> int:
+    ''' Return the (negative) points of the cards in a bitboard: -1 for each heart and -13 for the queen of spades
+    '''
+    points = -bin(mask & hearts_mask).count('1')
+    if mask & queen_of_spades_mask:
+        points -= 13
+    return points
@@ -1,7 +1,7 @@
 from enum import Enum
 
 import numpy as np
-from copy import deepcopy
+from copy import copy
 from rlcard.games.limitholdem import Game
 from rlcard.games.limitholdem import PlayerStatus
 
@@ -133,14 +133,13 @@ class NolimitholdemGame(Game):
             raise Exception('Action not allowed')
 
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            self.history.append((r, b, r_c, d, p, ps))
+            # Record only the fields that the action can change, so that
+            # stepping back does not need to copy the whole game
+            r = self.round
+            p = self.players[r.game_pointer]
+            self.history.append((self.game_pointer, self.round_counter, self.stage, len(self.public_cards),
+                                 self.dealer.pot, p.in_chips, p.remained_chips, p.status,
+                                 r.game_pointer, r.not_raise_num, r.not_playing_num, copy(r.raised)))
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -216,8 +215,15 @@ class NolimitholdemGame(Game):
             (bool): True if the game steps back successfully
         """
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, self.players = self.history.pop()
-            self.stage = Stage(self.round_counter)
+            self.game_pointer, self.round_counter, self.stage, num_public_cards, self.dealer.pot, \
+                in_chips, remained_chips, status, pointer, not_raise_num, not_playing_num, raised = self.history.pop()
+            # Put the dealt public cards back on the top of the deck
+            while len(self.public_cards) > num_public_cards:
+                self.dealer.deck.append(self.public_cards.pop())
+            p = self.players[pointer]
+            p.in_chips, p.remained_chips, p.status = in_chips, remained_chips, status
+            r = self.round
+            r.game_pointer, r.not_raise_num, r.not_playing_num, r.raised = pointer, not_raise_num, not_playing_num, raised
             return True
         return False
 
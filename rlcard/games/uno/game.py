@@ -1,4 +1,3 @@
-from copy import deepcopy
 import numpy as np
 
 from rlcard.games.uno import Dealer
@@ -69,11 +68,22 @@ class UnoGame:
         '''
 
         if self.allow_step_back:
-            # First snapshot the current state
-            his_dealer = deepcopy(self.dealer)
-            his_round = deepcopy(self.round)
-            his_players = deepcopy(self.players)
-            self.history.append((his_dealer, his_players, his_round))
+            # Record only the fields that the action can change, so that
+            # stepping back does not need to copy the whole game. An action
+            # draws at most 4 cards from the top of the deck, unless the
+            # played cards have to be shuffled back into the deck.
+            r = self.round
+            deck = self.dealer.deck
+            tail = deck[-4:]
+            if len(deck) < 4:
+                piles = (deck.copy(), r.played_cards.copy())
+                colors = [(card, card.color) for card in deck + r.played_cards]
+            else:
+                piles = None
+                colors = [(card, card.color) for card in tail]
+            self.history.append((r.current_player, r.direction, r.target, r.is_over, r.winner,
+                                 self.players[r.current_player].hand.copy(), [len(p.hand) for p in self.players],
+                                 len(r.played_cards), len(deck), tail, piles, colors))
 
         self.round.proceed_round(self.players, action)
         player_id = self.round.current_player
@@ -88,7 +98,21 @@ class UnoGame:
         '''
         if not self.history:
             return False
-        self.dealer, self.players, self.round = self.history.pop()
+        r = self.round
+        r.current_player, r.direction, r.target, r.is_over, r.winner, hand, hand_lens, \
+            num_played, num_deck, tail, piles, colors = self.history.pop()
+        # Wild cards drawn from the deck get a random color
+        for card, color in colors:
+            card.color = color
+        if piles is not None:
+            self.dealer.deck, r.played_cards = piles
+        else:
+            del r.played_cards[num_played:]
+            del self.dealer.deck[num_deck - len(tail):]
+            self.dealer.deck.extend(tail)
+        for player, hand_len in zip(self.players, hand_lens):
+            del player.hand[hand_len:]
+        self.players[r.current_player].hand[:] = hand
         return True
 
     def get_state(self, player_id):
@@ -2,3 +2,4 @@ from rlcard.utils.logger import Logger
 from rlcard.utils import seeding
 from rlcard.utils.utils import *
 from rlcard.utils.pettingzoo_utils import *
+from rlcard.utils.exploitability_utils import best_response_value, policy_value, nash_conv, exploitability
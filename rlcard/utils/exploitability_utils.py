@@ -0,0 +1,257 @@
+''' Best response and exploitability of the policies of agents.
+
+The game tree is walked with Env.step and Env.step_back for a batch of
+deals (chance outcomes) at once. All the deals of a batch share the public
+action history, so the reach probabilities, the terminal payoffs and the
+best response choices of one node are computed with vectorized operations
+over the deals. The deals of Leduc Hold'em are enumerated exactly. For larger
+games such as Limit Texas Hold'em, a fixed number of deals are sampled.
+'''
+import itertools
+import numpy as np
+
+from rlcard.games.base import Card
+
+def best_response_value(env, agents, player_id, num_deals=None, seed=0):
+    ''' Compute the expected payoff of a best response against the agents
+
+    Args:
+        env (Env): The environment. Its name and number of players are used
+            to create the environments of the deals
+        agents (list): The agents of the players. Their eval_step should
+            return the action probabilities in info['probs'], otherwise the
+            agent is treated as a deterministic policy
+        player_id (int): The player who plays the best response
+        num_deals (int): The number of sampled deals. If None, all the deals
+            are enumerated, which is only supported for Leduc Hold'em
+        seed (int): The seed of the sampled deals
+
+    Returns:
+        (float): The expected payoff of the best response
+    '''
+    walker = _TreeWalker(agents)
+    envs, reach = _deals(env, num_deals, seed)
+    return float(np.sum(walker.walk(envs, reach, player_id, best_response=True)))
+
+def policy_value(env, agents, num_deals=None, seed=0):
+    ''' Compute the expected payoffs of the players when every agent follows its policy
+
+    Args:
+        env (Env): The environment
+        agents (list): The agents of the players
+        num_deals (int): The number of sampled deals. If None, all the deals
+            are enumerated
+        seed (int): The seed of the sampled deals
+
+    Returns:
+        (numpy.array): The expected payoffs of the players
+    '''
+    walker = _TreeWalker(agents)
+    envs, reach = _deals(env, num_deals, seed)
+    return np.array([np.sum(walker.walk(envs, reach, player_id, best_response=False))
+                     for player_id in range(env.num_players)])
+
+def nash_conv(env, agents, num_deals=None, seed=0):
+    ''' Compute NashConv, the sum over the players of the gain of playing a
+        best response instead of the policy
+
+    Args:
+        env (Env): The environment
+        agents (list): The agents of the players
+        num_deals (int): The number of sampled deals. If None, all the deals
+            are enumerated
+        seed (int): The seed of the sampled deals
+
+    Returns:
+        (float): NashConv, zero at a Nash equilibrium
+    '''
+    walker = _TreeWalker(agents)
+    envs, reach = _deals(env, num_deals, seed)
+    conv = 0.0
+    for player_id in range(env.num_players):
+        conv += np.sum(walker.walk(envs, reach, player_id, best_response=True))
+        conv -= np.sum(walker.walk(envs, reach, player_id, best_response=False))
+    return float(conv)
+
+def exploitability(env, agents, num_deals=None, seed=0):
+    ''' Compute the exploitability, i.e., NashConv divided by the number of players
+
+    Args:
+        env (Env): The environment
+        agents (list): The agents of the players
+        num_deals (int): The number of sampled deals. If None, all the deals
+            are enumerated. With sampled deals the best response can tell the
+            deals apart more easily, so the value overestimates the
+            exploitability and tightens as num_deals grows
+        seed (int): The seed of the sampled deals
+
+    Returns:
+        (float): The exploitability
+    '''
+    return nash_conv(env, agents, num_deals, seed) / env.num_players
+
+class _TreeWalker(object):
+    ''' Walk the game tree for a batch of deals in lockstep
+    '''
+
+    def __init__(self, agents):
+        self.agents = agents
+        # Cache the action probabilities of every information set
+        self.policy_cache = {}
+
+    def action_probs(self, state, player_id):
+        ''' Get the action probabilities of an agent, cached by information set
+
+        Args:
+            state (dict): The state of the player
+            player_id (int): The player id
+
+        Returns:
+            (numpy.array): The probabilities of the legal actions
+        '''
+        legal_actions = tuple(state['legal_actions'].keys())
+        key = (player_id, state['obs'].tobytes(), legal_actions)
+        if key not in self.policy_cache:
+            action, info = self.agents[player_id].eval_step(state)
+            if 'probs' in info:
+                probs = np.array(list(info['probs'].values()), dtype=np.float64)
+            else:
+                probs = np.zeros(len(legal_actions))
+                probs[legal_actions.index(action)] = 1.0
+            self.policy_cache[key] = probs
+        return self.policy_cache[key]
+
+    def walk(self, envs, reach, player_id, best_response):
+        ''' Compute the values of the deals of the current node
+
+        Args:
+            envs (list): The environments of the deals, all at the same public node
+            reach (numpy.array): The reach probabilities of the deals, including
+                chance and excluding the actions of the best responder
+            player_id (int): The player whose value is computed
+            best_response (boolean): True if the player plays a best response,
+                False if it follows its policy
+
+        Returns:
+            (numpy.array): The reach-weighted values of the deals for the player
+        '''
+        values = np.zeros(len(envs))
+        for indices in _split(envs):
+            values[indices] = self._walk_node([envs[i] for i in indices], reach[indices], player_id, best_response)
+        return values
+
+    def _walk_node(self, envs, reach, player_id, best_response):
+        if envs[0].is_over():
+            payoffs = np.array([env.get_payoffs()[player_id] for env in envs])
+            return reach * payoffs
+
+        current_player = envs[0].get_player_id()
+        states = [env.get_state(current_player) for env in envs]
+        legal_actions = list(states[0]['legal_actions'].keys())
+
+        if best_response and current_player == player_id:
+            action_values = np.stack([self._walk_child(envs, reach, action, player_id, best_response)
+                                      for action in legal_actions])
+            # The deals with the same observation form an information set,
+            # which plays the action with the highest total value
+            values = np.empty(len(envs))
+            infosets = {}
+            for i, state in enumerate(states):
+                infosets.setdefault(state['obs'].tobytes(), []).append(i)
+            for indices in infosets.values():
+                best_action = np.argmax(action_values[:, indices].sum(axis=1))
+                values[indices] = action_values[best_action, indices]
+            return values
+
+        probs = np.stack([self.action_probs(state, current_player) for state in states])
+        values = np.zeros(len(envs))
+        for i, action in enumerate(legal_actions):
+            child_reach = reach * probs[:, i]
+            alive = np.flatnonzero(child_reach > 0)
+            if len(alive) == 0:
+                continue
+            values[alive] += self._walk_child([envs[j] for j in alive], child_reach[alive],
+                                             action, player_id, best_response)
+        return values
+
+    def _walk_child(self, envs, reach, action, player_id, best_response):
+        # Step the games directly, the states are only extracted at the nodes
+        for env in envs:
+            env.game.step(env._decode_action(action))
+        values = self.walk(envs, reach, player_id, best_response)
+        for env in envs:
+            env.game.step_back()
+        return values
+
+def _split(envs):
+    ''' Group the deals that are at the same kind of node
+
+    Args:
+        envs (list): The environments of the deals
+
+    Returns:
+        (list): Lists of indices of the deals with the same current player and legal actions
+    '''
+    groups = {}
+    for i, env in enumerate(envs):
+        if env.is_over():
+            key = None
+        else:
+            key = (env.get_player_id(), tuple(env._get_legal_actions()))
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+def _deals(env, num_deals, seed):
+    ''' Create one environment per deal
+
+    Args:
+        env (Env): The environment
+        num_deals (int): The number of sampled deals, or None to enumerate them
+        seed (int): The seed of the sampled deals
+
+    Returns:
+        (tuple): Tuple containing:
+
+            (list): The environments, reset to the deals
+            (numpy.array): The probabilities of the deals
+    '''
+    from rlcard.envs.registration import make
+
+    config = {'allow_step_back': True, 'game_num_players': env.num_players}
+    if num_deals is not None:
+        envs = []
+        for i in range(num_deals):
+            deal_env = make(env.name, config=dict(config, seed=seed + i))
+            deal_env.reset()
+            envs.append(deal_env)
+        return envs, np.full(num_deals, 1.0 / num_deals)
+
+    if env.name != 'leduc-holdem':
+        raise ValueError('The deals of {} cannot be enumerated, please set num_deals'.format(env.name))
+    envs = []
+    cards = [Card(suit, rank) for rank in 'JQK' for suit in 'SH']
+    for small_blind in range(env.num_players):
+        for dealt in itertools.permutations(cards, env.num_players + 1):
+            deal_env = make(env.name, config=dict(config, seed=seed))
+            deal_env.reset()
+            _set_leduc_deal(deal_env.game, dealt[:-1], dealt[-1], small_blind)
+            envs.append(deal_env)
+    return envs, np.full(len(envs), 1.0 / len(envs))
+
+def _set_leduc_deal(game, hands, public_card, small_blind):
+    ''' Replace the chance outcomes of a Leduc Hold'em game that was just initialized
+
+    Args:
+        game (LeducholdemGame): The game
+        hands (tuple): The private card of each player
+        public_card (Card): The public card
+        small_blind (int): The player who posts the small blind
+    '''
+    for player, card in zip(game.players, hands):
+        player.hand = card
+        player.in_chips = 0
+    game.dealer.deck = [public_card]
+    game.players[(small_blind + 1) % game.num_players].in_chips = game.big_blind
+    game.players[small_blind].in_chips = game.small_blind
+    game.game_pointer = small_blind
+    game.round.start_new_round(game_pointer=small_blind, raised=[p.in_chips for p in game.players])
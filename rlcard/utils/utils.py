@@ -1,3 +1,7 @@
+# Private names, as this module is star-imported into rlcard.utils and the envs
+import multiprocessing as _multiprocessing
+import random as _random
+
 import numpy as np
 
 from rlcard.games.base import Card
@@ -194,32 +198,130 @@ def remove_illegal(action_probs, legal_actions):
         probs /= sum(probs)
     return probs
 
-def tournament(env, num):
+def tournament(env, num, num_workers=1):
     ''' Evaluate he performance of the agents in the environment
 
     Args:
         env (Env class): The environment to be evaluated.
         num (int): The number of games to play.
+        num_workers (int): The number of processes that play the games.
+            If larger than 1, the games are sharded across a process pool
+            and each shard is seeded from the random state of the env.
 
     Returns:
         A list of avrage payoffs for each player
     '''
-    payoffs = [0 for _ in range(env.num_players)]
+    return tournament_stats(env, num, num_workers)['payoffs']
+
+def tournament_stats(env, num, num_workers=1, z=1.96):
+    ''' Evaluate the agents in the environment and report the uncertainty
+        of the average payoffs
+
+    Args:
+        env (Env class): The environment to be evaluated.
+        num (int): The number of games to play.
+        num_workers (int): The number of processes that play the games.
+        z (float): The z-score of the confidence interval. 1.96 gives 95%.
+
+    Returns:
+        (dict): A dictionary with the following keys, each of them except
+            'num_games' is a list with an entry per player:
+            'payoffs' - the average payoffs
+            'variance' - the sample variance of the payoffs
+            'confidence_interval' - the half width of the confidence interval
+                of the average payoffs
+            'num_games' - the number of games played
+    '''
+    if num_workers > 1:
+        sums, squares, counter = _parallel_tournament(env, num, num_workers)
+    else:
+        sums, squares, counter = _play_tournament(env, num)
+
+    payoffs = sums / counter
+    if counter > 1:
+        variance = (squares - sums * payoffs) / (counter - 1)
+    else:
+        variance = np.zeros_like(sums)
+    variance = np.maximum(variance, 0)
+    confidence_interval = z * np.sqrt(variance / counter)
+    return {
+        'payoffs': payoffs.tolist(),
+        'variance': variance.tolist(),
+        'confidence_interval': confidence_interval.tolist(),
+        'num_games': counter,
+    }
+
+def _play_tournament(env, num):
+    ''' Play the games of a tournament in the current process
+
+    Args:
+        env (Env class): The environment to be evaluated.
+        num (int): The number of games to play.
+
+    Returns:
+        (tuple): The sums of the payoffs, the sums of the squared payoffs
+            and the number of games played
+    '''
+    sums = np.zeros(env.num_players)
+    squares = np.zeros(env.num_players)
     counter = 0
     while counter < num:
         _, _payoffs = env.run(is_training=False)
         if isinstance(_payoffs, list):
             for _p in _payoffs:
-                for i, _ in enumerate(payoffs):
-                    payoffs[i] += _p[i]
+                _p = np.asarray(_p, dtype=np.float64)
+                sums += _p
+                squares += _p * _p
                 counter += 1
         else:
-            for i, _ in enumerate(payoffs):
-                payoffs[i] += _payoffs[i]
+            _payoffs = np.asarray(_payoffs, dtype=np.float64)
+            sums += _payoffs
+            squares += _payoffs * _payoffs
             counter += 1
-    for i, _ in enumerate(payoffs):
-        payoffs[i] /= counter
-    return payoffs
+    return sums, squares, counter
+
+def _tournament_worker(args):
+    ''' Play one shard of a parallel tournament with its own seed
+    '''
+    env, num, seed = args
+    _random.seed(seed)
+    np.random.seed(seed)
+    # torch is an optional dependency, imported only in the pool workers
+    try:
+        import torch
+    except ImportError:
+        pass
+    else:
+        torch.manual_seed(seed)
+    env.seed(seed)
+    return _play_tournament(env, num)
+
+def _parallel_tournament(env, num, num_workers):
+    ''' Shard the games of a tournament across a process pool
+
+    The shard seeds are drawn from the random state of the env, so a seeded
+    env gives the same results for the same number of workers.
+
+    Returns:
+        (tuple): The sums of the payoffs, the sums of the squared payoffs
+            and the number of games played
+    '''
+    num_workers = min(num_workers, num)
+    shard_sizes = [num // num_workers + (1 if i < num % num_workers else 0) for i in range(num_workers)]
+    seeds = env.np_random.randint(0, 2**31 - 1, size=num_workers)
+    shards = [(env, shard_size, int(seed)) for shard_size, seed in zip(shard_sizes, seeds)]
+
+    with _multiprocessing.Pool(num_workers) as pool:
+        results = pool.map(_tournament_worker, shards)
+
+    sums = np.zeros(env.num_players)
+    squares = np.zeros(env.num_players)
+    counter = 0
+    for _sums, _squares, _counter in results:
+        sums += _sums
+        squares += _squares
+        counter += _counter
+    return sums, squares, counter
 
 def plot_curve(csv_path, save_path, algorithm):
     ''' Read data from csv file and plot the results
@@ -2,7 +2,7 @@ import unittest
 import numpy as np
 
 import rlcard
-from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.cfr_agent import CFRAgent, CFRPlusAgent, LinearCFRAgent, DCFRAgent, InfosetIndex
 
 class TestNFSP(unittest.TestCase):
 
@@ -35,3 +35,88 @@ class TestNFSP(unittest.TestCase):
         self.assertEqual(len(agent.regrets), len(new_agent.regrets))
         self.assertEqual(agent.iteration, new_agent.iteration)
 
+    def test_infoset_index(self):
+        index = InfosetIndex(num_actions=3, capacity=2)
+        rows = [index.get(str(i).encode()) for i in range(5)]
+        self.assertEqual(rows, list(range(5)))
+        self.assertEqual(index.get(b'0'), 0)
+        self.assertEqual(len(index), 5)
+        self.assertGreaterEqual(index.regrets.shape[0], 5)
+        self.assertTrue(np.allclose(index.policy[:5], 1.0 / 3))
+
+    def test_regret_matching(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRAgent(env, model_path='experiments/cfr_model')
+        agent.regrets[b'a'] = np.array([1., -1., 3., 0.])
+        agent.regrets[b'b'] = np.array([-1., -1., 0., 0.])
+        agent.update_policy()
+        self.assertTrue(np.allclose(agent.policy[b'a'], [0.25, 0., 0.75, 0.]))
+        self.assertTrue(np.allclose(agent.policy[b'b'], [0.25, 0.25, 0.25, 0.25]))
+        self.assertTrue(np.allclose(agent.regret_matching(b'a'), [0.25, 0., 0.75, 0.]))
+
+    def test_load_dict_tables(self):
+        from rlcard import models
+        agent = models.load('leduc-holdem-cfr').agents[0]
+        self.assertGreater(len(agent.average_policy), 0)
+        env = rlcard.make('leduc-holdem')
+        state, _ = env.reset()
+        action, _ = agent.eval_step(state)
+        self.assertIn(action, state['legal_actions'])
+
+    def test_cfr_variants(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        for agent in [CFRPlusAgent(env, model_path='experiments/cfr_plus_model'),
+                      LinearCFRAgent(env, model_path='experiments/linear_cfr_model'),
+                      DCFRAgent(env, model_path='experiments/dcfr_model'),
+                      CFRAgent(env, model_path='experiments/cfr_model', alternating_updates=True)]:
+            for _ in range(10):
+                agent.train()
+            state, _ = env.reset()
+            action, _ = agent.eval_step(state)
+            self.assertIn(action, state['legal_actions'])
+
+    def test_cfr_plus_regrets(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRPlusAgent(env, model_path='experiments/cfr_plus_model')
+        for _ in range(10):
+            agent.train()
+        self.assertTrue(np.all(agent.infosets.regrets[:len(agent.infosets)] >= 0))
+
+    def test_dcfr_discount(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = DCFRAgent(env, model_path='experiments/dcfr_model', alpha=1.5, beta=0.0, gamma=2.0)
+        agent.regrets[b'a'] = np.array([4., -4., 0., 0.])
+        agent.average_policy[b'a'] = np.array([1., 1., 0., 0.])
+        agent.iteration = 1
+        agent.discount()
+        self.assertTrue(np.allclose(agent.regrets[b'a'], [2., -2., 0., 0.]))
+        self.assertTrue(np.allclose(agent.average_policy[b'a'], [0.25, 0.25, 0., 0.]))
+
+    def test_regret_pruning(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRAgent(env, model_path='experiments/cfr_model', pruning_threshold=-1.0, pruning_prob=1.0)
+        for _ in range(20):
+            agent.train()
+        num_rows = len(agent.infosets)
+        regrets = agent.infosets.regrets[:num_rows].copy()
+        policy = agent.infosets.policy[:num_rows].copy()
+
+        # Record the legal actions of the information sets that are visited
+        legal_actions_by_obs = {}
+        action_probs = agent.action_probs
+        def record_action_probs(obs, legal_actions, policy):
+            legal_actions_by_obs.setdefault(obs, []).append(list(legal_actions))
+            return action_probs(obs, legal_actions, policy)
+        agent.action_probs = record_action_probs
+        agent.train()
+
+        # An action is pruned if it is not played and its regret is very negative.
+        # An observation may be shared by states with different legal actions, and
+        # where no legal action has a positive probability all of them are played
+        pruned = (policy == 0) & (regrets < -1.0)
+        for obs, legal_actions_list in legal_actions_by_obs.items():
+            row = agent.infosets.rows[obs]
+            if row < num_rows and any(not np.any(policy[row, legal_actions]) for legal_actions in legal_actions_list):
+                pruned[row] = False
+        self.assertTrue(np.any(pruned))
+        self.assertTrue(np.array_equal(agent.infosets.regrets[:num_rows][pruned], regrets[pruned]))
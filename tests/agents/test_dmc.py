@@ -0,0 +1,110 @@
+import queue
+import unittest
+import numpy as np
+import torch
+
+import rlcard
+from rlcard.agents.dmc_agent.model import DMCAgent, DMCModel
+from rlcard.agents.dmc_agent.trainer import DMCTrainer
+from rlcard.agents.dmc_agent.utils import BatchPrefetcher, BufferWriter, create_buffers, publish_weights, pull_weights
+
+class TestDMC(unittest.TestCase):
+
+    def test_buffer_writer(self):
+
+        T = 4
+        buffers = create_buffers(T, 3, [[2]], [[3]], ['cpu'])['cpu'][0]
+        free_queue, full_queue = queue.Queue(), queue.Queue()
+        for m in range(3):
+            free_queue.put(m)
+        writer = BufferWriter(T, free_queue, full_queue, buffers)
+
+        # Two episodes of 3 and 2 steps fill the first buffer and start the second
+        steps = 0
+        for length, payoff in ((3, 1.0), (2, -1.0)):
+            for _ in range(length):
+                writer.write(np.full(2, steps), np.full(3, -steps))
+                steps += 1
+            writer.finish_episode(payoff)
+
+        self.assertEqual(full_queue.get_nowait(), 0)
+        self.assertTrue(full_queue.empty())
+        self.assertEqual(buffers['state'][0][:, 0].tolist(), [0, 1, 2, 3])
+        self.assertEqual(buffers['action'][0][:, 0].tolist(), [0, -1, -2, -3])
+        self.assertEqual(buffers['target'][0].tolist(), [1.0, 1.0, 1.0, -1.0])
+        self.assertEqual(buffers['done'][0].tolist(), [False, False, True, False])
+        self.assertEqual(buffers['episode_return'][0].tolist(), [0.0, 0.0, 1.0, 0.0])
+        self.assertEqual(buffers['state'][1][0, 0].item(), 4)
+        self.assertTrue(buffers['done'][1][0].item())
+
+        # An episode that spans a whole buffer waits for its end
+        for _ in range(7):
+            writer.write(np.zeros(2), np.zeros(3))
+        self.assertTrue(full_queue.empty())
+        writer.finish_episode(2.0)
+        self.assertEqual(full_queue.get_nowait(), 1)
+        self.assertEqual(full_queue.get_nowait(), 2)
+        self.assertEqual(buffers['target'][2].tolist(), [2.0, 2.0, 2.0, 2.0])
+        self.assertTrue(buffers['done'][2][3].item())
+
+    def test_predict_batch(self):
+
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        agent = DMCAgent(env.state_shape[0], [env.num_actions], mlp_layers=[8, 8], exp_epsilon=0, device='cpu')
+        states = []
+        for _ in range(5):
+            state, _ = env.reset()
+            env.step(list(state['legal_actions'])[0])
+            states.extend([state, env.get_state(env.get_player_id())])
+
+        predictions = agent.predict_batch(states)
+        self.assertEqual(len(predictions), len(states))
+        for state, (action_keys, values) in zip(states, predictions):
+            expected_keys, expected_values = agent.predict(state)
+            self.assertEqual(action_keys.tolist(), expected_keys.tolist())
+            self.assertTrue(np.allclose(values, expected_values, atol=1e-6))
+        self.assertEqual(agent.step_batch(states), [agent.step(state) for state in states])
+
+    def test_publish_and_pull_weights(self):
+
+        learner = DMCModel([[3], [3]], [[2], [2]], mlp_layers=[4], device='cpu')
+        shared_model = DMCModel([[3], [3]], [[2], [2]], mlp_layers=[4], device='cpu')
+        local_agent = DMCAgent([3], [2], mlp_layers=[4], device='cpu')
+        versions = torch.zeros(2, dtype=torch.int64)
+
+        publish_weights(learner.get_agent(1).state_dict(), shared_model, 1, versions)
+        self.assertEqual(versions.tolist(), [0, 2])
+        shared_weight = shared_model.get_agent(1).state_dict()['fc_layers.0.weight']
+        self.assertTrue(torch.equal(shared_weight, learner.get_agent(1).state_dict()['fc_layers.0.weight']))
+
+        version = pull_weights(local_agent, shared_model.get_agent(1), versions[1], -1)
+        self.assertEqual(version, 2)
+        self.assertTrue(torch.equal(local_agent.state_dict()['fc_layers.0.weight'], shared_weight))
+
+        # Weights that are being written are not pulled
+        versions[1] += 1
+        self.assertEqual(pull_weights(local_agent, shared_model.get_agent(1), versions[1], 2), 2)
+
+    def test_batch_prefetcher(self):
+
+        buffers = create_buffers(2, 4, [[1]], [[1]], ['cpu'])['cpu'][0]
+        free_queue, full_queue = queue.Queue(), queue.Queue()
+        for m in range(4):
+            buffers['target'][m][:] = m
+            full_queue.put(m)
+        prefetcher = BatchPrefetcher(free_queue, full_queue, buffers, 2, 'cpu')
+
+        for expected in ([0, 1], [2, 3]):
+            batch = prefetcher.get()
+            self.assertEqual(batch['target'].shape, (2, 2))
+            self.assertEqual(batch['target'][0].tolist(), expected)
+        self.assertEqual(sorted(free_queue.get_nowait() for _ in range(4)), [0, 1, 2, 3])
+
+    def test_num_buffers(self):
+
+        env = rlcard.make('leduc-holdem')
+        with self.assertRaises(ValueError):
+            DMCTrainer(env, num_actors=5, num_envs_per_actor=4, batch_size=32, num_buffers=50)
+
+if __name__ == '__main__':
+    unittest.main()
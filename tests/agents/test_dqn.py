@@ -2,7 +2,7 @@ import unittest
 import torch
 import numpy as np
 
-from rlcard.agents.dqn_agent import DQNAgent
+from rlcard.agents.dqn_agent import DQNAgent, Estimator, Memory, PrioritizedMemory, SumTree
 
 class TestDQN(unittest.TestCase):
 
@@ -51,3 +51,115 @@ class TestDQN(unittest.TestCase):
         predicted_action = agent.step({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}})
         self.assertGreaterEqual(predicted_action, 0)
         self.assertLessEqual(predicted_action, 1)
+
+    def test_predict_with_legal_actions_mask(self):
+
+        agent = DQNAgent(num_actions=3,
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'))
+        obs = np.random.random_sample((2,))
+        from_mask = agent.predict({'obs': obs, 'legal_actions': {0: None, 2: None}, 'legal_actions_mask': np.array([True, False, True])})
+        from_ids = agent.predict({'obs': obs, 'legal_actions': {0: None, 2: None}})
+        self.assertTrue(np.array_equal(from_mask, from_ids))
+        self.assertEqual(from_mask[1], -np.inf)
+        self.assertTrue(np.all(np.isfinite(from_mask[[0, 2]])))
+
+    def test_train_prioritized(self):
+
+        agent = DQNAgent(replay_memory_size=50,
+                         replay_memory_init_size=20,
+                         update_target_estimator_every=10,
+                         batch_size=8,
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'),
+                         prioritized_replay=True)
+
+        for _ in range(100):
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), 1, {'obs': np.random.random_sample((2,)), 'legal_actions': {1: None}}, False]
+            agent.feed(ts)
+
+        self.assertEqual(len(agent.memory), 50)
+        self.assertNotEqual(agent.memory.max_priority, 1.0)
+
+    def test_train_soft_target_update(self):
+
+        agent = DQNAgent(replay_memory_size=50,
+                         replay_memory_init_size=20,
+                         batch_size=8,
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'),
+                         target_update_tau=0.1)
+        target_estimator = agent.target_estimator
+
+        # The soft updates start from the weights of the Q network
+        for name, tensor in agent.q_estimator.qnet.state_dict().items():
+            self.assertTrue(torch.equal(target_estimator.qnet.state_dict()[name], tensor))
+
+        for _ in range(50):
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), 1, {'obs': np.random.random_sample((2,)), 'legal_actions': {1: None}}, False]
+            agent.feed(ts)
+
+        self.assertIs(agent.target_estimator, target_estimator)
+
+    def test_estimator_sync_with(self):
+
+        source = Estimator(num_actions=2, state_shape=[3], mlp_layers=[4], device=torch.device('cpu'))
+        target = Estimator(num_actions=2, state_shape=[3], mlp_layers=[4], device=torch.device('cpu'))
+        source_weight = source.qnet.fc_layers[2].weight
+        target_weight = target.qnet.fc_layers[2].weight
+        data_ptr = target_weight.data_ptr()
+        expected = (target_weight + source_weight).detach() / 2
+
+        target.sync_with(source, tau=0.5)
+        self.assertTrue(torch.allclose(target_weight, expected))
+        target.sync_with(source)
+        self.assertTrue(torch.equal(target_weight, source_weight))
+        self.assertEqual(target_weight.data_ptr(), data_ptr)
+
+    def test_memory_ring_buffer(self):
+
+        memory = Memory(memory_size=3, batch_size=4, num_actions=3)
+        for i in range(5):
+            memory.save(np.full(2, i), i, float(i), np.full(2, i + 1), [i % 3], i == 4)
+
+        self.assertEqual(len(memory), 3)
+        self.assertEqual(sorted(memory.actions.tolist()), [2, 3, 4])
+        states, actions, rewards, next_states, legal_actions, dones = memory.sample()
+        self.assertEqual(states.shape, (4, 2))
+        self.assertEqual(legal_actions.shape, (4, 3))
+        self.assertTrue(np.all(states[:, 0] == actions))
+        self.assertTrue(np.all(next_states[:, 0] == actions + 1))
+        self.assertTrue(np.all(rewards == actions))
+        self.assertTrue(np.all(legal_actions[np.arange(4), actions % 3]))
+        self.assertTrue(np.all(legal_actions.sum(axis=1) == 1))
+        self.assertTrue(np.all(dones == (actions == 4)))
+
+    def test_sum_tree(self):
+
+        tree = SumTree(5)
+        tree.update(np.arange(5), np.array([1.0, 0.0, 2.0, 3.0, 4.0]))
+        self.assertEqual(tree.total(), 10.0)
+        self.assertEqual(tree.find([0.5, 1.0, 2.9, 3.0, 5.9, 6.0, 9.99]).tolist(), [0, 2, 2, 3, 3, 4, 4])
+        tree.update(np.array([4, 4]), 0.0)
+        self.assertEqual(tree.total(), 6.0)
+        self.assertEqual(tree.find([5.99999]).tolist(), [3])
+
+    def test_prioritized_memory(self):
+
+        memory = PrioritizedMemory(memory_size=4, batch_size=1000, num_actions=2, alpha=1.0, beta=1.0, epsilon=0)
+        for i in range(4):
+            memory.save(np.zeros(1), i, 0, np.zeros(1), [0], False)
+        memory.update_priorities(np.arange(4), np.array([1.0, 0.0, -3.0, 0.0]))
+        _, actions, _, _, _, _, indices, weights = memory.sample()
+
+        self.assertTrue(np.all(actions == indices))
+        self.assertEqual(set(indices.tolist()), {0, 2})
+        self.assertAlmostEqual(np.mean(indices == 2), 0.75, delta=0.01)
+        self.assertAlmostEqual(weights[indices == 2][0], 1 / 3)
+        self.assertEqual(weights.max(), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
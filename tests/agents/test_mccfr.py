@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.mccfr_agent import MCCFRAgent
+
+class TestMCCFR(unittest.TestCase):
+
+    def test_external_sampling(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling='external')
+
+        for _ in range(100):
+            agent.train()
+
+        state, _ = env.reset()
+        action, _ = agent.eval_step(state)
+        self.assertIn(action, state['legal_actions'])
+        policy = agent.infosets.policy[:len(agent.infosets)]
+        self.assertTrue(np.allclose(policy.sum(axis=1), 1.0))
+
+    def test_outcome_sampling(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling='outcome')
+
+        for _ in range(500):
+            agent.train()
+
+        state, _ = env.reset()
+        action, _ = agent.eval_step(state)
+        self.assertIn(action, state['legal_actions'])
+        self.assertGreater(agent.infosets.average_policy[:len(agent.infosets)].sum(), 0)
+
+    def test_large_games(self):
+        for env_id in ['limit-holdem', 'doudizhu']:
+            env = rlcard.make(env_id, config={'allow_step_back':True})
+            agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling='outcome')
+            agent.train()
+            self.assertGreater(len(agent.infosets), 0)
+        env = rlcard.make('limit-holdem', config={'allow_step_back':True})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling='external')
+        agent.train()
+        self.assertGreater(len(agent.infosets), 0)
+
+    def test_unknown_sampling(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        with self.assertRaises(ValueError):
+            MCCFRAgent(env, sampling='chance')
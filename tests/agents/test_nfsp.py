@@ -1,8 +1,10 @@
+import os
+import tempfile
 import unittest
 import torch
 import numpy as np
 
-from rlcard.agents.nfsp_agent import NFSPAgent
+from rlcard.agents.nfsp_agent import NFSPAgent, ReservoirBuffer, Transition
 
 class TestNFSP(unittest.TestCase):
 
@@ -45,3 +47,74 @@ class TestNFSP(unittest.TestCase):
 
             ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), 0, {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']}, True]
             agent.feed(ts)
+
+    def test_reservoir_buffer(self):
+
+        buffer = ReservoirBuffer(5)
+        for i in range(3):
+            buffer.add(Transition(info_state=np.full(2, i), action_probs=np.array([i, 0.5])))
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual([t.info_state[0] for t in buffer], [0, 1, 2])
+
+        transitions = buffer.sample(3)
+        self.assertEqual(transitions.info_state.dtype, np.float32)
+        self.assertEqual(transitions.info_state.shape, (3, 2))
+        self.assertEqual(sorted(transitions.info_state[:, 0]), [0, 1, 2])
+        self.assertTrue(np.all(transitions.action_probs[:, 0] == transitions.info_state[:, 0]))
+        with self.assertRaises(ValueError):
+            buffer.sample(4)
+
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+
+    def test_reservoir_buffer_is_uniform(self):
+
+        np.random.seed(0)
+        counts = np.zeros(100)
+        for _ in range(2000):
+            buffer = ReservoirBuffer(10)
+            for start in range(0, 100, 30):
+                stop = min(start + 30, 100)
+                buffer.add_batch(np.arange(start, stop)[:, np.newaxis], np.zeros((stop - start, 2)))
+            self.assertEqual(len(buffer), 10)
+            kept = buffer.sample(10).info_state[:, 0].astype(int)
+            self.assertEqual(len(set(kept)), 10)
+            counts[kept] += 1
+        self.assertTrue(np.all(np.abs(counts / 2000 - 0.1) < 0.03))
+
+        # The same with the transitions added one by one
+        counts = np.zeros(100)
+        for _ in range(2000):
+            buffer = ReservoirBuffer(10)
+            for i in range(100):
+                buffer.add(Transition(info_state=np.full(1, i), action_probs=np.zeros(2)))
+            kept = buffer.sample(10).info_state[:, 0].astype(int)
+            self.assertEqual(len(set(kept)), 10)
+            counts[kept] += 1
+        self.assertTrue(np.all(np.abs(counts / 2000 - 0.1) < 0.03))
+
+    def test_reservoir_buffer_memmap(self):
+
+        with tempfile.TemporaryDirectory() as memmap_dir:
+            buffer = ReservoirBuffer(4, memmap_dir=memmap_dir)
+            buffer.add_batch(np.random.random_sample((6, 3)), np.random.random_sample((6, 2)))
+            self.assertEqual(len(buffer), 4)
+            self.assertEqual(os.path.dirname(buffer.memmap_path), memmap_dir)
+            self.assertTrue(os.path.exists(os.path.join(buffer.memmap_path, 'info_states.npy')))
+            self.assertEqual(buffer.sample(2).action_probs.shape, (2, 2))
+
+            # A second buffer in the same directory does not overwrite the first one
+            other_buffer = ReservoirBuffer(4, memmap_dir=memmap_dir)
+            other_buffer.add_batch(np.zeros((4, 3)), np.zeros((4, 2)))
+            self.assertNotEqual(other_buffer.memmap_path, buffer.memmap_path)
+            self.assertTrue(np.all(buffer.sample(4).info_state > 0))
+
+            # Closing a buffer removes its files
+            memmap_path = buffer.memmap_path
+            buffer.close()
+            self.assertFalse(os.path.exists(memmap_path))
+            other_buffer.close()
+            self.assertEqual(os.listdir(memmap_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
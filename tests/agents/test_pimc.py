@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.pimc_agent import PIMCAgent
+from rlcard.games.bridge.utils.action_event import ActionEvent as BridgeActionEvent
+from rlcard.games.bridge.utils.move import PlayCardMove as BridgePlayCardMove
+from rlcard.games.maria.utils.move import PlayCardMove as MariaPlayCardMove, TradeCardMove
+
+class TestPIMC(unittest.TestCase):
+
+    def test_maria(self):
+        env = rlcard.make('maria', config={'seed': 0})
+        agent = PIMCAgent(env, num_samples=4, time_budget=10.0, max_trick_count=1, seed=0)
+        state, player_id = env.reset()
+        round = env.game.round
+        while round.play_card_count < 20:
+            action, info = agent.eval_step(state)
+            self.assertIn(action, state['raw_legal_actions'])
+            if info['num_samples']:
+                self.assertEqual(info['num_samples'], 4)
+                self.assertEqual(sorted(info['values']), sorted(state['raw_legal_actions']))
+            state, player_id = env.step(action)
+        # the samples keep the seen cards, the hand sizes and the suits shown out of
+        traded_mask = sum(1 << move.card.card_id for move in round.move_sheet
+                          if isinstance(move, TradeCardMove) and move.player.player_id == player_id)
+        play_moves = [move for move in round.move_sheet if isinstance(move, MariaPlayCardMove)]
+        played_mask = sum(1 << move.card.card_id for move in play_moves)
+        for _ in range(10):
+            hands = agent.sample_state().hands
+            self.assertEqual(hands[player_id], round.players[player_id].hand_mask)
+            self.assertEqual(hands[(player_id + 1) % 4] & traded_mask, traded_mask & ~played_mask)
+            self.assertEqual(sum(hands), ((1 << 52) - 1) & ~played_mask)
+            for hand, player in zip(hands, round.players):
+                self.assertEqual(bin(hand).count('1'), len(player.hand))
+            for index, move in enumerate(play_moves):
+                led_suit = play_moves[index - index % 4].card.suit
+                if move.card.suit != led_suit:
+                    suit_mask = sum(1 << card_id for card_id in range(52) if card_id // 13 == 'CDHS'.index(led_suit))
+                    self.assertFalse(hands[move.player.player_id] & suit_mask)
+
+    def test_bridge(self):
+        env = rlcard.make('bridge', config={'seed': 0})
+        agent = PIMCAgent(env, num_samples=4, time_budget=10.0, seed=0)
+        state, player_id = env.reset()
+        round = env.game.round
+        state, player_id = env.step(BridgeActionEvent.first_bid_action_id)
+        while not round.is_bidding_over():
+            action, _ = agent.eval_step(state)
+            self.assertEqual(action, BridgeActionEvent.pass_action_id)
+            state, player_id = env.step(action)
+        while round.play_card_count < 32:
+            state, player_id = env.step(np.random.choice(state['raw_legal_actions']))
+        play_moves = [move for move in round.move_sheet if isinstance(move, BridgePlayCardMove)]
+        played_mask = sum(1 << move.card.card_id for move in play_moves)
+        dummy_id = round.get_dummy().player_id
+        for _ in range(10):
+            hands = agent.sample_state().hands
+            for seen_id in {player_id, dummy_id if dummy_id != player_id else round.get_declarer().player_id}:
+                self.assertEqual(hands[seen_id], sum(1 << card.card_id for card in round.players[seen_id].hand))
+            self.assertEqual(sum(hands), ((1 << 52) - 1) & ~played_mask)
+        while not env.is_over():
+            action, info = agent.eval_step(state)
+            self.assertIn(action, state['raw_legal_actions'])
+            if len(state['raw_legal_actions']) > 1:
+                self.assertEqual(info['num_samples'], 4)
+            state, player_id = env.step(action)
+
+    def test_num_workers(self):
+        env = rlcard.make('maria', config={'seed': 0})
+        agent = PIMCAgent(env, num_samples=4, time_budget=10.0, num_workers=2, max_trick_count=1, seed=0)
+        state, _ = env.reset()
+        while not env.game.round.is_done_trading() or len(state['raw_legal_actions']) == 1:
+            state, _ = env.step(agent.step(state))
+        action, info = agent.eval_step(state)
+        agent.close()
+        self.assertIn(action, state['raw_legal_actions'])
+        self.assertEqual(info['num_samples'], 4)
+
+    def test_unknown_game(self):
+        env = rlcard.make('leduc-holdem')
+        with self.assertRaises(ValueError):
+            PIMCAgent(env)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
+import numpy as np
 
 import rlcard
 from rlcard.agents.random_agent import RandomAgent
+from rlcard.envs.doudizhu import _cards2array, _counts2array, _get_action_arrays
+from rlcard.games.doudizhu.utils import ID_2_ACTION, CARD_RANK_STR_INDEX
 from .determism_util import is_deterministic
 
 
@@ -72,5 +75,46 @@ class TestDoudizhuEnv(unittest.TestCase):
         env = rlcard.make('doudizhu')
         _, player_id = env.reset()
         self.assertEqual(player_id, env.get_perfect_information()['current_player'])
+
+    def test_cards2array(self):
+        array = _cards2array('3345555TTTBR')
+        self.assertEqual(array.tolist()[:8], [1, 1, 0, 0, 1, 0, 0, 0])
+        self.assertEqual(array.tolist()[8:12], [1, 1, 1, 1])
+        self.assertEqual(array.tolist()[28:32], [1, 1, 1, 0])
+        self.assertEqual(array.tolist()[52:], [1, 1])
+        self.assertEqual(array.sum(), 12)
+        self.assertEqual(_cards2array('pass').sum(), 0)
+
+        counts = np.zeros(15, dtype=np.int32)
+        for card in '3345555TTTBR':
+            counts[CARD_RANK_STR_INDEX[card]] += 1
+        self.assertTrue(np.array_equal(_counts2array(counts), array))
+
+        action_arrays = _get_action_arrays()
+        self.assertEqual(action_arrays.shape, (len(ID_2_ACTION) + 1, 54))
+        for action_id in np.random.choice(len(ID_2_ACTION), 200):
+            self.assertTrue(np.array_equal(action_arrays[action_id], _cards2array(ID_2_ACTION[action_id])))
+        self.assertEqual(action_arrays[-1].sum(), 0)
+
+    def test_get_action_feature_matrix(self):
+        env = rlcard.make('doudizhu')
+        matrix = env.get_action_feature_matrix()
+        self.assertEqual(matrix.shape, (env.num_actions, 54))
+        self.assertFalse(matrix.flags.writeable)
+        self.assertIs(rlcard.make('doudizhu').get_action_feature_matrix(), matrix)
+        for action_id in (0, 1, 100, env.num_actions - 1):
+            self.assertTrue(np.array_equal(env.get_action_feature(action_id), _cards2array(ID_2_ACTION[action_id])))
+
+    def test_step_back_restores_obs(self):
+        env = rlcard.make('doudizhu', config={'allow_step_back': True, 'seed': 3})
+        state, _ = env.reset()
+        history = []
+        while not env.is_over():
+            history.append(state['obs'])
+            state, _ = env.step(list(state['legal_actions'])[-1])
+        while history:
+            state, _ = env.step_back()
+            self.assertTrue(np.array_equal(state['obs'], history.pop()))
+
 if __name__ == '__main__':
     unittest.main()
@@ -15,6 +15,24 @@ class TestLeducholdemEnv(unittest.TestCase):
         for action in state['legal_actions']:
             self.assertLess(action, env.num_actions)
 
+    def test_legal_actions_mask(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        state, _ = env.reset()
+        while not env.is_over():
+            mask = state['legal_actions_mask']
+            self.assertEqual(mask.shape, (env.num_actions,))
+            self.assertEqual(np.nonzero(mask)[0].tolist(), sorted(state['legal_actions']))
+            state, _ = env.step(list(state['legal_actions'])[-1])
+        state, _ = env.step_back()
+        self.assertEqual(np.nonzero(state['legal_actions_mask'])[0].tolist(), sorted(state['legal_actions']))
+
+    def test_get_action_feature_matrix(self):
+        env = rlcard.make('leduc-holdem')
+        matrix = env.get_action_feature_matrix()
+        self.assertTrue(np.array_equal(matrix, np.eye(env.num_actions)))
+        self.assertFalse(matrix.flags.writeable)
+        self.assertEqual(env.get_action_feature(2).tolist(), [0, 0, 1, 0])
+
     def test_is_deterministic(self):
         self.assertTrue(is_deterministic('leduc-holdem'))
 
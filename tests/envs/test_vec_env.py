@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.envs.vec_env import VectorEnv
+
+
+class TestVectorEnv(unittest.TestCase):
+
+    def test_make_vec(self):
+        env = rlcard.make_vec('leduc-holdem', 4)
+        self.assertIsInstance(env, VectorEnv)
+        self.assertEqual(env.num_envs, 4)
+        self.assertEqual(len(env.envs), 4)
+        with self.assertRaises(ValueError):
+            rlcard.make_vec('leduc-holdem', 0)
+        with self.assertRaises(ValueError):
+            rlcard.make_vec('test_random_make', 2)
+
+    def test_reset(self):
+        env = rlcard.make_vec('leduc-holdem', 8)
+        obs, mask, player_ids = env.reset()
+        self.assertEqual(obs.shape, (8, 36))
+        self.assertEqual(mask.shape, (8, env.num_actions))
+        self.assertEqual(mask.dtype, bool)
+        self.assertEqual(player_ids.shape, (8,))
+        for i, state in enumerate(env.states):
+            self.assertEqual(sorted(np.flatnonzero(mask[i])), sorted(state['legal_actions'].keys()))
+
+    def test_step_and_auto_reset(self):
+        env = rlcard.make_vec('leduc-holdem', 16, config={'seed': 0})
+        obs, mask, player_ids = env.reset()
+        num_done = 0
+        for _ in range(50):
+            actions = [np.random.choice(np.flatnonzero(m)) for m in mask]
+            obs, mask, player_ids, payoffs, dones = env.step(actions)
+            self.assertEqual(obs.shape, (16, 36))
+            self.assertEqual(payoffs.shape, (16, env.num_players))
+            for i in range(16):
+                if dones[i]:
+                    self.assertAlmostEqual(np.sum(payoffs[i]), 0)
+                else:
+                    self.assertTrue(np.all(payoffs[i] == 0))
+                self.assertFalse(env.envs[i].is_over())
+            num_done += np.sum(dones)
+        self.assertGreater(num_done, 0)
+
+    def test_seed(self):
+        env1 = rlcard.make_vec('leduc-holdem', 4, config={'seed': 42})
+        env2 = rlcard.make_vec('leduc-holdem', 4, config={'seed': 42})
+        obs1, _, _ = env1.reset()
+        obs2, _, _ = env2.reset()
+        self.assertTrue(np.array_equal(obs1, obs2))
+
+    def test_config_without_seed(self):
+        env = VectorEnv(lambda config: rlcard.make('leduc-holdem', config=config), 2, {})
+        obs, _, _ = env.reset()
+        self.assertEqual(len(obs), 2)
+
+    def test_player_dependent_obs_shape(self):
+        env = rlcard.make_vec('doudizhu', 3)
+        obs, mask, _ = env.reset()
+        self.assertEqual(len(obs), 3)
+        self.assertEqual(mask.shape, (3, env.num_actions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import io
+import pickle
+import numpy as np
+
+
+class _GamePickler(pickle.Pickler):
+    ''' Pickle the state of a game, skipping the random states (the RNG is
+        not rewound by step_back) and back references to the game itself
+    '''
+
+    def __init__(self, file, game):
+        super().__init__(file)
+        self.game = game
+
+    def persistent_id(self, obj):
+        if isinstance(obj, np.random.RandomState):
+            return 'np_random'
+        if obj is self.game:
+            return 'game'
+        return None
+
+def snapshot(game):
+    ''' Serialize everything in the game except the step back history
+    '''
+    buffer = io.BytesIO()
+    _GamePickler(buffer, game).dump({k: v for k, v in vars(game).items() if k not in ('history', 'np_random')})
+    return buffer.getvalue()
+
+def is_step_back_consistent(game, get_legal_actions, num_steps=200):
+    ''' Play a random game, trying every legal action and stepping back at
+        each node, then step back all the way to the root. Check that the
+        game is restored exactly every time.
+
+    Args:
+        game (object): A game initialized with allow_step_back=True
+        get_legal_actions (function): A function that takes the game and
+            returns the legal actions of the current player
+        num_steps (int): The maximum number of steps played
+
+    Returns:
+        (boolean): True if step_back always restores the previous state
+    '''
+    game.init_game()
+    path = []
+    while not game.is_over() and len(path) < num_steps:
+        before = snapshot(game)
+        legal_actions = get_legal_actions(game)
+        for action in legal_actions:
+            game.step(action)
+            if not game.step_back() or snapshot(game) != before:
+                return False
+        path.append(before)
+        game.step(legal_actions[np.random.randint(len(legal_actions))])
+
+    while path:
+        if not game.step_back() or snapshot(game) != path.pop():
+            return False
+    return not game.step_back()
@@ -3,6 +3,7 @@ import numpy as np
 
 from rlcard.games.blackjack.game import BlackjackGame as Game
 from rlcard.envs.blackjack import DEFAULT_GAME_CONFIG
+from .step_back_util import is_step_back_consistent
 
 class TestBlackjackGame(unittest.TestCase):
 
@@ -62,6 +63,13 @@ class TestBlackjackGame(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_step_back_restores_state(self):
+        for num_decks in [0, 1]:
+            for _ in range(10):
+                game = Game(allow_step_back=True)
+                game.configure({'game_num_players': 2, 'game_num_decks': num_decks})
+                self.assertTrue(is_step_back_consistent(game, lambda g: ['hit', 'stand']))
+
     def test_get_state(self):
         game = Game()
         game.configure(DEFAULT_GAME_CONFIG)
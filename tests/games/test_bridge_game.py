@@ -4,14 +4,18 @@
     Date created: 11/25/2021
 '''
 
+import copy
+import pickle
 import unittest
 import numpy as np
 
 from rlcard.games.bridge.game import BridgeGame as Game
 from rlcard.games.bridge.dealer import BridgeDealer
 from rlcard.games.bridge.player import BridgePlayer
-from rlcard.games.bridge.utils.action_event import PassAction
+from rlcard.games.bridge.utils.action_event import ActionEvent, BidAction, PassAction, PlayCardAction
+from rlcard.envs.bridge import DefaultBridgePayoffDelegate
 from rlcard.games.bridge.utils.bridge_card import BridgeCard
+from rlcard.games.bridge.utils.double_dummy import DoubleDummySolver, DoubleDummyState
 from rlcard.games.bridge.utils.move import DealHandMove
 
 
@@ -133,6 +137,60 @@ class TestBridgeGame(unittest.TestCase):
             hand = player.hand
             self.assertTrue(not hand)
 
+    def test_shared_cards_and_actions(self):
+        card = BridgeCard.card(card_id=51)
+        self.assertIs(BridgeCard('S', 'A'), card)
+        self.assertIs(copy.deepcopy(card), card)
+        self.assertIs(pickle.loads(pickle.dumps(card)), card)
+        self.assertEqual(card.card_id, 51)
+        action = ActionEvent.from_action_id(ActionEvent.first_play_card_action_id + 51)
+        self.assertIs(ActionEvent.from_action_id(action.action_id), action)
+        self.assertIs(action.card, card)
+        self.assertEqual(action, PlayCardAction(card=card))
+        self.assertRaises(Exception, ActionEvent.from_action_id, ActionEvent.no_bid_action_id)
+        game = Game()
+        game.init_game()
+        for legal_action in game.judger.get_legal_actions():
+            self.assertIs(legal_action, ActionEvent.from_action_id(legal_action.action_id))
+
+    def test_double_dummy_solver(self):
+        def get_hand(*cards):
+            return sum(1 << BridgeCard(card[1], card[0]).card_id for card in cards)
+        solver = DoubleDummySolver()
+        # the finesse of the queen of spades works when east holds the king
+        hands = [get_hand('2S', '3S'), get_hand('KS', '4S'), get_hand('AS', 'QS'), get_hand('5S', '6S')]
+        self.assertEqual(solver.solve(DoubleDummyState(hands=hands, trump_suit_index=None, leader_id=0)), 2)
+        hands[1], hands[3] = hands[3], hands[1]
+        self.assertEqual(solver.solve(DoubleDummyState(hands=hands, trump_suit_index=None, leader_id=0)), 1)
+        # west ruffs or discards after 4S from east and KS from south
+        hands = [get_hand('3S', '5S'), get_hand('6S'), get_hand('2H'), get_hand('2C', 'AH')]
+        state = DoubleDummyState(hands=hands, trump_suit_index=BridgeCard.suits.index('C'), leader_id=1,
+                                 trick=[BridgeCard('S', '4').card_id, BridgeCard('S', 'K').card_id])
+        self.assertEqual(state.current_player_id, 3)
+        self.assertEqual(solver.analyze(state), {BridgeCard('C', '2').card_id: 2, BridgeCard('H', 'A').card_id: 1})
+        # the payoffs from the solver agree with the play of the rest of the deal double dummy
+        game = Game()
+        game.init_game()
+        game.step(next(action for action in game.judger.get_legal_actions() if isinstance(action, BidAction)))
+        while not game.round.is_bidding_over():
+            game.step(PassAction())
+        while game.round.play_card_count < 36:
+            game.step(np.random.choice(game.judger.get_legal_actions()))
+        state = DoubleDummyState.from_round(game.round)
+        other_state = DoubleDummyState.from_perfect_information(game.round.get_perfect_information())
+        self.assertEqual(vars(state), vars(other_state))
+        trick_counts = solver.get_trick_counts(game.round)
+        self.assertEqual(sum(trick_counts), 13)
+        payoff_delegate = DefaultBridgePayoffDelegate(double_dummy_solver=solver)
+        payoffs = payoff_delegate.get_payoffs(game)
+        while not game.is_over():
+            card_tricks = solver.analyze(DoubleDummyState.from_round(game.round))
+            best_card_id = max(card_tricks, key=card_tricks.get)
+            game.step(PlayCardAction(card=BridgeCard.card(best_card_id)))
+            self.assertEqual(solver.get_trick_counts(game.round), trick_counts)
+        self.assertEqual(game.round.won_trick_counts, trick_counts)
+        self.assertTrue(np.array_equal(DefaultBridgePayoffDelegate().get_payoffs(game), payoffs))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,10 @@
 import unittest
+import numpy as np
 
-from rlcard.games.doudizhu.utils import CARD_TYPE
+from rlcard.games.doudizhu.utils import CARD_TYPE, pack_cards, contains_packed, get_gt_cards, contains_cards
 from rlcard.games.doudizhu.judger import DoudizhuJudger as Judger
+from rlcard.games.doudizhu.player import DoudizhuPlayer as Player
+from rlcard.utils import init_54_deck
 
 class TestDoudizhuGame(unittest.TestCase):
 
@@ -155,5 +158,25 @@ class TestDoudizhuGame(unittest.TestCase):
             self.assertIn(c, playable_cards)
         self.assertEqual(len(playable_cards), len(all_cards_list))
 
+    def test_playable_cards_contained(self):
+        hand = '334445555689JQBR'
+        playable_cards = Judger.playable_cards_from_hand(hand)
+        for cards in CARD_TYPE[1]:
+            self.assertEqual(cards in playable_cards, contains_cards(hand, cards))
+
+    def test_contains_packed(self):
+        packed_actions = np.array([pack_cards(cards) for cards in ['3', '33', '333', '3334', 'BR', '2222']])
+        contained = contains_packed(pack_cards('3345BR222'), packed_actions)
+        self.assertEqual(contained.tolist(), [True, True, False, False, True, False])
+
+    def test_get_gt_cards(self):
+        player, greater_player = Player(0, np.random.RandomState()), Player(1, np.random.RandomState())
+        player.set_current_hand([card for card in init_54_deck() if card.rank in ('4', '5', '6', '7', '8', '9')])
+        greater_player.played_cards = '3'
+        gt_cards = get_gt_cards(player, greater_player)
+        self.assertEqual(gt_cards, ['pass', '4', '5', '6', '7', '8', '9', '4444', '5555', '6666', '7777', '8888', '9999'])
+        greater_player.played_cards = 'BR'
+        self.assertEqual(get_gt_cards(player, greater_player), ['pass'])
+
 if __name__ == '__main__':
     unittest.main()
@@ -18,6 +18,7 @@ from rlcard.games.gin_rummy.utils.action_event import draw_card_action_id, pick_
 from rlcard.games.gin_rummy.utils.action_event import declare_dead_hand_action_id
 from rlcard.games.gin_rummy.utils.action_event import gin_action_id, discard_action_id, knock_action_id
 from rlcard.games.gin_rummy.utils.melding import get_all_set_melds, get_all_run_melds, get_meld_clusters
+from rlcard.games.gin_rummy.utils.melding import get_best_deadwood, get_hand_mask
 from rlcard.games.gin_rummy.utils.settings import Setting, Settings
 from rlcard.games.gin_rummy.utils.thinker import Thinker
 
@@ -214,5 +215,41 @@ class TestGinRummyGame(unittest.TestCase):
         self.assertEqual(result_as_set, correct_result_as_set)
 
 
+    def test_meld_masks(self):
+        np_random = np.random.RandomState(seed=0)
+        deck = utils.get_deck()
+        for _ in range(200):
+            hand = list(np_random.choice(deck, size=11, replace=False))
+            all_melds = get_all_run_melds(hand) + get_all_set_melds(hand)
+            meld_clusters = get_meld_clusters(hand=hand)
+            self.assertEqual(frozenset(frozenset(meld_cluster[0]) for meld_cluster in meld_clusters if len(meld_cluster) == 1),
+                             frozenset(frozenset(meld) for meld in all_melds))
+            for meld_cluster in meld_clusters:
+                self.assertEqual(len(frozenset().union(*meld_cluster)), sum(len(meld) for meld in meld_cluster))
+            deadwood_count, _ = get_best_deadwood(hand_mask=get_hand_mask(hand[:10]))
+            self.assertEqual(deadwood_count, min([utils.get_deadwood_count(hand=hand[:10], meld_cluster=meld_cluster)
+                                                  for meld_cluster in get_meld_clusters(hand=hand[:10])],
+                                                 default=utils.get_deadwood_count(hand=hand[:10], meld_cluster=[])))
+            knock_cards, gin_cards = judge.get_going_out_cards(hand=hand, going_out_deadwood_count=10)
+            old_knock_cards, old_gin_cards = judge._get_going_out_cards(meld_clusters=meld_clusters, hand=hand,
+                                                                        going_out_deadwood_count=10)
+            self.assertEqual(set(knock_cards), set(old_knock_cards))
+            self.assertEqual(bool(gin_cards), bool(old_gin_cards))
+        # the hand mask of a player follows the hand
+        game = Game()
+        game.init_game()
+        while not game.is_over():
+            game.step(np.random.choice(game.judge.get_legal_actions()))
+            for player in game.round.players:
+                self.assertEqual(player.hand_mask, get_hand_mask(player.hand))
+        # the gin card of a hand with all 11 cards melded leaves the rest of the hand melded
+        hand = [utils.card_from_text(x) for x in ['AS', '2S', '3S', '4S', '5S', '6S', '7S', '8S', '9S', 'TS', 'JS']]
+        knock_cards, gin_cards = judge.get_going_out_cards(hand=hand, going_out_deadwood_count=10)
+        self.assertIn(utils.card_from_text('AS'), gin_cards)
+        for gin_card in gin_cards:
+            deadwood_count, _ = get_best_deadwood(hand_mask=get_hand_mask([card for card in hand if card != gin_card]))
+            self.assertEqual(deadwood_count, 0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -5,6 +5,7 @@ from rlcard.games.leducholdem.game import LeducholdemGame as Game
 from rlcard.games.leducholdem.player import LeducholdemPlayer as Player
 from rlcard.games.leducholdem.judger import LeducholdemJudger as Judger
 from rlcard.games.base import Card
+from .step_back_util import is_step_back_consistent
 
 class TestLeducholdemMethods(unittest.TestCase):
 
@@ -59,6 +60,11 @@ class TestLeducholdemMethods(unittest.TestCase):
         self.assertEqual(game.game_pointer, player_id)
         self.assertEqual(game.step_back(), False)
 
+    def test_step_back_restores_state(self):
+        for _ in range(10):
+            game = Game(allow_step_back=True)
+            self.assertTrue(is_step_back_consistent(game, lambda g: g.get_legal_actions()))
+
     def test_judge_game(self):
         np_random = np.random.RandomState()
         players = [Player(0, np_random), Player(1, np_random)]
@@ -3,6 +3,7 @@ import numpy as np
 
 from rlcard.games.limitholdem.game import LimitHoldemGame as Game
 from rlcard.games.limitholdem.player import LimitHoldemPlayer as Player
+from .step_back_util import is_step_back_consistent
 
 
 class TestLimitHoldemMethods(unittest.TestCase):
@@ -99,6 +100,11 @@ class TestLimitHoldemMethods(unittest.TestCase):
             action = np.random.choice(legal_actions)
             game.step(action)
 
+    def test_step_back_restores_state(self):
+        for _ in range(10):
+            game = Game(allow_step_back=True)
+            self.assertTrue(is_step_back_consistent(game, lambda g: g.get_legal_actions()))
+
     def test_payoffs(self):
         game = Game()
         np.random.seed(0)
@@ -1,8 +1,13 @@
+import copy
 import unittest
 import numpy as np
 
+from rlcard.games.mahjong.card import MahjongCard as Card
 from rlcard.games.mahjong.game import MahjongGame as Game
+from rlcard.games.mahjong.judger import MahjongJudger as Judger
 from rlcard.games.mahjong.player import MahjongPlayer as Player
+from rlcard.games.mahjong.utils import init_deck, cards2counts, get_set_count
+from .step_back_util import is_step_back_consistent
 
 class TestMahjongMethods(unittest.TestCase):
 
@@ -68,9 +73,44 @@ class TestMahjongMethods(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_step_back_restores_state(self):
+        for _ in range(3):
+            game = Game(allow_step_back=True)
+            self.assertTrue(is_step_back_consistent(
+                game, lambda g: g.get_legal_actions(g.get_state(g.round.current_player))))
+
     def test_player_get_player_id(self):
         player = Player(0, np.random.RandomState())
         self.assertEqual(0, player.get_player_id())
 
+    def test_shared_deck(self):
+        deck = init_deck()
+        self.assertEqual(len(deck), 136)
+        self.assertEqual(len(set(map(id, deck))), 34)
+        self.assertEqual([card.get_str() for card in init_deck()], [card.get_str() for card in deck])
+        card = deck[0]
+        self.assertIs(copy.deepcopy(card), card)
+        self.assertEqual(card.get_str(), card.type + '-' + card.trait)
+
+    def test_judge_hu(self):
+        judger = Judger(np.random.RandomState())
+        player = Player(0, np.random.RandomState())
+        # the pair is taken from three equal cards and the sets overlap in value
+        texts = ['characters-1'] * 3 + ['characters-2', 'characters-3', 'bamboo-4', 'bamboo-5', 'bamboo-6',
+                                        'dots-2', 'dots-3', 'dots-4', 'dots-7', 'dots-8', 'dots-9']
+        player.hand = [Card(*text.split('-')) for text in texts]
+        self.assertEqual(judger.judge_hu(player), (True, 4))
+        texts = ['dots-1', 'dots-2', 'dots-3', 'dots-4', 'dots-5', 'dots-6'] * 2 + ['winds-east'] * 2
+        player.hand = [Card(*text.split('-')) for text in sorted(texts)]
+        self.assertEqual(judger.judge_hu(player), (True, 4))
+        player.hand[-1] = Card('winds', 'west')
+        self.assertEqual(judger.judge_hu(player), (False, 2))
+        set_count, sets = judger.cal_set(['dots-1', 'dots-2', 'dots-2', 'dots-3', 'dots-3', 'dots-4'])
+        self.assertEqual(set_count, 2)
+        self.assertEqual(sorted(sets), ['dots-1', 'dots-2', 'dots-2', 'dots-3', 'dots-3', 'dots-4'])
+        # dragons and winds only make pongs
+        counts = cards2counts([Card('winds', trait) for trait in ['east', 'west', 'north']] + [Card('dragons', 'red')] * 3)
+        self.assertEqual(get_set_count(counts), 1)
+
 if __name__ == '__main__':
     unittest.main()
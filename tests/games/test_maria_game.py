@@ -10,9 +10,11 @@ import numpy as np
 from rlcard.games.maria.game import MariaGame as Game
 from rlcard.games.maria.dealer import MariaDealer
 from rlcard.games.maria.player import MariaPlayer
-from rlcard.games.maria.utils.action_event import PassAction
+from rlcard.games.maria.utils.action_event import ActionEvent, PlayCardAction
 from rlcard.games.maria.utils.maria_card import MariaCard
 from rlcard.games.maria.utils.move import DealHandMove
+from rlcard.games.maria.utils.paranoid_search import MariaParanoidSolver, MariaSearchState
+from .step_back_util import is_step_back_consistent
 
 
 class TestMariaGame(unittest.TestCase):
@@ -25,7 +27,7 @@ class TestMariaGame(unittest.TestCase):
     def test_get_num_actions(self):
         game = Game()
         num_actions = game.get_num_actions()
-        self.assertEqual(num_actions, 52)
+        self.assertEqual(num_actions, ActionEvent.get_num_actions())  # 52 trade_card, 52 play_card
 
     def test_maria_dealer(self):
         dealer = MariaDealer(np.random.RandomState())
@@ -104,6 +106,48 @@ class TestMariaGame(unittest.TestCase):
             hand = player.hand
             self.assertTrue(not hand)
 
+    def test_bitboards_match_piles(self):
+        game = Game()
+        game.init_game()
+        round_number = game.round_number
+        while game.round_number == round_number:
+            r = game.round
+            for player in r.players:
+                self.assertEqual(player.hand_mask, sum(1 << card.card_id for card in player.hand))
+                self.assertEqual(r.won_masks[player.player_id], sum(1 << card.card_id for card in r.won_pile[player.player_id]))
+            self.assertEqual(r.trick_mask, sum(1 << move.card.card_id for move in r.get_trick_moves()))
+            self.assertEqual(r.hearts_broken, any(card.suit == 'H' for pile in r.won_pile for card in pile))
+            legal_actions = game.judger.get_legal_actions()
+            self.assertTrue(legal_actions)
+            game.step(np.random.choice(legal_actions))
+
+    def test_step_back_restores_state(self):
+        game = Game(allow_step_back=True)
+        self.assertTrue(is_step_back_consistent(game, lambda g: g.judger.get_legal_actions(), num_steps=120))
+
+    def test_paranoid_search(self):
+        def get_hand(*cards):
+            return sum(1 << MariaCard(card[1], card[0]).card_id for card in cards)
+        # leading the ace of spades wins the queen of spades and a heart, the low heart loses the trick
+        hands = [get_hand('2H', 'AS'), get_hand('3H', 'KS'), get_hand('4H', '2C'), get_hand('QS', '3C')]
+        state = MariaSearchState(hands=hands, leader_id=0, hearts_broken=True)
+        expected = {MariaCard('H', '2').card_id: 0, MariaCard('S', 'A').card_id: -14}
+        for max_trick_count in [1, 2]:
+            self.assertEqual(MariaParanoidSolver(max_trick_count=max_trick_count).analyze(state), expected)
+        # hearts cannot be led before they are broken
+        state = MariaSearchState(hands=hands, leader_id=0, hearts_broken=False)
+        self.assertEqual(list(MariaParanoidSolver().analyze(state)), [MariaCard('S', 'A').card_id])
+        # the points of another player: the queen of spades is discarded on the heart trick of south
+        card_points = MariaParanoidSolver().analyze(MariaSearchState(hands=hands, leader_id=0, hearts_broken=True), player_id=2)
+        self.assertEqual(card_points[MariaCard('H', '2').card_id], -16)
+        # the legal cards of the search are those of the game
+        game = Game()
+        game.init_game()
+        while game.round.play_card_count < 10:
+            game.step(game.judger.get_legal_actions()[0])
+        card_points = MariaParanoidSolver().analyze(MariaSearchState.from_round(game.round))
+        legal_card_ids = [action.card.card_id for action in game.judger.get_legal_actions()]
+        self.assertEqual(sorted(card_points), legal_card_ids)
 
 if __name__ == '__main__':
     unittest.main()
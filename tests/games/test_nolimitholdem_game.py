@@ -6,6 +6,7 @@ import numpy as np
 from rlcard.utils import seeding
 
 from rlcard.games.nolimitholdem.round import Action
+from .step_back_util import is_step_back_consistent
 
 
 class TestNolimitholdemMethods(unittest.TestCase):
@@ -204,6 +205,12 @@ class TestNolimitholdemMethods(unittest.TestCase):
         game.step(Action.CHECK_CALL)
         self.assertTrue(game.is_over())
 
+    def test_step_back_restores_state(self):
+        for num_players in [2, 3]:
+            for _ in range(10):
+                game = Game(allow_step_back=True, num_players=num_players)
+                self.assertTrue(is_step_back_consistent(game, lambda g: g.get_legal_actions()))
+
 
 if __name__ == '__main__':
     unittest.main()
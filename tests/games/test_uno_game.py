@@ -5,6 +5,7 @@ from rlcard.games.uno.game import UnoGame as Game
 from rlcard.games.uno.player import UnoPlayer as Player
 from rlcard.games.uno.utils import ACTION_LIST
 from rlcard.games.uno.utils import hand2dict, encode_hand, encode_target
+from .step_back_util import is_step_back_consistent
 
 class TestUnoMethods(unittest.TestCase):
 
@@ -69,6 +70,11 @@ class TestUnoMethods(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_step_back_restores_state(self):
+        for _ in range(5):
+            game = Game(allow_step_back=True)
+            self.assertTrue(is_step_back_consistent(game, lambda g: g.get_legal_actions(), num_steps=500))
+
     def test_hand2dict(self):
         hand_1 = ['y-1', 'r-8', 'b-9', 'y-reverse', 'r-skip']
         hand1_dict = hand2dict(hand_1)
@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents import RandomAgent, CFRAgent
+from rlcard.utils.exploitability_utils import best_response_value, policy_value, nash_conv, exploitability
+
+class CallAgent(object):
+    ''' A deterministic agent that always calls or checks
+    '''
+    use_raw = False
+
+    def eval_step(self, state):
+        legal_actions = list(state['legal_actions'].keys())
+        return (0 if 0 in legal_actions else legal_actions[-1]), {}
+
+class TestExploitabilityUtils(unittest.TestCase):
+
+    def test_random_agents(self):
+        env = rlcard.make('leduc-holdem')
+        agents = [RandomAgent(env.num_actions) for _ in range(env.num_players)]
+        values = policy_value(env, agents)
+        self.assertAlmostEqual(float(np.sum(values)), 0.0)
+        for player_id in range(env.num_players):
+            self.assertGreater(best_response_value(env, agents, player_id), values[player_id])
+        conv = nash_conv(env, agents)
+        self.assertAlmostEqual(exploitability(env, agents), conv / env.num_players)
+
+    def test_cfr_convergence(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRAgent(env, model_path='experiments/cfr_model')
+        before = exploitability(env, [agent, agent])
+        for _ in range(100):
+            agent.train()
+        after = exploitability(env, [agent, agent])
+        self.assertLess(after, before)
+        self.assertGreater(after, 0)
+        # Deterministic
+        self.assertEqual(after, exploitability(env, [agent, agent]))
+
+    def test_sampled_deals(self):
+        env = rlcard.make('limit-holdem')
+        agents = [CallAgent(), CallAgent()]
+        with self.assertRaises(ValueError):
+            exploitability(env, agents)
+        values = policy_value(env, agents, num_deals=4)
+        for player_id in range(env.num_players):
+            self.assertGreaterEqual(best_response_value(env, agents, player_id, num_deals=4), values[player_id])
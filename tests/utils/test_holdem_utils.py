@@ -4,6 +4,8 @@ import unittest
 from rlcard.games.limitholdem.judger import LimitHoldemJudger
 from rlcard.games.limitholdem.utils import compare_hands
 from rlcard.games.limitholdem.utils import Hand as Hand
+from rlcard.games.limitholdem.utils import evaluate_hand, evaluate_hands, get_hand_category
+from rlcard.games.limitholdem.utils import canonicalize_cards, estimate_equity
 import numpy as np
 ''' Combinations selected for testing compare_hands function
 Royal straight flush ['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8', 'CA']
@@ -353,6 +355,43 @@ class TestHoldemUtils(unittest.TestCase):
                     check_result(in_chips, winners, allocated)
         self.assertEqual(nb_cases, 34954)  # to check that correct number of cases have been tested
 
+    def test_evaluate_hand(self):
+        self.assertEqual(get_hand_category(evaluate_hand(['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8', 'C7'])), 9)
+        self.assertEqual(get_hand_category(evaluate_hand(['CA', 'S2', 'H3', 'D4', 'C5', 'C8', 'C9'])), 5)
+        self.assertEqual(get_hand_category(evaluate_hand(['CJ', 'S5', 'H9', 'D3', 'C2', 'C8', 'C7'])), 1)
+        # A-2-3-4-5 is the lowest straight
+        self.assertLess(evaluate_hand(['CA', 'S2', 'H3', 'D4', 'C5', 'HK', 'HK']),
+                        evaluate_hand(['C6', 'S2', 'H3', 'D4', 'C5', 'HK', 'HK']))
+        with self.assertRaises(Exception):
+            evaluate_hand(['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8'])
+
+    def test_evaluate_hands(self):
+        deck = [suit + rank for suit in 'SHDC' for rank in 'A23456789TJQK']
+        np.random.seed(0)
+        indices = np.array([np.random.choice(52, 7, replace=False) for _ in range(1000)])
+        scores = evaluate_hands(indices)
+        for hand, score in zip(indices, scores):
+            cards = [deck[i] for i in hand]
+            self.assertEqual(score, evaluate_hand(cards))
+            reference = Hand(cards)
+            reference.evaluateHand()
+            self.assertEqual(get_hand_category(score), reference.category)
+
+    def test_canonicalize_cards(self):
+        self.assertEqual(canonicalize_cards(['SA', 'SK'], []), canonicalize_cards(['HK', 'HA'], []))
+        self.assertEqual(canonicalize_cards(['HA', 'DK'], ['D2', 'H3', 'S4']),
+                         canonicalize_cards(['CA', 'SK'], ['S2', 'C3', 'H4']))
+        self.assertNotEqual(canonicalize_cards(['SA', 'SK'], []), canonicalize_cards(['SA', 'HK'], []))
+
+    def test_estimate_equity(self):
+        win, tie, equity = estimate_equity(['SA', 'HA'], [], num_samples=2000)
+        self.assertAlmostEqual(equity, 0.85, delta=0.03)
+        self.assertAlmostEqual(equity, win + tie / 2, delta=0.01)
+        self.assertEqual(estimate_equity(['DA', 'CA'], [], num_samples=2000), (win, tie, equity))
+        self.assertEqual(estimate_equity(['SA', 'SK'], ['SQ', 'SJ', 'ST'], num_opponents=3)[0], 1.0)
+        self.assertLess(estimate_equity(['SA', 'HA'], [], num_opponents=4)[2], equity)
+        with self.assertRaises(ValueError):
+            estimate_equity(['SA'], [])
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import numpy as np
-from rlcard.utils.utils import init_54_deck, init_standard_deck, rank2int, print_card, elegent_form, reorganize, tournament
+from rlcard.utils.utils import init_54_deck, init_standard_deck, rank2int, print_card, elegent_form, reorganize, tournament, tournament_stats
 import rlcard
 from rlcard.agents.random_agent import RandomAgent
 
@@ -41,5 +41,21 @@ class TestUtils(unittest.TestCase):
         payoffs = tournament(env,1000)
         self.assertEqual(len(payoffs), 2)
 
+    def test_parallel_tournament(self):
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        env.set_agents([RandomAgent(env.num_actions), RandomAgent(env.num_actions)])
+        stats = tournament_stats(env, 1000, num_workers=2)
+        self.assertEqual(stats['num_games'], 1000)
+        self.assertEqual(len(stats['payoffs']), 2)
+        self.assertAlmostEqual(sum(stats['payoffs']), 0)
+        for variance, interval in zip(stats['variance'], stats['confidence_interval']):
+            self.assertGreaterEqual(variance, 0)
+            self.assertGreater(interval, 0)
+
+        # The shards are seeded from the env seed
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        env.set_agents([RandomAgent(env.num_actions), RandomAgent(env.num_actions)])
+        self.assertEqual(tournament(env, 1000, num_workers=2), stats['payoffs'])
+
 if __name__ == '__main__':
     unittest.main()